@@ -46,4 +46,12 @@ class Settings:
     
     def set_font_size(self, size):
         """Define o tamanho da fonte."""
-        self.settings.setValue("font_size", size)
\ No newline at end of file
+        self.settings.setValue("font_size", size)
+    
+    def get_preload_pages(self):
+        """Retorna se as páginas devem ser pré-carregadas após o login."""
+        return self.settings.value("preload_pages", True, type=bool)
+    
+    def set_preload_pages(self, ativo):
+        """Define se as páginas devem ser pré-carregadas após o login."""
+        self.settings.setValue("preload_pages", ativo)
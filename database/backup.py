@@ -0,0 +1,494 @@
+import os
+import re
+import gzip
+import shutil
+import sqlite3
+from datetime import datetime
+
+# Nome dos arquivos: backup_sistema_AAAAMMDD_HHMMSS.db (ou .db.gz quando compactado)
+PREFIXO = "backup_sistema_"
+PADRAO_ARQUIVO = re.compile(r'^backup_sistema_(\d{8}_\d{6})\.db(\.gz)?$')
+
+# Backups incrementais: backup_sistema_<data do completo>.delta_AAAAMMDD_HHMMSS.db
+PADRAO_DELTA = re.compile(r'^backup_sistema_(\d{8}_\d{6})\.delta_(\d{8}_\d{6})\.db$')
+
+# Um novo backup completo (base dos incrementais) é feito a cada N dias
+DIAS_ENTRE_COMPLETOS = 7
+
+# Páginas copiadas por passo da API de backup; entre os passos o banco fica livre
+# para as escritas do sistema
+PAGINAS_POR_PASSO = 256
+
+# Política de retenção padrão: o último backup de cada um dos N dias e das N semanas mais recentes
+RETENCAO_DIARIOS = 7
+RETENCAO_SEMANAIS = 4
+
+
+class ErroBackup(Exception):
+    """Falha ao gerar ou verificar um backup"""
+
+
+class BackupCancelado(ErroBackup):
+    """Backup interrompido a pedido do usuário ou no encerramento do sistema"""
+
+
+def copiar_banco(origem, destino, paginas=PAGINAS_POR_PASSO, progresso=None, pausa=0.0):
+    """
+    Copia um banco SQLite em uso com a API de backup online, em passos de
+    algumas páginas. Se outra conexão escrever na origem durante a cópia,
+    o SQLite reinicia a cópia, de modo que o resultado é sempre consistente.
+
+    Args:
+        origem (str): Caminho do banco de dados em uso
+        destino (str): Caminho do arquivo de backup (sobrescrito)
+        paginas (int): Páginas copiadas por passo
+        progresso (callable): Recebe (páginas copiadas, total de páginas) a cada passo;
+            se levantar uma exceção, a cópia é abortada
+        pausa (float): Segundos de espera entre os passos
+    """
+    def ao_copiar(status, restantes, total):
+        if progresso:
+            progresso(total - restantes, total)
+
+    conn_origem = sqlite3.connect(origem)
+    conn_destino = sqlite3.connect(destino)
+    try:
+        conn_origem.backup(conn_destino, pages=paginas, progress=ao_copiar, sleep=pausa)
+    finally:
+        conn_destino.close()
+        conn_origem.close()
+
+
+def verificar_integridade(caminho):
+    """
+    Executa PRAGMA integrity_check no arquivo informado
+
+    Returns:
+        tuple: (True, "ok") ou (False, mensagens do SQLite)
+    """
+    conn = sqlite3.connect(caminho)
+    try:
+        mensagens = [linha[0] for linha in conn.execute("PRAGMA integrity_check").fetchall()]
+    except sqlite3.DatabaseError as e:
+        return False, str(e)
+    finally:
+        conn.close()
+    return mensagens == ["ok"], "; ".join(mensagens)
+
+
+def compactar_arquivo(caminho):
+    """Compacta o arquivo com gzip, remove o original e retorna o novo caminho"""
+    caminho_gz = caminho + ".gz"
+    with open(caminho, 'rb') as entrada, gzip.open(caminho_gz, 'wb', compresslevel=6) as saida:
+        shutil.copyfileobj(entrada, saida, 1024 * 1024)
+    os.remove(caminho)
+    return caminho_gz
+
+
+def listar_backups(diretorio):
+    """
+    Lista os backups completos do diretório, do mais recente para o mais antigo
+
+    Returns:
+        list: Tuplas (data e hora do backup, caminho do arquivo)
+    """
+    if not os.path.isdir(diretorio):
+        return []
+
+    backups = []
+    for nome in os.listdir(diretorio):
+        correspondencia = PADRAO_ARQUIVO.match(nome)
+        if correspondencia:
+            data_hora = datetime.strptime(correspondencia.group(1), "%Y%m%d_%H%M%S")
+            backups.append((data_hora, os.path.join(diretorio, nome)))
+    backups.sort(reverse=True)
+    return backups
+
+
+def listar_incrementais(diretorio, base=None):
+    """
+    Lista os backups incrementais do diretório, do mais antigo para o mais recente
+
+    Args:
+        diretorio (str): Diretório dos backups
+        base (datetime): Apenas os incrementais deste backup completo
+
+    Returns:
+        list: Tuplas (data e hora do completo base, data e hora do incremental, caminho)
+    """
+    if not os.path.isdir(diretorio):
+        return []
+
+    incrementais = []
+    for nome in os.listdir(diretorio):
+        correspondencia = PADRAO_DELTA.match(nome)
+        if correspondencia:
+            data_base = datetime.strptime(correspondencia.group(1), "%Y%m%d_%H%M%S")
+            data_hora = datetime.strptime(correspondencia.group(2), "%Y%m%d_%H%M%S")
+            if base is None or data_base == base:
+                incrementais.append((data_base, data_hora, os.path.join(diretorio, nome)))
+    incrementais.sort()
+    return incrementais
+
+
+def aplicar_retencao(diretorio, diarios=RETENCAO_DIARIOS, semanais=RETENCAO_SEMANAIS):
+    """
+    Remove os backups fora da política de retenção: mantém o mais recente de
+    cada um dos `diarios` dias e das `semanais` semanas mais recentes que
+    tenham backup. O backup mais recente nunca é removido. Os incrementais
+    são mantidos enquanto o backup completo em que se baseiam existir.
+
+    Returns:
+        list: Caminhos dos arquivos removidos
+    """
+    backups = listar_backups(diretorio)
+    manter = set()
+    dias = set()
+    semanas = set()
+
+    for data_hora, caminho in backups:
+        dia = data_hora.date()
+        semana = data_hora.isocalendar()[:2]
+        if dia not in dias and len(dias) < diarios:
+            dias.add(dia)
+            manter.add(caminho)
+        if semana not in semanas and len(semanas) < semanais:
+            semanas.add(semana)
+            manter.add(caminho)
+
+    if backups:
+        manter.add(backups[0][1])
+
+    bases_mantidas = {data_hora for data_hora, caminho in backups if caminho in manter}
+    remover = [caminho for _, caminho in backups if caminho not in manter]
+    remover += [caminho for data_base, _, caminho in listar_incrementais(diretorio)
+                if data_base not in bases_mantidas]
+
+    removidos = []
+    for caminho in remover:
+        try:
+            os.remove(caminho)
+            removidos.append(caminho)
+        except OSError as e:
+            print(f"Erro ao remover backup antigo {caminho}: {e}")
+    return removidos
+
+
+def _ultima_alteracao(conn, esquema='main'):
+    """
+    Último id do registro de alterações (backup_alteracoes) ou None se o
+    banco ainda não tem o registro (schema anterior à migração 6)
+    """
+    if conn.execute(f"SELECT 1 FROM {esquema}.sqlite_master WHERE name = 'backup_alteracoes'").fetchone() is None:
+        return None
+    linha = conn.execute(f"SELECT seq FROM {esquema}.sqlite_sequence WHERE name = 'backup_alteracoes'").fetchone()
+    return linha[0] if linha else 0
+
+
+def _ler_estado(db_path):
+    """Retorna o backup_estado do banco em uso (None se o registro de alterações não existir)"""
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    try:
+        if _ultima_alteracao(conn) is None:
+            return None
+        return dict(conn.execute("SELECT chave, valor FROM backup_estado").fetchall())
+    finally:
+        conn.close()
+
+
+def _registrar_estado(db_path, ultima_alteracao, base=None):
+    """
+    Grava até onde o registro de alterações já está coberto pelos backups e
+    descarta as alterações já copiadas
+
+    Args:
+        db_path (str): Caminho do banco de dados em uso
+        ultima_alteracao (int): Último id do registro incluído no backup
+        base (str): Nome do backup completo base (apenas ao iniciar uma nova sequência)
+    """
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    try:
+        with conn:
+            estado = [('ultima_alteracao', str(ultima_alteracao))]
+            if base:
+                estado.append(('base', base))
+            conn.executemany("INSERT OR REPLACE INTO backup_estado (chave, valor) VALUES (?, ?)", estado)
+            conn.execute("DELETE FROM backup_alteracoes WHERE id <= ?", (ultima_alteracao,))
+    finally:
+        conn.close()
+
+
+def realizar_backup(db_path, diretorio, compactar=False, diarios=RETENCAO_DIARIOS,
+                    semanais=RETENCAO_SEMANAIS, progresso=None, paginas=PAGINAS_POR_PASSO):
+    """
+    Gera um backup completo verificado do banco em uso e aplica a política de retenção.
+
+    A cópia é feita em um arquivo temporário, verificada com integrity_check e
+    só então renomeada para o nome definitivo; um backup com falha nunca
+    substitui nem conta como backup válido. O backup completo passa a ser a
+    base dos próximos backups incrementais.
+
+    Args:
+        db_path (str): Caminho do banco de dados em uso
+        diretorio (str): Diretório dos backups (criado se não existir)
+        compactar (bool): Compactar o backup com gzip
+        diarios (int): Dias mantidos pela política de retenção
+        semanais (int): Semanas mantidas pela política de retenção
+        progresso (callable): Recebe (páginas copiadas, total de páginas)
+        paginas (int): Páginas copiadas por passo
+
+    Returns:
+        str: Caminho do backup gerado
+
+    Raises:
+        ErroBackup: Se a cópia falhar ou não passar na verificação de integridade
+    """
+    os.makedirs(diretorio, exist_ok=True)
+
+    nome_arquivo = f"{PREFIXO}{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    caminho_backup = os.path.join(diretorio, nome_arquivo)
+    caminho_temporario = caminho_backup + ".parcial"
+
+    try:
+        try:
+            copiar_banco(db_path, caminho_temporario, paginas=paginas, progresso=progresso)
+        except sqlite3.Error as e:
+            raise ErroBackup(f"Falha ao copiar o banco de dados: {e}") from e
+
+        integro, mensagem = verificar_integridade(caminho_temporario)
+        if not integro:
+            raise ErroBackup(f"Backup reprovado na verificação de integridade: {mensagem}")
+
+        # Até onde o registro de alterações está contido na cópia
+        conn = sqlite3.connect(caminho_temporario)
+        try:
+            ultima_alteracao = _ultima_alteracao(conn)
+        finally:
+            conn.close()
+
+        os.replace(caminho_temporario, caminho_backup)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+    if compactar:
+        caminho_backup = compactar_arquivo(caminho_backup)
+
+    if ultima_alteracao is not None:
+        _registrar_estado(db_path, ultima_alteracao, base=os.path.basename(caminho_backup))
+
+    aplicar_retencao(diretorio, diarios=diarios, semanais=semanais)
+    return caminho_backup
+
+
+def _gerar_incremental(db_path, destino, base, desde, progresso=None):
+    """
+    Copia para destino o estado atual das linhas alteradas depois do id
+    `desde` do registro de alterações e a lista das linhas excluídas.
+    Tudo é lido em uma única transação de leitura, que não bloqueia as
+    escritas do sistema (WAL).
+
+    Returns:
+        int: Último id do registro de alterações incluído
+    """
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    try:
+        conn.execute("ATTACH DATABASE ? AS delta", (destino,))
+        conn.execute("BEGIN")
+        ate = _ultima_alteracao(conn)
+
+        conn.execute("CREATE TABLE delta.backup_info (chave TEXT PRIMARY KEY, valor TEXT)")
+        conn.execute("CREATE TABLE delta.backup_exclusoes (tabela TEXT NOT NULL, linha_id INTEGER NOT NULL)")
+
+        tabelas = [linha[0] for linha in conn.execute(
+            "SELECT DISTINCT tabela FROM backup_alteracoes WHERE id > ? AND id <= ?", (desde, ate))]
+        alteradas = "SELECT linha_id FROM backup_alteracoes WHERE tabela = ? AND id > ? AND id <= ?"
+
+        for i, tabela in enumerate(tabelas):
+            if progresso:
+                progresso(i, len(tabelas))
+            conn.execute(f'CREATE TABLE delta."{tabela}" AS SELECT * FROM main."{tabela}" '
+                         f'WHERE id IN ({alteradas})', (tabela, desde, ate))
+            conn.execute(f'''
+            INSERT INTO delta.backup_exclusoes (tabela, linha_id)
+            SELECT DISTINCT tabela, linha_id FROM backup_alteracoes a
+            WHERE tabela = ? AND id > ? AND id <= ?
+              AND NOT EXISTS (SELECT 1 FROM main."{tabela}" t WHERE t.id = a.linha_id)
+            ''', (tabela, desde, ate))
+
+        conn.executemany("INSERT INTO delta.backup_info (chave, valor) VALUES (?, ?)", [
+            ('base', base), ('desde', str(desde)), ('ate', str(ate)),
+            ('criado_em', datetime.now().isoformat(timespec='seconds')),
+        ])
+        conn.commit()
+        if progresso:
+            progresso(len(tabelas), len(tabelas))
+        return ate
+    finally:
+        conn.close()
+
+
+def realizar_backup_incremental(db_path, diretorio, compactar=False, diarios=RETENCAO_DIARIOS,
+                                semanais=RETENCAO_SEMANAIS, progresso=None, paginas=PAGINAS_POR_PASSO,
+                                dias_entre_completos=DIAS_ENTRE_COMPLETOS):
+    """
+    Gera um backup incremental com as linhas alteradas desde o último backup,
+    com custo proporcional ao movimento do período e não ao histórico.
+
+    Faz um backup completo no lugar do incremental quando ainda não há base
+    (primeiro backup, base removida ou banco sem registro de alterações) ou
+    quando a base tem mais de `dias_entre_completos` dias.
+
+    Args: os mesmos de realizar_backup, mais
+        dias_entre_completos (int): Idade máxima da base dos incrementais
+
+    Returns:
+        str: Caminho do backup gerado
+
+    Raises:
+        ErroBackup: Se o backup falhar ou não passar na verificação de integridade
+    """
+    opcoes_completo = {'compactar': compactar, 'diarios': diarios, 'semanais': semanais,
+                       'progresso': progresso, 'paginas': paginas}
+
+    estado = _ler_estado(db_path)
+    if not estado or 'base' not in estado:
+        return realizar_backup(db_path, diretorio, **opcoes_completo)
+
+    correspondencia = PADRAO_ARQUIVO.match(estado['base'])
+    if not correspondencia or not os.path.exists(os.path.join(diretorio, estado['base'])):
+        return realizar_backup(db_path, diretorio, **opcoes_completo)
+
+    data_base = datetime.strptime(correspondencia.group(1), "%Y%m%d_%H%M%S")
+    if (datetime.now() - data_base).days >= dias_entre_completos:
+        return realizar_backup(db_path, diretorio, **opcoes_completo)
+
+    nome_arquivo = f"{PREFIXO}{correspondencia.group(1)}.delta_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    caminho_backup = os.path.join(diretorio, nome_arquivo)
+    caminho_temporario = caminho_backup + ".parcial"
+
+    try:
+        try:
+            ate = _gerar_incremental(db_path, caminho_temporario, estado['base'],
+                                     int(estado.get('ultima_alteracao', 0)), progresso)
+        except sqlite3.Error as e:
+            raise ErroBackup(f"Falha ao gerar o backup incremental: {e}") from e
+
+        integro, mensagem = verificar_integridade(caminho_temporario)
+        if not integro:
+            raise ErroBackup(f"Backup reprovado na verificação de integridade: {mensagem}")
+
+        os.replace(caminho_temporario, caminho_backup)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+    _registrar_estado(db_path, ate)
+    aplicar_retencao(diretorio, diarios=diarios, semanais=semanais)
+    return caminho_backup
+
+
+def _aplicar_incremental(conn):
+    """Aplica o incremental anexado como 'delta' sobre o banco principal"""
+    # Exclusões primeiro: uma linha nova pode reutilizar um valor único de uma excluída
+    for tabela, linha_id in conn.execute("SELECT tabela, linha_id FROM delta.backup_exclusoes").fetchall():
+        conn.execute(f'DELETE FROM main."{tabela}" WHERE id = ?', (linha_id,))
+
+    tabelas = [linha[0] for linha in conn.execute(
+        "SELECT name FROM delta.sqlite_master WHERE type = 'table' "
+        "AND name NOT IN ('backup_info', 'backup_exclusoes')")]
+
+    for tabela in tabelas:
+        colunas_principal = {coluna[1] for coluna in conn.execute(f'PRAGMA main.table_info("{tabela}")')}
+        if not colunas_principal:
+            print(f"Aviso: tabela {tabela} do backup incremental não existe no banco restaurado")
+            continue
+
+        # Colunas em comum (o schema pode ter mudado entre o completo e o incremental)
+        colunas = [coluna[1] for coluna in conn.execute(f'PRAGMA delta.table_info("{tabela}")')
+                   if coluna[1] in colunas_principal]
+        lista = ", ".join(colunas)
+        atualizacao = ", ".join(f"{coluna} = excluded.{coluna}" for coluna in colunas if coluna != 'id')
+        conn.execute(f'''
+        INSERT INTO main."{tabela}" ({lista})
+        SELECT {lista} FROM delta."{tabela}" WHERE true
+        ON CONFLICT (id) DO UPDATE SET {atualizacao}
+        ''')
+
+
+def restaurar_backup(base, destino, ate=None, substituir=False):
+    """
+    Restaura um backup completo e, em ordem, os incrementais baseados nele.
+
+    Args:
+        base (str): Caminho do backup completo (.db ou .db.gz)
+        destino (str): Caminho do banco restaurado
+        ate (datetime): Aplica apenas os incrementais gerados até esta data e hora
+        substituir (bool): Permite sobrescrever um banco existente em destino
+            (o sistema deve estar fechado)
+
+    Returns:
+        list: Caminhos dos incrementais aplicados
+
+    Raises:
+        ErroBackup: Se a base for inválida, a sequência de incrementais estiver
+            incompleta ou o banco restaurado não passar na verificação de integridade
+    """
+    correspondencia = PADRAO_ARQUIVO.match(os.path.basename(base))
+    if not correspondencia or not os.path.exists(base):
+        raise ErroBackup(f"Backup completo não encontrado: {base}")
+    if os.path.exists(destino) and not substituir:
+        raise ErroBackup(f"O arquivo {destino} já existe")
+
+    data_base = datetime.strptime(correspondencia.group(1), "%Y%m%d_%H%M%S")
+    incrementais = [caminho for _, data_hora, caminho in listar_incrementais(os.path.dirname(base), data_base)
+                    if ate is None or data_hora <= ate]
+
+    caminho_temporario = destino + ".parcial"
+    aplicados = []
+    try:
+        if base.endswith(".gz"):
+            with gzip.open(base, 'rb') as entrada, open(caminho_temporario, 'wb') as saida:
+                shutil.copyfileobj(entrada, saida, 1024 * 1024)
+        else:
+            shutil.copyfile(base, caminho_temporario)
+
+        conn = sqlite3.connect(caminho_temporario)
+        try:
+            marcador = _ultima_alteracao(conn) or 0
+            for caminho in incrementais:
+                conn.execute("ATTACH DATABASE ? AS delta", (caminho,))
+                info = dict(conn.execute("SELECT chave, valor FROM delta.backup_info").fetchall())
+                if int(info['desde']) != marcador:
+                    raise ErroBackup(f"Sequência de backups incrementais interrompida em {os.path.basename(caminho)}")
+
+                with conn:
+                    _aplicar_incremental(conn)
+                conn.execute("DETACH DATABASE delta")
+                marcador = int(info['ate'])
+                aplicados.append(caminho)
+
+            # O banco restaurado começa uma nova sequência a partir de um backup completo
+            if _ultima_alteracao(conn) is not None:
+                with conn:
+                    conn.execute("DELETE FROM backup_alteracoes")
+                    conn.execute("DELETE FROM backup_estado")
+        except sqlite3.Error as e:
+            raise ErroBackup(f"Falha ao aplicar o backup incremental: {e}") from e
+        finally:
+            conn.close()
+
+        integro, mensagem = verificar_integridade(caminho_temporario)
+        if not integro:
+            raise ErroBackup(f"Banco restaurado reprovado na verificação de integridade: {mensagem}")
+
+        # Arquivos WAL do banco substituído não pertencem ao restaurado
+        for sufixo in ("-wal", "-shm"):
+            if os.path.exists(destino + sufixo):
+                os.remove(destino + sufixo)
+        os.replace(caminho_temporario, destino)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+    return aplicados
@@ -0,0 +1,211 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite de longa duração: uma conexão de escrita
+    (protegida por lock) e N conexões de leitura com checkout/devolução.
+    """
+
+    def __init__(self, db_path, leitores=2, pragmas=None, timeout=5.0):
+        """
+        Inicializa o pool e abre todas as conexões
+
+        Args:
+            db_path (str): Caminho do arquivo do banco de dados
+            leitores (int): Quantidade de conexões somente leitura
+            pragmas (dict): PRAGMAs aplicados em cada conexão aberta
+            timeout (float): Tempo máximo de espera por um lock do SQLite
+        """
+        self.db_path = db_path
+        self.num_leitores = max(1, leitores)
+        self.pragmas = dict(pragmas or {})
+        self.timeout = timeout
+
+        self._lock_escrita = threading.RLock()
+        # Blocos escrita() abertos pela thread que detém o lock (> 1: aninhados)
+        self._profundidade = 0
+        self._leitores = queue.LifoQueue()
+        self._todas = []
+        self._fechado = False
+
+        self.escritor = self._abrir_conexao()
+        for _ in range(self.num_leitores):
+            self._leitores.put(self._abrir_conexao())
+
+    def _abrir_conexao(self):
+        """Abre uma conexão e aplica o perfil de PRAGMAs"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for nome, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {nome} = {valor}").fetchall()
+        self._todas.append(conn)
+        return conn
+
+    def _descartar(self, conn):
+        """Fecha uma conexão defeituosa e remove do registro do pool"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        if conn in self._todas:
+            self._todas.remove(conn)
+
+    @staticmethod
+    def conexao_ativa(conn):
+        """Verifica se a conexão ainda responde a uma consulta simples"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except (sqlite3.ProgrammingError, sqlite3.OperationalError):
+            return False
+
+    def obter_leitor(self, timeout=None):
+        """
+        Retira uma conexão de leitura do pool, reabrindo-a se estiver inválida
+
+        Args:
+            timeout (float): Tempo máximo de espera por uma conexão livre
+
+        Returns:
+            sqlite3.Connection: Conexão de leitura
+
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão ficar livre dentro do tempo
+        """
+        if self._fechado:
+            raise sqlite3.ProgrammingError("Pool de conexões fechado")
+
+        try:
+            conn = self._leitores.get(timeout=timeout if timeout is not None else self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Nenhuma conexão de leitura disponível") from None
+        if not self.conexao_ativa(conn):
+            self._descartar(conn)
+            conn = self._abrir_conexao()
+        return conn
+
+    def devolver_leitor(self, conn):
+        """Devolve uma conexão de leitura ao pool"""
+        if self._fechado:
+            self._descartar(conn)
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._leitores.put(conn)
+
+    @contextmanager
+    def leitura(self):
+        """Context manager que empresta uma conexão de leitura"""
+        conn = self.obter_leitor()
+        try:
+            yield conn
+        finally:
+            self.devolver_leitor(conn)
+
+    @contextmanager
+    def escrita(self):
+        """
+        Context manager que concede acesso exclusivo à conexão de escrita.
+        Confirma a transação ao sair ou desfaz em caso de exceção.
+
+        Um bloco aberto dentro de outro (na mesma thread) vira um SAVEPOINT
+        da transação externa: ao sair ele só libera o savepoint e, em caso de
+        exceção, desfaz apenas as próprias alterações. Só o bloco mais
+        externo confirma ou desfaz a transação.
+        """
+        with self._lock_escrita:
+            if self._profundidade > 0:
+                with self._savepoint():
+                    yield self.escritor
+                return
+
+            if not self.conexao_ativa(self.escritor):
+                self._descartar(self.escritor)
+                self.escritor = self._abrir_conexao()
+            self._profundidade = 1
+            try:
+                yield self.escritor
+                self.escritor.commit()
+            except BaseException:
+                self.escritor.rollback()
+                raise
+            finally:
+                self._profundidade = 0
+
+    @contextmanager
+    def _savepoint(self):
+        """Bloco escrita() aninhado: savepoint dentro da transação do bloco externo"""
+        nome = f"escrita_{self._profundidade}"
+        # Sem transação aberta, o savepoint seria a própria transação e o
+        # RELEASE a confirmaria antes do fim do bloco externo
+        if not self.escritor.in_transaction:
+            self.escritor.execute("BEGIN")
+        self.escritor.execute(f"SAVEPOINT {nome}")
+        self._profundidade += 1
+        try:
+            yield
+        except BaseException:
+            self.escritor.execute(f"ROLLBACK TO {nome}")
+            self.escritor.execute(f"RELEASE {nome}")
+            raise
+        else:
+            self.escritor.execute(f"RELEASE {nome}")
+        finally:
+            self._profundidade -= 1
+
+    def checkpoint(self, modo='PASSIVE'):
+        """
+        Executa PRAGMA wal_checkpoint na conexão de escrita
+
+        Args:
+            modo (str): PASSIVE, FULL, RESTART ou TRUNCATE
+
+        Returns:
+            bool: True se o checkpoint foi concluído sem ficar bloqueado
+        """
+        modo = modo.upper()
+        if modo not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Modo de checkpoint inválido: {modo}")
+
+        with self._lock_escrita:
+            ocupado, _, _ = self.escritor.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+        return ocupado == 0
+
+    def verificar_saude(self):
+        """
+        Verifica todas as conexões ociosas e reabre as que não respondem
+
+        Returns:
+            bool: True se o pool está operacional
+        """
+        if self._fechado:
+            return False
+
+        with self._lock_escrita:
+            if not self.conexao_ativa(self.escritor):
+                self._descartar(self.escritor)
+                self.escritor = self._abrir_conexao()
+
+        ociosas = []
+        while True:
+            try:
+                ociosas.append(self._leitores.get_nowait())
+            except queue.Empty:
+                break
+        for conn in ociosas:
+            if not self.conexao_ativa(conn):
+                self._descartar(conn)
+                conn = self._abrir_conexao()
+            self._leitores.put(conn)
+        return True
+
+    def fechar(self):
+        """Fecha todas as conexões do pool"""
+        self._fechado = True
+        for conn in list(self._todas):
+            self._descartar(conn)
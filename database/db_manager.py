@@ -1,37 +1,561 @@
 import sqlite3
 import os
+import re
 import hashlib
-from datetime import datetime, timedelta
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+
+from database.connection_pool import ConnectionPool
+from database.migracoes import Migracao, versao_schema, aplicar_migracoes, reverter_migracoes
+from utils.perfil_inicializacao import perfil
+
+# Tabelas principais do sistema (migração 1)
+TABELAS_BASE = [
+    # Tabela de Produtos (com novos campos)
+    '''CREATE TABLE IF NOT EXISTS produtos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        codigo_barras TEXT,
+        nome TEXT NOT NULL,
+        descricao TEXT,
+        quantidade INTEGER DEFAULT 0,
+        estoque_minimo INTEGER DEFAULT 0,
+        preco_compra REAL,
+        margem_lucro REAL,
+        preco_venda REAL,
+        data_validade DATE,
+        localizacao TEXT,
+        fornecedor_id INTEGER,
+        data_cadastro DATE DEFAULT CURRENT_DATE,
+        FOREIGN KEY (fornecedor_id) REFERENCES fornecedores (id)
+    )''',
+    # Tabela de Fornecedores
+    '''CREATE TABLE IF NOT EXISTS fornecedores (
+         id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        representante TEXT,
+        frequencia_compra TEXT,
+        telefone TEXT,
+        email TEXT,
+        endereco TEXT,
+        contato TEXT,
+        data_cadastro DATE DEFAULT CURRENT_DATE
+    )''',
+    # Tabela de Clientes
+    '''CREATE TABLE IF NOT EXISTS clientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        documento TEXT UNIQUE,
+        telefone TEXT,
+        email TEXT,
+        endereco TEXT,
+        data_cadastro DATE DEFAULT CURRENT_DATE
+    )''',
+    # Tabela de Promoções
+    '''CREATE TABLE IF NOT EXISTS promocoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        produto_id INTEGER,
+        preco_antigo REAL,
+        preco_promocional REAL,
+        data_inicio DATE,
+        data_fim DATE,
+        descricao TEXT,
+        FOREIGN KEY (produto_id) REFERENCES produtos (id)
+    )''',
+    # Tabela de Caixas
+    '''CREATE TABLE IF NOT EXISTS caixas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        data_fechamento TIMESTAMP,
+        saldo_inicial REAL NOT NULL,
+        saldo_final_sistema REAL,
+        saldo_final_informado REAL,
+        diferenca REAL,
+        operador TEXT,
+        status TEXT DEFAULT 'Aberto',
+        observacao TEXT
+    )''',
+    # Tabela de Movimentos de Caixa
+    '''CREATE TABLE IF NOT EXISTS movimentos_caixa (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        caixa_id INTEGER NOT NULL,
+        data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        tipo TEXT NOT NULL, -- 'Entrada' ou 'Saída'
+        descricao TEXT NOT NULL,
+        valor REAL NOT NULL,
+        forma_pagamento TEXT,
+        referencia_id INTEGER, -- ID da venda ou outra entidade
+        tipo_referencia TEXT, -- 'Venda', 'Despesa', etc.
+        operador TEXT,
+        observacao TEXT,
+        FOREIGN KEY (caixa_id) REFERENCES caixas (id)
+    )''',
+    # Tabela de Vendas
+    '''CREATE TABLE IF NOT EXISTS vendas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        cliente_id INTEGER,
+        valor_total REAL NOT NULL,
+        desconto REAL DEFAULT 0,
+        forma_pagamento TEXT,
+        parcelas INTEGER DEFAULT 1,
+        observacao TEXT,
+        status TEXT DEFAULT 'Concluída',
+        operador TEXT,
+        FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+    )''',
+    # Tabela de Itens de Venda
+    '''CREATE TABLE IF NOT EXISTS itens_venda (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        venda_id INTEGER NOT NULL,
+        produto_id INTEGER NOT NULL,
+        quantidade INTEGER NOT NULL,
+        preco_unitario REAL NOT NULL,
+        subtotal REAL NOT NULL,
+        FOREIGN KEY (venda_id) REFERENCES vendas (id),
+        FOREIGN KEY (produto_id) REFERENCES produtos (id)
+    )''',
+    # Tabela de Usuários (nova)
+    '''CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        login TEXT NOT NULL UNIQUE,
+        senha TEXT NOT NULL,
+        email TEXT UNIQUE,
+        tipo TEXT DEFAULT 'comum', -- 'admin' ou 'comum'
+        ativo INTEGER DEFAULT 1,   -- 0 para inativo, 1 para ativo
+        data_cadastro DATE DEFAULT CURRENT_DATE,
+        ultimo_acesso TIMESTAMP
+    )''',
+]
+
+# Índices secundários das colunas usadas nas consultas mais frequentes
+INDICES = [
+    ('idx_produtos_codigo_barras',
+     'CREATE UNIQUE INDEX IF NOT EXISTS idx_produtos_codigo_barras ON produtos (codigo_barras)'),
+    ('idx_produtos_data_validade',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_data_validade ON produtos (data_validade)'),
+    ('idx_caixas_aberto',
+     "CREATE INDEX IF NOT EXISTS idx_caixas_aberto ON caixas (status) WHERE status = 'Aberto'"),
+    ('idx_movimentos_caixa_data',
+     'CREATE INDEX IF NOT EXISTS idx_movimentos_caixa_data ON movimentos_caixa (caixa_id, data_hora)'),
+    ('idx_itens_venda_venda',
+     'CREATE INDEX IF NOT EXISTS idx_itens_venda_venda ON itens_venda (venda_id)'),
+    ('idx_itens_venda_produto',
+     'CREATE INDEX IF NOT EXISTS idx_itens_venda_produto ON itens_venda (produto_id)'),
+    ('idx_promocoes_periodo',
+     'CREATE INDEX IF NOT EXISTS idx_promocoes_periodo ON promocoes (data_inicio, data_fim)'),
+    ('idx_produtos_nome',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos (nome COLLATE NOCASE)'),
+    ('idx_vendas_data_hora',
+     'CREATE INDEX IF NOT EXISTS idx_vendas_data_hora ON vendas (data_hora)'),
+    ('idx_movimentos_data_hora',
+     'CREATE INDEX IF NOT EXISTS idx_movimentos_data_hora ON movimentos_caixa (data_hora)'),
+]
+
+# Índice de texto completo dos produtos (nome, descrição e código de barras),
+# sem acentos ("pacoca" encontra "Paçoca") e com prefixos pré-indexados.
+# O gatilho de atualização só dispara quando as colunas indexadas mudam,
+# para que a baixa de estoque das vendas não reescreva o índice.
+FTS_PRODUTOS = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+        nome, descricao, codigo_barras,
+        content='produtos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS produtos_fts_ai AFTER INSERT ON produtos BEGIN
+        INSERT INTO produtos_fts (rowid, nome, descricao, codigo_barras)
+        VALUES (new.id, new.nome, new.descricao, new.codigo_barras);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS produtos_fts_ad AFTER DELETE ON produtos BEGIN
+        INSERT INTO produtos_fts (produtos_fts, rowid, nome, descricao, codigo_barras)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.codigo_barras);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS produtos_fts_au AFTER UPDATE OF nome, descricao, codigo_barras ON produtos BEGIN
+        INSERT INTO produtos_fts (produtos_fts, rowid, nome, descricao, codigo_barras)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.codigo_barras);
+        INSERT INTO produtos_fts (rowid, nome, descricao, codigo_barras)
+        VALUES (new.id, new.nome, new.descricao, new.codigo_barras);
+    END''',
+]
+
+# Quantidade de candidatos ordenados por relevância nas buscas do caixa
+CANDIDATOS_BUSCA = 200
+
+# Resumos diários de vendas usados pelo dashboard. O dia é a data local da
+# venda; cliente_id 0 agrupa as vendas sem cliente identificado.
+TABELAS_RESUMO_VENDAS = [
+    '''CREATE TABLE IF NOT EXISTS vendas_resumo_diario (
+        dia TEXT NOT NULL,
+        produto_id INTEGER NOT NULL,
+        quantidade INTEGER NOT NULL DEFAULT 0,
+        valor_total REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (dia, produto_id)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS vendas_resumo_pagamentos (
+        dia TEXT NOT NULL,
+        forma_pagamento TEXT NOT NULL,
+        num_vendas INTEGER NOT NULL DEFAULT 0,
+        valor_total REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (dia, forma_pagamento)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS vendas_resumo_clientes (
+        dia TEXT NOT NULL,
+        cliente_id INTEGER NOT NULL,
+        compras INTEGER NOT NULL DEFAULT 0,
+        valor_total REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (dia, cliente_id)
+    ) WITHOUT ROWID''',
+]
+
+# Tabelas cujas alterações são registradas para os backups incrementais
+# (os resumos de vendas e o índice de texto completo são reconstruídos na restauração)
+TABELAS_REGISTRO_ALTERACOES = ['produtos', 'fornecedores', 'clientes', 'promocoes', 'caixas',
+                               'movimentos_caixa', 'vendas', 'itens_venda', 'usuarios']
+
+# Registro de alterações lido pelos backups incrementais (database/backup.py). Guarda
+# só a tabela e o id da linha; o backup copia o estado atual das linhas alteradas.
+# backup_estado guarda o backup completo base e até onde o registro já foi copiado.
+TABELAS_REGISTRO_ALTERACOES_SQL = [
+    '''CREATE TABLE IF NOT EXISTS backup_alteracoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela TEXT NOT NULL,
+        linha_id INTEGER NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_backup_alteracoes_tabela ON backup_alteracoes (tabela, id)',
+    '''CREATE TABLE IF NOT EXISTS backup_estado (
+        chave TEXT PRIMARY KEY,
+        valor TEXT
+    )''',
+]
+
+# Fila persistente dos emails de notificação (notificacoes/fila_notificacoes.py).
+# status: pendente -> enviando -> enviada, ou falhou após esgotar as tentativas.
+# O índice único parcial impede dois alertas idênticos (mesma chave) na fila ao mesmo tempo.
+TABELAS_FILA_NOTIFICACOES = [
+    '''CREATE TABLE IF NOT EXISTS notificacoes_fila (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        chave TEXT NOT NULL,
+        destinatarios TEXT NOT NULL,
+        assunto TEXT NOT NULL,
+        conteudo_html TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pendente',
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        proxima_tentativa TIMESTAMP NOT NULL,
+        reservada_em TIMESTAMP,
+        ultimo_erro TEXT,
+        criada_em TIMESTAMP NOT NULL,
+        enviada_em TIMESTAMP
+    )''',
+    '''CREATE UNIQUE INDEX IF NOT EXISTS idx_notificacoes_fila_chave ON notificacoes_fila (chave)
+        WHERE status IN ('pendente', 'enviando')''',
+    """CREATE INDEX IF NOT EXISTS idx_notificacoes_fila_pendentes ON notificacoes_fila (proxima_tentativa)
+        WHERE status = 'pendente'""",
+]
+
+# Eventos de estoque baixo: o gatilho registra cada produto cuja quantidade
+# (ou estoque mínimo) muda de "acima do mínimo" para "no mínimo ou abaixo",
+# na mesma transação da venda ou do ajuste. O serviço de notificações lê os
+# eventos pendentes (consumido_em nulo) e os marca como consumidos.
+TABELA_EVENTOS_ESTOQUE = [
+    '''CREATE TABLE IF NOT EXISTS estoque_eventos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        produto_id INTEGER NOT NULL,
+        quantidade_anterior INTEGER,
+        quantidade INTEGER,
+        estoque_minimo INTEGER,
+        criado_em TIMESTAMP NOT NULL,
+        consumido_em TIMESTAMP
+    )''',
+    '''CREATE INDEX IF NOT EXISTS idx_estoque_eventos_pendentes ON estoque_eventos (id)
+        WHERE consumido_em IS NULL''',
+    '''CREATE TRIGGER IF NOT EXISTS produtos_estoque_baixo
+        AFTER UPDATE OF quantidade, estoque_minimo ON produtos
+        WHEN new.estoque_minimo > 0 AND new.quantidade <= new.estoque_minimo
+         AND NOT (old.estoque_minimo > 0 AND old.quantidade <= old.estoque_minimo)
+    BEGIN
+        INSERT INTO estoque_eventos (produto_id, quantidade_anterior, quantidade, estoque_minimo, criado_em)
+        VALUES (new.id, old.quantidade, new.quantidade, new.estoque_minimo, datetime('now', 'localtime'));
+    END''',
+]
+
+# Hora da última execução de cada verificação periódica de notificações
+# (antes gravada no config.json a cada verificação)
+TABELA_ESTADO_NOTIFICACOES = '''CREATE TABLE IF NOT EXISTS notificacoes_estado (
+    verificacao TEXT PRIMARY KEY,
+    ultima_verificacao TIMESTAMP
+)'''
+
+# Acumulam nos resumos as vendas/itens selecionados por {filtro}
+ACUMULAR_RESUMO_PRODUTOS = '''
+    INSERT INTO vendas_resumo_diario (dia, produto_id, quantidade, valor_total)
+    SELECT date(v.data_hora, 'localtime'), i.produto_id, SUM(i.quantidade), SUM(i.subtotal)
+    FROM itens_venda i
+    JOIN vendas v ON v.id = i.venda_id
+    WHERE {filtro}
+    GROUP BY 1, 2
+    ON CONFLICT (dia, produto_id) DO UPDATE SET
+        quantidade = quantidade + excluded.quantidade,
+        valor_total = valor_total + excluded.valor_total
+'''
+
+ACUMULAR_RESUMO_PAGAMENTOS = '''
+    INSERT INTO vendas_resumo_pagamentos (dia, forma_pagamento, num_vendas, valor_total)
+    SELECT date(v.data_hora, 'localtime'), COALESCE(v.forma_pagamento, ''), COUNT(*), SUM(v.valor_total)
+    FROM vendas v
+    WHERE {filtro}
+    GROUP BY 1, 2
+    ON CONFLICT (dia, forma_pagamento) DO UPDATE SET
+        num_vendas = num_vendas + excluded.num_vendas,
+        valor_total = valor_total + excluded.valor_total
+'''
+
+ACUMULAR_RESUMO_CLIENTES = '''
+    INSERT INTO vendas_resumo_clientes (dia, cliente_id, compras, valor_total)
+    SELECT date(v.data_hora, 'localtime'), COALESCE(v.cliente_id, 0), COUNT(*), SUM(v.valor_total)
+    FROM vendas v
+    WHERE {filtro}
+    GROUP BY 1, 2
+    ON CONFLICT (dia, cliente_id) DO UPDATE SET
+        compras = compras + excluded.compras,
+        valor_total = valor_total + excluded.valor_total
+'''
+
+def _tabela_existe(conn, nome):
+    """Verifica se uma tabela (ou tabela virtual) existe no banco"""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (nome,)).fetchone() is not None
+
+def _reconstruir_resumo_vendas(conn):
+    """Recalcula do zero os resumos diários a partir de vendas e itens_venda"""
+    for tabela in ('vendas_resumo_diario', 'vendas_resumo_pagamentos', 'vendas_resumo_clientes'):
+        conn.execute(f"DELETE FROM {tabela}")
+
+    conn.execute(ACUMULAR_RESUMO_PRODUTOS.format(filtro="1"))
+    conn.execute(ACUMULAR_RESUMO_PAGAMENTOS.format(filtro="1"))
+    conn.execute(ACUMULAR_RESUMO_CLIENTES.format(filtro="1"))
+
+# Migrações do schema. Cada função recebe a conexão de escrita já dentro da
+# transação da migração (ver database/migracoes.py).
+
+def _migracao_tabelas_base(conn):
+    for sql in TABELAS_BASE:
+        conn.execute(sql)
+
+    # Criar um usuário admin padrão se não existir nenhum
+    # Senha padrão: admin123 (em produção, use hash adequado)
+    if conn.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'").fetchone()[0] == 0:
+        senha_hash = hashlib.sha256("admin123".encode()).hexdigest()
+        conn.execute('''
+        INSERT INTO usuarios (nome, login, senha, email, tipo)
+        VALUES (?, ?, ?, ?, ?)
+        ''', ("Administrador", "admin", senha_hash, "admin@sistema.com", "admin"))
+
+def _migracao_colunas_produtos(conn):
+    """Colunas adicionadas aos produtos depois da primeira versão do sistema"""
+    colunas_existentes = [coluna[1] for coluna in conn.execute("PRAGMA table_info(produtos)")]
+
+    if "codigo_barras" not in colunas_existentes:
+        conn.execute("ALTER TABLE produtos ADD COLUMN codigo_barras TEXT")
+
+    if "estoque_minimo" not in colunas_existentes:
+        conn.execute("ALTER TABLE produtos ADD COLUMN estoque_minimo INTEGER DEFAULT 0")
+
+    if "margem_lucro" not in colunas_existentes:
+        conn.execute("ALTER TABLE produtos ADD COLUMN margem_lucro REAL DEFAULT 30.0")
+
+        # Atualizar a margem de lucro baseado nos preços existentes
+        conn.execute('''
+        UPDATE produtos 
+        SET margem_lucro = ((preco_venda / preco_compra) - 1) * 100
+        WHERE preco_compra > 0 AND preco_venda > 0
+        ''')
+
+def _migracao_indices(conn):
+    """
+    Returns:
+        list: Nomes dos índices que não puderam ser criados como definidos
+    """
+    falhas = []
+
+    # Códigos de barras vazios viram NULL para não violar o índice único
+    conn.execute("UPDATE produtos SET codigo_barras = NULL WHERE TRIM(codigo_barras) = ''")
+
+    for nome, sql in INDICES:
+        try:
+            conn.execute(sql)
+        except sqlite3.IntegrityError:
+            # Códigos de barras duplicados: cria o índice sem restrição de unicidade
+            print(f"Aviso: dados duplicados impedem o índice único {nome}; criando índice simples")
+            conn.execute(sql.replace('UNIQUE INDEX', 'INDEX'))
+            falhas.append(nome)
+    return falhas
+
+def _reverter_indices(conn):
+    for nome, _ in INDICES:
+        conn.execute(f"DROP INDEX IF EXISTS {nome}")
+
+def _migracao_fts(conn):
+    """
+    Pesquisa de texto completo (depende do SQLite compilado com FTS5)
+
+    Returns:
+        list: ['produtos_fts'] se o FTS5 não estiver disponível
+    """
+    try:
+        for sql in FTS_PRODUTOS:
+            conn.execute(sql)
+        conn.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+        # Pesos da relevância padrão (rank): nome, descrição, código de barras
+        conn.execute("INSERT INTO produtos_fts (produtos_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0)')")
+    except sqlite3.OperationalError as e:
+        print(f"Aviso: pesquisa de texto completo indisponível ({e}); usando LIKE")
+        return ['produtos_fts']
+    return []
+
+def _reverter_fts(conn):
+    for gatilho in ('produtos_fts_ai', 'produtos_fts_ad', 'produtos_fts_au'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {gatilho}")
+    conn.execute("DROP TABLE IF EXISTS produtos_fts")
+
+def _migracao_resumo_vendas(conn):
+    # Preenchidos a partir das vendas existentes na primeira vez que as tabelas são criadas
+    resumo_novo = not _tabela_existe(conn, 'vendas_resumo_diario')
+    for sql in TABELAS_RESUMO_VENDAS:
+        conn.execute(sql)
+    if resumo_novo:
+        _reconstruir_resumo_vendas(conn)
+
+def _reverter_resumo_vendas(conn):
+    for tabela in ('vendas_resumo_diario', 'vendas_resumo_pagamentos', 'vendas_resumo_clientes'):
+        conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+
+def _migracao_registro_alteracoes(conn):
+    for sql in TABELAS_REGISTRO_ALTERACOES_SQL:
+        conn.execute(sql)
+
+    # Um gatilho por operação em cada tabela registrada
+    for tabela in TABELAS_REGISTRO_ALTERACOES:
+        for operacao, linha in (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old')):
+            conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {tabela}_backup_{operacao.lower()} AFTER {operacao} ON {tabela} BEGIN
+                INSERT INTO backup_alteracoes (tabela, linha_id) VALUES ('{tabela}', {linha}.id);
+            END''')
+
+def _reverter_registro_alteracoes(conn):
+    for tabela in TABELAS_REGISTRO_ALTERACOES:
+        for operacao in ('insert', 'update', 'delete'):
+            conn.execute(f"DROP TRIGGER IF EXISTS {tabela}_backup_{operacao}")
+    conn.execute("DROP TABLE IF EXISTS backup_alteracoes")
+    conn.execute("DROP TABLE IF EXISTS backup_estado")
+
+def _migracao_fila_notificacoes(conn):
+    for sql in TABELAS_FILA_NOTIFICACOES:
+        conn.execute(sql)
+
+def _reverter_fila_notificacoes(conn):
+    conn.execute("DROP TABLE IF EXISTS notificacoes_fila")
+
+def _migracao_texto_notificacoes(conn):
+    """Alternativa em texto simples dos emails enfileirados"""
+    colunas = [coluna[1] for coluna in conn.execute("PRAGMA table_info(notificacoes_fila)")]
+    if "conteudo_texto" not in colunas:
+        conn.execute("ALTER TABLE notificacoes_fila ADD COLUMN conteudo_texto TEXT")
+
+def _reverter_texto_notificacoes(conn):
+    conn.execute("ALTER TABLE notificacoes_fila DROP COLUMN conteudo_texto")
+
+def _migracao_estado_notificacoes(conn):
+    conn.execute(TABELA_ESTADO_NOTIFICACOES)
+
+def _reverter_estado_notificacoes(conn):
+    conn.execute("DROP TABLE IF EXISTS notificacoes_estado")
+
+def _migracao_eventos_estoque(conn):
+    for sql in TABELA_EVENTOS_ESTOQUE:
+        conn.execute(sql)
+
+def _reverter_eventos_estoque(conn):
+    conn.execute("DROP TRIGGER IF EXISTS produtos_estoque_baixo")
+    conn.execute("DROP TABLE IF EXISTS estoque_eventos")
+
+# Em ordem; a versão corrente do banco fica em PRAGMA user_version. Bancos
+# criados antes do motor de migrações já estão na versão 4 (conjunto de
+# índices e FTS); as migrações 1 a 4 são idempotentes para cobrir bancos
+# mais antigos.
+MIGRACOES = [
+    Migracao(1, "Tabelas principais e usuário admin", _migracao_tabelas_base, None),
+    Migracao(2, "Colunas de código de barras, estoque mínimo e margem dos produtos",
+             _migracao_colunas_produtos, None),
+    Migracao(3, "Índices das consultas frequentes", _migracao_indices, _reverter_indices),
+    Migracao(4, "Pesquisa de texto completo dos produtos", _migracao_fts, _reverter_fts),
+    Migracao(5, "Resumos diários de vendas do dashboard", _migracao_resumo_vendas, _reverter_resumo_vendas),
+    Migracao(6, "Registro de alterações para os backups incrementais",
+             _migracao_registro_alteracoes, _reverter_registro_alteracoes),
+    Migracao(7, "Fila persistente de notificações por email",
+             _migracao_fila_notificacoes, _reverter_fila_notificacoes),
+    Migracao(8, "Texto simples dos emails de notificação",
+             _migracao_texto_notificacoes, _reverter_texto_notificacoes),
+    Migracao(9, "Estado das verificações periódicas de notificações",
+             _migracao_estado_notificacoes, _reverter_estado_notificacoes),
+    Migracao(10, "Eventos de estoque baixo registrados por gatilho",
+             _migracao_eventos_estoque, _reverter_eventos_estoque),
+]
+
+VERSAO_SCHEMA = MIGRACOES[-1].versao
+
+class CodigoBarrasDuplicado(ValueError):
+    """Código de barras já cadastrado em outro produto (índice único idx_produtos_codigo_barras)"""
 
 class DatabaseManager:
-    def __init__(self, db_file='database/estoque.db'):
+    # Perfil de PRAGMAs aplicado em todas as conexões do pool.
+    # WAL permite que leitores (dashboard, script de notificações) não bloqueiem
+    # a gravação das vendas; o checkpoint automático roda a cada ~1000 páginas.
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,        # ~16 MB por conexão
+        'mmap_size': 268435456,      # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,        # ms
+        'wal_autocheckpoint': 1000,  # páginas
+    }
+
+    def __init__(self, db_file='database/estoque.db', leitores=2, pragmas=None):
         self.db_path = db_file 
+        self.num_leitores = leitores
+        # Permite sobrescrever itens do perfil padrão (ex.: {'synchronous': 'FULL'})
+        self.pragmas = {**self.PRAGMAS, **(pragmas or {})}
+        self.pool = None
+        self._fts_disponivel = None
+        # Incrementado a cada alteração de cadastro de produtos (invalida caches)
+        self.versao_produtos = 0
+        # Incrementado a cada alteração de promoções (invalida o resolvedor de preços)
+        self.versao_promocoes = 0
+        # Incrementado a cada mudança de cadastro ou de quantidade em estoque, inclusive
+        # por vendas (invalida os alertas de vencimento e estoque baixo)
+        self.versao_estoque = 0
 
         # Garantir que o diretório exista
         os.makedirs(os.path.dirname(db_file), exist_ok=True)
         
-        # Conectar ao banco de dados
-        self.conn = sqlite3.connect(db_file)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+        # Conectar ao banco de dados (pool com um escritor e N leitores)
+        with perfil.medir('db.conectar'):
+            self.connect_to_database()
         
         # Inicializar as tabelas
-        self.criar_tabelas()
-        
+        with perfil.medir('db.criar_tabelas'):
+            self.criar_tabelas()
+
     def connect_to_database(self):
         """Conecta ou reconecta ao banco de dados"""
         try:
-            # Fechar conexão anterior se existir
-            if hasattr(self, 'conn') and self.conn:
-                try:
-                    self.conn.close()
-                except:
-                    pass
-            
-            # Estabelecer nova conexão
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # Para acessar colunas pelo nome
-            self.cursor = self.conn.cursor()
+            # Fechar conexões anteriores se existirem
+            if self.pool:
+                self.pool.fechar()
+            
+            # Estabelecer novo pool de conexões
+            self.pool = ConnectionPool(self.db_path, leitores=self.num_leitores,
+                                       pragmas=self.pragmas)
             return True
         except Exception as e:
             print(f"Erro ao conectar ao banco de dados: {e}")
@@ -39,273 +563,424 @@ class DatabaseManager:
     
     def is_connection_active(self):
         """Verifica se a conexão com o banco de dados está ativa"""
-        try:
-            # Tenta executar uma query simples para verificar a conexão
-            self.cursor.execute("SELECT 1")
-            return True
-        except (sqlite3.ProgrammingError, sqlite3.OperationalError):
-            # Se ocorrer erro, a conexão está fechada
-            return False
+        return self.pool is not None and ConnectionPool.conexao_ativa(self.pool.escritor)
     
     def ensure_connection(self):
-        """Garante que a conexão está ativa antes de executar operações"""
-        if not self.is_connection_active():
+        """Garante que as conexões do pool estão ativas antes de executar operações"""
+        if self.pool is None or not self.pool.verificar_saude():
             return self.connect_to_database()
         return True
+
+    def checkpoint(self, modo='PASSIVE'):
+        """
+        Executa um checkpoint do WAL
+
+        Args:
+            modo (str): PASSIVE (não bloqueia), FULL, RESTART ou TRUNCATE
+
+        Returns:
+            bool: True se o checkpoint foi concluído
+        """
+        try:
+            return self.pool.checkpoint(modo)
+        except Exception as e:
+            print(f"Erro ao executar checkpoint: {e}")
+            return False
     
     def criar_tabelas(self):
-        # Tabela de Produtos (com novos campos)
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS produtos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            codigo_barras TEXT,
-            nome TEXT NOT NULL,
-            descricao TEXT,
-            quantidade INTEGER DEFAULT 0,
-            estoque_minimo INTEGER DEFAULT 0,
-            preco_compra REAL,
-            margem_lucro REAL,
-            preco_venda REAL,
-            data_validade DATE,
-            localizacao TEXT,
-            fornecedor_id INTEGER,
-            data_cadastro DATE DEFAULT CURRENT_DATE,
-            FOREIGN KEY (fornecedor_id) REFERENCES fornecedores (id)
-        )
-        ''')
-        
-        # Tabela de Fornecedores
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fornecedores (
-             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            representante TEXT,
-            frequencia_compra TEXT,
-            telefone TEXT,
-            email TEXT,
-            endereco TEXT,
-            contato TEXT,
-            data_cadastro DATE DEFAULT CURRENT_DATE
-        )
-        ''')
-        
-        # Tabela de Clientes
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS clientes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            documento TEXT UNIQUE,
-            telefone TEXT,
-            email TEXT,
-            endereco TEXT,
-            data_cadastro DATE DEFAULT CURRENT_DATE
-        )
-        ''')
-        
-        # Tabela de Promoções
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS promocoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            produto_id INTEGER,
-            preco_antigo REAL,
-            preco_promocional REAL,
-            data_inicio DATE,
-            data_fim DATE,
-            descricao TEXT,
-            FOREIGN KEY (produto_id) REFERENCES produtos (id)
-        )
-        ''')
-        
-        # Tabela de Caixas
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS caixas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            data_fechamento TIMESTAMP,
-            saldo_inicial REAL NOT NULL,
-            saldo_final_sistema REAL,
-            saldo_final_informado REAL,
-            diferenca REAL,
-            operador TEXT,
-            status TEXT DEFAULT 'Aberto',
-            observacao TEXT
-        )
-        ''')
-        
-        # Tabela de Movimentos de Caixa
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS movimentos_caixa (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            caixa_id INTEGER NOT NULL,
-            data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            tipo TEXT NOT NULL, -- 'Entrada' ou 'Saída'
-            descricao TEXT NOT NULL,
-            valor REAL NOT NULL,
-            forma_pagamento TEXT,
-            referencia_id INTEGER, -- ID da venda ou outra entidade
-            tipo_referencia TEXT, -- 'Venda', 'Despesa', etc.
-            operador TEXT,
-            observacao TEXT,
-            FOREIGN KEY (caixa_id) REFERENCES caixas (id)
-        )
-        ''')
-        
-        # Tabela de Vendas
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS vendas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            cliente_id INTEGER,
-            valor_total REAL NOT NULL,
-            desconto REAL DEFAULT 0,
-            forma_pagamento TEXT,
-            parcelas INTEGER DEFAULT 1,
-            observacao TEXT,
-            status TEXT DEFAULT 'Concluída',
-            operador TEXT,
-            FOREIGN KEY (cliente_id) REFERENCES clientes (id)
-        )
-        ''')
-        
-        # Tabela de Itens de Venda
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS itens_venda (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            venda_id INTEGER NOT NULL,
-            produto_id INTEGER NOT NULL,
-            quantidade INTEGER NOT NULL,
-            preco_unitario REAL NOT NULL,
-            subtotal REAL NOT NULL,
-            FOREIGN KEY (venda_id) REFERENCES vendas (id),
-            FOREIGN KEY (produto_id) REFERENCES produtos (id)
-        )
-        ''')
+        """
+        Leva o schema à versão atual. Com o banco já atualizado, o custo é
+        apenas a leitura de PRAGMA user_version.
 
-       # Tabela de Usuários (nova)
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            login TEXT NOT NULL UNIQUE,
-            senha TEXT NOT NULL,
-            email TEXT UNIQUE,
-            tipo TEXT DEFAULT 'comum', -- 'admin' ou 'comum'
-            ativo INTEGER DEFAULT 1,   -- 0 para inativo, 1 para ativo
-            data_cadastro DATE DEFAULT CURRENT_DATE,
-            ultimo_acesso TIMESTAMP
-        )
-        ''')
-        
-        # Verificar se existe pelo menos um usuário admin
-        self.cursor.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'")
-        count = self.cursor.fetchone()[0]
-        
-        if count == 0:
-            # Criar um usuário admin padrão se não existir nenhum
-            # Senha padrão: admin123 (em produção, use hash adequado)
-            import hashlib
-            senha_hash = hashlib.sha256("admin123".encode()).hexdigest()
-            
-            self.cursor.execute('''
-            INSERT INTO usuarios (nome, login, senha, email, tipo)
-            VALUES (?, ?, ?, ?, ?)
-            ''', ("Administrador", "admin", senha_hash, "admin@sistema.com", "admin"))
-        
-        # Commit das mudanças
-        self.conn.commit()
+        Returns:
+            list: Versões das migrações aplicadas
+        """
+        return self.migrar()
+
+    def versao_schema(self):
+        """Retorna a versão do schema gravada no banco"""
+        with self.pool.escrita() as conn:
+            return versao_schema(conn)
+
+    def migrar(self, destino=None):
+        """
+        Aplica as migrações pendentes, cada uma em sua própria transação
+
+        Args:
+            destino (int): Versão final (padrão: VERSAO_SCHEMA)
+
+        Returns:
+            list: Versões das migrações aplicadas
+        """
+        with self.pool.escrita() as conn:
+            aplicadas = []
+            if versao_schema(conn) < (VERSAO_SCHEMA if destino is None else destino):
+                aplicadas = aplicar_migracoes(conn, MIGRACOES, destino)
+            self._verificar_fts(conn)
+
+        return aplicadas
+
+    def reverter_migracoes(self, destino):
+        """
+        Reverte as migrações posteriores à versão destino
+
+        Args:
+            destino (int): Versão em que o banco deve ficar
+
+        Returns:
+            list: Versões revertidas
+
+        Raises:
+            ErroMigracao: Se alguma das migrações não puder ser revertida
+        """
+        with self.pool.escrita() as conn:
+            revertidas = reverter_migracoes(conn, MIGRACOES, destino)
+            self._verificar_fts(conn)
+
+        return revertidas
+
+    def criar_indices(self, forcar=False):
+        """
+        Cria o conjunto de índices secundários e o índice de texto completo
+
+        Args:
+            forcar (bool): Recria os índices mesmo que a versão esteja atualizada
+
+        Returns:
+            list: Nomes dos índices que não puderam ser criados
+        """
+        if not forcar:
+            self.migrar()
+            return []
+
+        with self.pool.escrita() as conn:
+            falhas = _migracao_indices(conn) + _migracao_fts(conn)
+            self._verificar_fts(conn)
+
+        return falhas
+
+    @property
+    def fts_disponivel(self):
+        """
+        Indica se o índice de texto completo existe. O valor é atualizado pelas
+        migrações na conexão que elas já usam; pode ser lido dentro de um bloco
+        pool.leitura() sem pedir outra conexão ao pool.
+        """
+        if self._fts_disponivel is None:
+            with self.pool.escrita() as conn:
+                self._verificar_fts(conn)
+        return self._fts_disponivel
+
+    def _verificar_fts(self, conn):
+        """Atualiza fts_disponivel usando uma conexão já obtida do pool"""
+        self._fts_disponivel = _tabela_existe(conn, 'produtos_fts')
     
     # Métodos para Produtos (atualizados)
     def adicionar_produto(self, codigo_barras, nome, descricao, quantidade, estoque_minimo,
                         preco_compra, margem_lucro, preco_venda, 
                         data_validade, localizacao, fornecedor_id):
-        self.cursor.execute('''
-        INSERT INTO produtos (
-            codigo_barras, nome, descricao, quantidade, estoque_minimo,
-            preco_compra, margem_lucro, preco_venda, 
-            data_validade, localizacao, fornecedor_id
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            codigo_barras, nome, descricao, quantidade, estoque_minimo,
-            preco_compra, margem_lucro, preco_venda, 
-            data_validade, localizacao, fornecedor_id
-        ))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        # Código de barras vazio é gravado como NULL (índice único)
+        codigo_barras = codigo_barras or None
+        with self._gravar_produto(codigo_barras) as conn:
+            cursor = conn.execute('''
+            INSERT INTO produtos (
+                codigo_barras, nome, descricao, quantidade, estoque_minimo,
+                preco_compra, margem_lucro, preco_venda, 
+                data_validade, localizacao, fornecedor_id
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                codigo_barras, nome, descricao, quantidade, estoque_minimo,
+                preco_compra, margem_lucro, preco_venda, 
+                data_validade, localizacao, fornecedor_id
+            ))
+        self.versao_produtos += 1
+        self.versao_estoque += 1
+        return cursor.lastrowid
 
     def atualizar_produto(self, id, codigo_barras, nome, descricao, quantidade, estoque_minimo,
                         preco_compra, margem_lucro, preco_venda, 
                         data_validade, localizacao, fornecedor_id):
-        self.cursor.execute('''
-        UPDATE produtos
-        SET codigo_barras = ?, nome = ?, descricao = ?, quantidade = ?, estoque_minimo = ?,
-            preco_compra = ?, margem_lucro = ?, preco_venda = ?,
-            data_validade = ?, localizacao = ?, fornecedor_id = ?
-        WHERE id = ?
-        ''', (
-            codigo_barras, nome, descricao, quantidade, estoque_minimo,
-            preco_compra, margem_lucro, preco_venda,
-            data_validade, localizacao, fornecedor_id, id
-        ))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        codigo_barras = codigo_barras or None
+        with self._gravar_produto(codigo_barras) as conn:
+            cursor = conn.execute('''
+            UPDATE produtos
+            SET codigo_barras = ?, nome = ?, descricao = ?, quantidade = ?, estoque_minimo = ?,
+                preco_compra = ?, margem_lucro = ?, preco_venda = ?,
+                data_validade = ?, localizacao = ?, fornecedor_id = ?
+            WHERE id = ?
+            ''', (
+                codigo_barras, nome, descricao, quantidade, estoque_minimo,
+                preco_compra, margem_lucro, preco_venda,
+                data_validade, localizacao, fornecedor_id, id
+            ))
+        self.versao_produtos += 1
+        self.versao_estoque += 1
+        return cursor.rowcount > 0
+
+    @contextmanager
+    def _gravar_produto(self, codigo_barras):
+        """
+        Transação de escrita do cadastro de produtos; o código de barras
+        repetido vira CodigoBarrasDuplicado (a transação é desfeita pelo pool)
+        """
+        try:
+            with self.pool.escrita() as conn:
+                yield conn
+        except sqlite3.IntegrityError as e:
+            if 'codigo_barras' in str(e):
+                raise CodigoBarrasDuplicado(f"Código de barras já cadastrado: {codigo_barras}") from e
+            raise
 
     def excluir_produto(self, id):
-        self.cursor.execute('DELETE FROM produtos WHERE id = ?', (id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('DELETE FROM produtos WHERE id = ?', (id,))
+        self.versao_produtos += 1
+        self.versao_estoque += 1
+        return cursor.rowcount > 0
 
     def obter_produto(self, id):
-        self.cursor.execute('SELECT * FROM produtos WHERE id = ?', (id,))
-        return self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            return conn.execute('SELECT * FROM produtos WHERE id = ?', (id,)).fetchone()
 
     def listar_produtos(self, filtro=None):
+        if filtro:
+            return self.pesquisar_produtos(filtro)
+        
         query = 'SELECT p.*, f.nome as fornecedor_nome FROM produtos p LEFT JOIN fornecedores f ON p.fornecedor_id = f.id'
         
-        if filtro:
-            query += f" WHERE p.nome LIKE '%{filtro}%' OR p.descricao LIKE '%{filtro}%' OR p.codigo_barras LIKE '%{filtro}%'"
+        # Conexão de leitura do pool: pode ser chamado fora da thread da interface
+        with self.pool.leitura() as conn:
+            return conn.execute(query).fetchall()
+
+    @staticmethod
+    def _expressao_fts(termo):
+        """
+        Converte o texto digitado em uma expressão MATCH do FTS5: cada palavra
+        vira um prefixo entre aspas, o que neutraliza a sintaxe do FTS
+        (aspas, parênteses, operadores) digitada pelo usuário
+        """
+        palavras = re.findall(r'\w+', termo or '')
+        return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+    def pesquisar_produtos(self, termo, limite=None, offset=0):
+        """
+        Pesquisa produtos por nome, descrição ou código de barras, ordenados
+        por relevância (o nome pesa mais que o código e a descrição)
+
+        Args:
+            termo (str): Texto digitado (prefixo, sem distinção de acentos)
+            limite (int): Quantidade máxima de resultados (None para todos)
+            offset (int): Quantidade de resultados a pular (paginação)
+
+        Returns:
+            list: Produtos encontrados, com fornecedor_nome
+        """
+        expressao = self._expressao_fts(termo)
+        if not expressao:
+            return self.listar_produtos()
+        
+        limite = -1 if limite is None else limite
+        
+        with self.pool.leitura() as conn:
+            if self.fts_disponivel:
+                return conn.execute('''
+                SELECT p.*, f.nome as fornecedor_nome
+                FROM produtos_fts
+                JOIN produtos p ON p.id = produtos_fts.rowid
+                LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+                WHERE produtos_fts MATCH ?
+                ORDER BY bm25(produtos_fts, 10.0, 1.0, 5.0)
+                LIMIT ? OFFSET ?
+                ''', (expressao, limite, offset)).fetchall()
+            
+            # Sem FTS5: LIKE parametrizado
+            padrao = f"%{termo}%"
+            return conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome
+            FROM produtos p
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.nome LIKE ? OR p.descricao LIKE ? OR p.codigo_barras LIKE ?
+            ORDER BY p.nome
+            LIMIT ? OFFSET ?
+            ''', (padrao, padrao, padrao, limite, offset)).fetchall()
+
+    def buscar_produtos_por_nome(self, texto, limite=10):
+        """
+        Busca rápida de produtos para o caixa, em camadas:
+        1) código de barras exato (encerra a busca), 2) nome começando pelo texto,
+        3) prefixo de todas as palavras do nome (sem distinção de acentos),
+        4) busca aproximada (qualquer palavra, pelos 3 primeiros caracteres)
+
+        As camadas de texto completo ordenam por relevância apenas um lote
+        limitado de candidatos (CANDIDATOS_BUSCA), para que o custo não cresça
+        com o tamanho do catálogo.
+
+        Args:
+            texto (str): Texto digitado ou código lido
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            list: Até `limite` produtos (dicionários), do mais relevante ao menos
+        """
+        texto = (texto or '').strip()
+        if not texto:
+            return []
+        
+        encontrados = {}
         
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        def acrescentar(linhas):
+            for linha in linhas:
+                if len(encontrados) >= limite:
+                    break
+                encontrados.setdefault(linha['id'], dict(linha))
+        
+        with self.pool.leitura() as conn:
+            # 1) Código de barras exato (índice único): leitura do scanner,
+            #    não há o que complementar
+            acrescentar(conn.execute(
+                "SELECT * FROM produtos WHERE codigo_barras = ?", (texto,)
+            ).fetchall())
+            if encontrados:
+                return list(encontrados.values())
+            
+            # 2) Nome começando pelo texto (índice NOCASE; curingas do LIKE
+            #    digitados pelo usuário impediriam o uso do índice)
+            if len(encontrados) < limite and '%' not in texto and '_' not in texto:
+                acrescentar(conn.execute('''
+                SELECT * FROM produtos
+                WHERE nome LIKE ?
+                ORDER BY nome COLLATE NOCASE
+                LIMIT ?
+                ''', (f"{texto}%", limite)).fetchall())
+            
+            palavras = re.findall(r'\w+', texto)
+            if not palavras or len(encontrados) >= limite:
+                return list(encontrados.values())
+            
+            if not self.fts_disponivel:
+                acrescentar(conn.execute(
+                    "SELECT * FROM produtos WHERE nome LIKE ? ORDER BY nome LIMIT ?",
+                    (f"%{texto}%", limite)
+                ).fetchall())
+                return list(encontrados.values())
+            
+            consulta_fts = '''
+            SELECT p.*
+            FROM (
+                SELECT rowid, rank FROM produtos_fts
+                WHERE produtos_fts MATCH ?
+                LIMIT ?
+            ) AS r
+            JOIN produtos p ON p.id = r.rowid
+            ORDER BY r.rank
+            LIMIT ?
+            '''
+            
+            # 3) Todas as palavras como prefixo no nome
+            expressao = 'nome : (' + ' '.join(f'"{p}"*' for p in palavras) + ')'
+            acrescentar(conn.execute(
+                consulta_fts, (expressao, CANDIDATOS_BUSCA, limite)
+            ).fetchall())
+            
+            if len(encontrados) >= limite:
+                return list(encontrados.values())
+            
+            # 4) Aproximada: qualquer palavra, em qualquer coluna, pelo prefixo
+            #    de até 3 caracteres (tolera erros de digitação no fim da palavra)
+            expressao = ' OR '.join(f'"{p[:3]}"*' for p in palavras)
+            acrescentar(conn.execute(
+                consulta_fts, (expressao, CANDIDATOS_BUSCA, limite * 2)
+            ).fetchall())
+        
+        return list(encontrados.values())
 
     def verificar_produtos_vencendo(self, dias=30):
         data_limite = (datetime.now() + timedelta(days=dias)).strftime('%Y-%m-%d')
         data_hoje = datetime.now().strftime('%Y-%m-%d')
         
-        self.cursor.execute('''
-        SELECT p.*, f.nome as fornecedor_nome 
-        FROM produtos p 
-        LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-        WHERE p.data_validade <= ? AND p.data_validade >= ?
-        ORDER BY p.data_validade
-        ''', (data_limite, data_hoje))
-        
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome 
+            FROM produtos p 
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.data_validade <= ? AND p.data_validade >= ?
+            ORDER BY p.data_validade
+            ''', (data_limite, data_hoje)).fetchall()
 
     def verificar_produtos_vencidos(self):
         data_hoje = datetime.now().strftime('%Y-%m-%d')
         
-        self.cursor.execute('''
-        SELECT p.*, f.nome as fornecedor_nome 
-        FROM produtos p 
-        LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-        WHERE p.data_validade < ?
-        ORDER BY p.data_validade
-        ''', (data_hoje,))
-        
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome 
+            FROM produtos p 
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.data_validade < ?
+            ORDER BY p.data_validade
+            ''', (data_hoje,)).fetchall()
 
     def verificar_produtos_estoque_baixo(self):
         """Verifica produtos com estoque abaixo do mínimo definido."""
-        self.cursor.execute('''
-        SELECT p.*, f.nome as fornecedor_nome 
-        FROM produtos p 
-        LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-        WHERE p.quantidade <= p.estoque_minimo AND p.estoque_minimo > 0
-        ORDER BY p.nome
-        ''')
+        with self.pool.leitura() as conn:
+            return conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome 
+            FROM produtos p 
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.quantidade <= p.estoque_minimo AND p.estoque_minimo > 0
+            ORDER BY p.nome
+            ''').fetchall()
+
+    def eventos_estoque_baixo_pendentes(self):
+        """
+        Produtos que cruzaram o estoque mínimo desde o último consumo dos eventos
+        e continuam no mínimo ou abaixo (os já repostos são ignorados)
+        
+        Returns:
+            tuple: (id do último evento considerado ou None, lista de produtos)
+        """
+        with self.pool.leitura() as conn:
+            ultimo_id = conn.execute(
+                "SELECT MAX(id) FROM estoque_eventos WHERE consumido_em IS NULL"
+            ).fetchone()[0]
+            if ultimo_id is None:
+                return None, []
+            
+            produtos = conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome 
+            FROM produtos p 
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.id IN (
+                SELECT produto_id FROM estoque_eventos
+                WHERE consumido_em IS NULL AND id <= ?
+            )
+            AND p.quantidade <= p.estoque_minimo AND p.estoque_minimo > 0
+            ORDER BY p.nome
+            ''', (ultimo_id,)).fetchall()
+        return ultimo_id, produtos
+    
+    def consumir_eventos_estoque(self, ate_id, manter_dias=30, conn=None):
+        """
+        Marca como consumidos os eventos de estoque baixo até o id informado
+        e remove os consumidos há mais de manter_dias
         
-        return self.cursor.fetchall()
+        Args:
+            ate_id (int): Id do último evento a consumir
+            manter_dias (int): Dias que os eventos consumidos ficam guardados
+            conn: Conexão de uma transação já aberta com pool.escrita() (opcional)
+        
+        Returns:
+            int: Quantidade de eventos consumidos
+        """
+        agora = datetime.now()
+        limite = (agora - timedelta(days=manter_dias)).strftime('%Y-%m-%d %H:%M:%S')
+        with nullcontext(conn) if conn is not None else self.pool.escrita() as conn:
+            consumidos = conn.execute('''
+            UPDATE estoque_eventos SET consumido_em = ?
+            WHERE consumido_em IS NULL AND id <= ?
+            ''', (agora.strftime('%Y-%m-%d %H:%M:%S'), ate_id)).rowcount
+            conn.execute("DELETE FROM estoque_eventos WHERE consumido_em < ?", (limite,))
+        return consumidos
 
     def filtrar_produtos(self, filtro_estoque, filtro_vencimento):
         """Filtra produtos por nível de estoque e data de vencimento."""
@@ -344,36 +1019,15 @@ class DatabaseManager:
         
         query += " ORDER BY p.nome"
         
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute(query, params).fetchall()
 
     # Método para migrar a tabela existente para a nova estrutura
     def migrar_tabela_produtos(self):
         """Migra a tabela de produtos para incluir os novos campos."""
         try:
-            # Verificar se a coluna código de barras já existe
-            self.cursor.execute("PRAGMA table_info(produtos)")
-            colunas = self.cursor.fetchall()
-            colunas_existentes = [coluna[1] for coluna in colunas]
-            
-            # Adicionar novas colunas se necessário
-            if "codigo_barras" not in colunas_existentes:
-                self.cursor.execute("ALTER TABLE produtos ADD COLUMN codigo_barras TEXT")
-            
-            if "estoque_minimo" not in colunas_existentes:
-                self.cursor.execute("ALTER TABLE produtos ADD COLUMN estoque_minimo INTEGER DEFAULT 0")
-            
-            if "margem_lucro" not in colunas_existentes:
-                self.cursor.execute("ALTER TABLE produtos ADD COLUMN margem_lucro REAL DEFAULT 30.0")
-                
-                # Atualizar a margem de lucro baseado nos preços existentes
-                self.cursor.execute('''
-                UPDATE produtos 
-                SET margem_lucro = ((preco_venda / preco_compra) - 1) * 100
-                WHERE preco_compra > 0 AND preco_venda > 0
-                ''')
-            
-            self.conn.commit()
+            with self.pool.escrita() as conn:
+                _migracao_colunas_produtos(conn)
             return True
         except Exception as e:
             print(f"Erro ao migrar tabela de produtos: {str(e)}")
@@ -381,108 +1035,115 @@ class DatabaseManager:
         
     # Métodos para Fornecedores
     def adicionar_fornecedor(self, nome, representante, frequencia_compra, telefone, email, endereco, contato):
-        self.cursor.execute('''
-        INSERT INTO fornecedores (nome, representante, frequencia_compra, telefone, email, endereco, contato)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (nome, representante, frequencia_compra, telefone, email, endereco, contato))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            INSERT INTO fornecedores (nome, representante, frequencia_compra, telefone, email, endereco, contato)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (nome, representante, frequencia_compra, telefone, email, endereco, contato))
+        return cursor.lastrowid
     
     def atualizar_fornecedor(self, id, nome, representante, frequencia_compra, telefone, email, endereco, contato):
-        self.cursor.execute('''
-        UPDATE fornecedores
-        SET nome = ?, representante = ?, frequencia_compra = ?, telefone = ?, email = ?, endereco = ?, contato = ?
-        WHERE id = ?
-        ''', (nome, representante, frequencia_compra, telefone, email, endereco, contato, id))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            UPDATE fornecedores
+            SET nome = ?, representante = ?, frequencia_compra = ?, telefone = ?, email = ?, endereco = ?, contato = ?
+            WHERE id = ?
+            ''', (nome, representante, frequencia_compra, telefone, email, endereco, contato, id))
+        return cursor.rowcount > 0
     
     def excluir_fornecedor(self, id):
-        self.cursor.execute('DELETE FROM fornecedores WHERE id = ?', (id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('DELETE FROM fornecedores WHERE id = ?', (id,))
+        return cursor.rowcount > 0
     
     def obter_fornecedor(self, id):
-        self.cursor.execute('SELECT * FROM fornecedores WHERE id = ?', (id,))
-        return self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            return conn.execute('SELECT * FROM fornecedores WHERE id = ?', (id,)).fetchone()
     
     def listar_fornecedores(self, filtro=None):
         query = 'SELECT * FROM fornecedores'
+        params = []
         
         if filtro:
-            query += f" WHERE nome LIKE '%{filtro}%' OR representante LIKE '%{filtro}%'"
+            query += " WHERE nome LIKE ? OR representante LIKE ?"
+            params = [f"%{filtro}%", f"%{filtro}%"]
         
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute(query, params).fetchall()
     
     # Métodos para Clientes
     def adicionar_cliente(self, nome, documento, telefone, email, endereco):
-        self.cursor.execute('''
-        INSERT INTO clientes (nome, documento, telefone, email, endereco)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (nome, documento, telefone, email, endereco))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            INSERT INTO clientes (nome, documento, telefone, email, endereco)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (nome, documento, telefone, email, endereco))
+        return cursor.lastrowid
     
     def atualizar_cliente(self, id, nome, documento, telefone, email, endereco):
-        self.cursor.execute('''
-        UPDATE clientes
-        SET nome = ?, documento = ?, telefone = ?, email = ?, endereco = ?
-        WHERE id = ?
-        ''', (nome, documento, telefone, email, endereco, id))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            UPDATE clientes
+            SET nome = ?, documento = ?, telefone = ?, email = ?, endereco = ?
+            WHERE id = ?
+            ''', (nome, documento, telefone, email, endereco, id))
+        return cursor.rowcount > 0
     
     def excluir_cliente(self, id):
-        self.cursor.execute('DELETE FROM clientes WHERE id = ?', (id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('DELETE FROM clientes WHERE id = ?', (id,))
+        return cursor.rowcount > 0
     
     def obter_cliente(self, id):
-        self.cursor.execute('SELECT * FROM clientes WHERE id = ?', (id,))
-        return self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            return conn.execute('SELECT * FROM clientes WHERE id = ?', (id,)).fetchone()
     
     def listar_clientes(self, filtro=None):
         query = 'SELECT * FROM clientes'
+        params = []
         
         if filtro:
-            query += f" WHERE nome LIKE '%{filtro}%' OR documento LIKE '%{filtro}%'"
+            query += " WHERE nome LIKE ? OR documento LIKE ?"
+            params = [f"%{filtro}%", f"%{filtro}%"]
         
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute(query, params).fetchall()
     
     # Métodos para Promoções
     def adicionar_promocao(self, produto_id, preco_antigo, preco_promocional, 
                            data_inicio, data_fim, descricao):
-        self.cursor.execute('''
-        INSERT INTO promocoes (produto_id, preco_antigo, preco_promocional, 
-                               data_inicio, data_fim, descricao)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (produto_id, preco_antigo, preco_promocional, 
-             data_inicio, data_fim, descricao))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            INSERT INTO promocoes (produto_id, preco_antigo, preco_promocional, 
+                                   data_inicio, data_fim, descricao)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (produto_id, preco_antigo, preco_promocional, 
+                 data_inicio, data_fim, descricao))
+        self.versao_promocoes += 1
+        return cursor.lastrowid
     
     def atualizar_promocao(self, id, produto_id, preco_antigo, preco_promocional, 
                            data_inicio, data_fim, descricao):
-        self.cursor.execute('''
-        UPDATE promocoes
-        SET produto_id = ?, preco_antigo = ?, preco_promocional = ?, 
-            data_inicio = ?, data_fim = ?, descricao = ?
-        WHERE id = ?
-        ''', (produto_id, preco_antigo, preco_promocional, 
-             data_inicio, data_fim, descricao, id))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+            UPDATE promocoes
+            SET produto_id = ?, preco_antigo = ?, preco_promocional = ?, 
+                data_inicio = ?, data_fim = ?, descricao = ?
+            WHERE id = ?
+            ''', (produto_id, preco_antigo, preco_promocional, 
+                 data_inicio, data_fim, descricao, id))
+        self.versao_promocoes += 1
+        return cursor.rowcount > 0
     
     def excluir_promocao(self, id):
-        self.cursor.execute('DELETE FROM promocoes WHERE id = ?', (id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('DELETE FROM promocoes WHERE id = ?', (id,))
+        self.versao_promocoes += 1
+        return cursor.rowcount > 0
     
     def obter_promocao(self, id):
-        self.cursor.execute('SELECT * FROM promocoes WHERE id = ?', (id,))
-        return self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            return conn.execute('SELECT * FROM promocoes WHERE id = ?', (id,)).fetchone()
     
     def listar_promocoes(self, filtro=None):
         query = '''
@@ -491,33 +1152,37 @@ class DatabaseManager:
         LEFT JOIN produtos pr ON p.produto_id = pr.id
         '''
         
-        if filtro:
-            query += f" WHERE pr.nome LIKE '%{filtro}%' OR p.descricao LIKE '%{filtro}%'"
+        params = []
+        expressao = self._expressao_fts(filtro)
+        if expressao and self.fts_disponivel:
+            query += " WHERE p.produto_id IN (SELECT rowid FROM produtos_fts WHERE produtos_fts MATCH ?) OR p.descricao LIKE ?"
+            params = [expressao, f"%{filtro}%"]
+        elif filtro:
+            query += " WHERE pr.nome LIKE ? OR p.descricao LIKE ?"
+            params = [f"%{filtro}%", f"%{filtro}%"]
         
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute(query, params).fetchall()
     
     def listar_promocoes_ativas(self):
         data_hoje = datetime.now().strftime('%Y-%m-%d')
         
-        self.cursor.execute('''
-        SELECT p.*, pr.nome as produto_nome 
-        FROM promocoes p 
-        LEFT JOIN produtos pr ON p.produto_id = pr.id
-        WHERE p.data_inicio <= ? AND p.data_fim >= ?
-        ''', (data_hoje, data_hoje))
-        
-        return self.cursor.fetchall()
+        with self.pool.leitura() as conn:
+            return conn.execute('''
+            SELECT p.*, pr.nome as produto_nome 
+            FROM promocoes p 
+            LEFT JOIN produtos pr ON p.produto_id = pr.id
+            WHERE p.data_inicio <= ? AND p.data_fim >= ?
+            ''', (data_hoje, data_hoje)).fetchall()
     
     # Métodos para Usuários
     def obter_usuario_por_id(self, usuario_id):
         """Retorna os dados de um usuário pelo ID"""
-        self.cursor.execute('''
-        SELECT id, nome, login, email, tipo, data_cadastro, ultimo_acesso
-        FROM usuarios WHERE id = ?
-        ''', (usuario_id,))
-        
-        usuario = self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            usuario = conn.execute('''
+            SELECT id, nome, login, email, tipo, data_cadastro, ultimo_acesso
+            FROM usuarios WHERE id = ?
+            ''', (usuario_id,)).fetchone()
         
         if usuario:
             return dict(usuario)
@@ -528,29 +1193,28 @@ class DatabaseManager:
         """Verifica se o usuário e senha estão corretos"""
         senha_hash = hashlib.sha256(senha.encode()).hexdigest()
         
-        self.cursor.execute('''
-            SELECT * FROM usuarios WHERE login = ? AND senha = ? AND ativo = 1
-        ''', (login, senha))
-        
-        usuario = self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            usuario = conn.execute('''
+                SELECT * FROM usuarios WHERE login = ? AND senha = ? AND ativo = 1
+            ''', (login, senha)).fetchone()
         
         if usuario:
             # Atualizar o campo de último acesso
-            self.cursor.execute('''
-                UPDATE usuarios SET ultimo_acesso = CURRENT_TIMESTAMP WHERE id = ?
-            ''', (usuario['id'],))
-            self.conn.commit()
+            with self.pool.escrita() as conn:
+                conn.execute('''
+                    UPDATE usuarios SET ultimo_acesso = CURRENT_TIMESTAMP WHERE id = ?
+                ''', (usuario['id'],))
             return dict(usuario)
         else:
             return None
 
     def cadastrar_usuario(self, nome, login, senha, email, tipo):
         try:
-            self.cursor.execute("""
-                INSERT INTO usuarios (nome, login, senha, email, tipo)
-                VALUES (?, ?, ?, ?, ?)
-            """, (nome, login, senha, email, tipo))
-            self.conn.commit()
+            with self.pool.escrita() as conn:
+                conn.execute("""
+                    INSERT INTO usuarios (nome, login, senha, email, tipo)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (nome, login, senha, email, tipo))
             return True, "Usuário cadastrado com sucesso!"
         except Exception as e:
             return False, f"Erro ao cadastrar usuário: {str(e)}"
@@ -558,13 +1222,12 @@ class DatabaseManager:
     def listar_usuarios(self):
         """Retorna a lista de todos os usuários"""
         try:
-            self.cursor.execute('''
-                SELECT id, nome, login, email, tipo, ativo, data_cadastro, ultimo_acesso
-                FROM usuarios
-                ORDER BY nome
-            ''')
-            
-            usuarios = self.cursor.fetchall()
+            with self.pool.leitura() as conn:
+                usuarios = conn.execute('''
+                    SELECT id, nome, login, email, tipo, ativo, data_cadastro, ultimo_acesso
+                    FROM usuarios
+                    ORDER BY nome
+                ''').fetchall()
             return [dict(usuario) for usuario in usuarios]
         except Exception as e:
             print(f"Erro ao listar usuários: {str(e)}")
@@ -573,26 +1236,25 @@ class DatabaseManager:
     def excluir_usuario(self, usuario_id):
         """Exclui um usuário pelo ID (ou desativa, se preferir não excluir)"""
         try:
-            # Verificar se não é o último administrador
-            self.cursor.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'")
-            count_admin = self.cursor.fetchone()[0]
-            
-            # Verificar se o usuário a ser excluído é um admin
-            self.cursor.execute("SELECT tipo FROM usuarios WHERE id=?", (usuario_id,))
-            user_tipo = self.cursor.fetchone()
-            
-            if user_tipo and user_tipo['tipo'] == 'admin' and count_admin <= 1:
-                return False, "Não é possível excluir o último administrador do sistema."
-            
-            # Ao invés de excluir, você pode apenas desativar o usuário
-            self.cursor.execute('''
-                UPDATE usuarios SET ativo = 0 WHERE id = ?
-            ''', (usuario_id,))
-            
-            # Se quiser realmente excluir, use:
-            # self.cursor.execute('DELETE FROM usuarios WHERE id = ?', (usuario_id,))
+            # Verificação e alteração na mesma transação de escrita
+            with self.pool.escrita() as conn:
+                # Verificar se não é o último administrador
+                count_admin = conn.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'").fetchone()[0]
+                
+                # Verificar se o usuário a ser excluído é um admin
+                user_tipo = conn.execute("SELECT tipo FROM usuarios WHERE id=?", (usuario_id,)).fetchone()
+                
+                if user_tipo and user_tipo['tipo'] == 'admin' and count_admin <= 1:
+                    return False, "Não é possível excluir o último administrador do sistema."
+                
+                # Ao invés de excluir, você pode apenas desativar o usuário
+                conn.execute('''
+                    UPDATE usuarios SET ativo = 0 WHERE id = ?
+                ''', (usuario_id,))
+                
+                # Se quiser realmente excluir, use:
+                # conn.execute('DELETE FROM usuarios WHERE id = ?', (usuario_id,))
             
-            self.conn.commit()
             return True, "Usuário desativado com sucesso."
         except Exception as e:
             return False, f"Erro ao excluir usuário: {str(e)}"
@@ -600,26 +1262,24 @@ class DatabaseManager:
     def atualizar_usuario(self, usuario_id, nome, login, email, tipo, ativo=1):
         """Atualiza os dados de um usuário"""
         try:
-            # Verificar se não é o último administrador
-            if tipo != 'admin':
-                self.cursor.execute("SELECT tipo FROM usuarios WHERE id=?", (usuario_id,))
-                user_tipo = self.cursor.fetchone()
-                
-                if user_tipo and user_tipo['tipo'] == 'admin':
-                    self.cursor.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'")
-                    count_admin = self.cursor.fetchone()[0]
+            with self.pool.escrita() as conn:
+                # Verificar se não é o último administrador
+                if tipo != 'admin':
+                    user_tipo = conn.execute("SELECT tipo FROM usuarios WHERE id=?", (usuario_id,)).fetchone()
                     
-                    if count_admin <= 1:
-                        return False, "Não é possível remover o nível de administrador do último administrador."
-            
-            # Atualizar os dados
-            self.cursor.execute('''
-                UPDATE usuarios 
-                SET nome = ?, login = ?, email = ?, tipo = ?, ativo = ?
-                WHERE id = ?
-            ''', (nome, login, email, tipo, ativo, usuario_id))
+                    if user_tipo and user_tipo['tipo'] == 'admin':
+                        count_admin = conn.execute("SELECT COUNT(*) FROM usuarios WHERE tipo='admin'").fetchone()[0]
+                        
+                        if count_admin <= 1:
+                            return False, "Não é possível remover o nível de administrador do último administrador."
+                
+                # Atualizar os dados
+                conn.execute('''
+                    UPDATE usuarios 
+                    SET nome = ?, login = ?, email = ?, tipo = ?, ativo = ?
+                    WHERE id = ?
+                ''', (nome, login, email, tipo, ativo, usuario_id))
             
-            self.conn.commit()
             return True, "Usuário atualizado com sucesso."
         except Exception as e:
             return False, f"Erro ao atualizar usuário: {str(e)}"
@@ -630,46 +1290,78 @@ class DatabaseManager:
             import hashlib
             senha_hash = hashlib.sha256(nova_senha.encode()).hexdigest()
             
-            self.cursor.execute('''
-                UPDATE usuarios SET senha = ? WHERE id = ?
-            ''', (senha_hash, usuario_id))
+            with self.pool.escrita() as conn:
+                conn.execute('''
+                    UPDATE usuarios SET senha = ? WHERE id = ?
+                ''', (senha_hash, usuario_id))
             
-            self.conn.commit()
             return True, "Senha alterada com sucesso."
         except Exception as e:
             return False, f"Erro ao alterar senha: {str(e)}"
 
+    def verificar_senha_usuario(self, usuario_id, senha):
+        """Verifica se a senha informada é a senha atual do usuário"""
+        senha_hash = hashlib.sha256(senha.encode()).hexdigest()
+        with self.pool.leitura() as conn:
+            return conn.execute('''
+                SELECT id FROM usuarios WHERE id = ? AND senha = ?
+            ''', (usuario_id, senha_hash)).fetchone() is not None
+
+    def atualizar_perfil_usuario(self, usuario_id, nome, email):
+        """Atualiza o nome e o email do próprio usuário (tela de perfil)"""
+        with self.pool.escrita() as conn:
+            cursor = conn.execute('''
+                UPDATE usuarios SET nome = ?, email = ? WHERE id = ?
+            ''', (nome, email, usuario_id))
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def intervalo_utc(data_inicio, data_fim):
+        """
+        Converte um período de datas locais em um intervalo semiaberto de
+        timestamps UTC [início, fim), comparável diretamente com data_hora
+        (gravado com CURRENT_TIMESTAMP) e, portanto, capaz de usar índice
+
+        Args:
+            data_inicio (str): Primeiro dia do período (YYYY-MM-DD, hora local)
+            data_fim (str): Último dia do período, inclusivo (YYYY-MM-DD, hora local)
+
+        Returns:
+            tuple: (inicio_utc, fim_utc) no formato 'YYYY-MM-DD HH:MM:SS'
+        """
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+        fim = datetime.strptime(data_fim, '%Y-%m-%d') + timedelta(days=1)
+        
+        # datetime ingênuo é interpretado como hora local por astimezone()
+        return (inicio.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                fim.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
 
     # Métodos para Caixas
     def abrir_caixa(self, saldo_inicial, operador, observacao=""):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
             
-            # Verificar se já existe um caixa aberto
-            cursor.execute("SELECT id FROM caixas WHERE status = 'Aberto'")
-            if cursor.fetchone():
-                conn.close()
-                return False
+                # Verificar se já existe um caixa aberto
+                cursor.execute("SELECT id FROM caixas WHERE status = 'Aberto'")
+                if cursor.fetchone():
+                    return False
             
-            # Registrar abertura de caixa
-            cursor.execute("""
-                INSERT INTO caixas (saldo_inicial, operador, observacao)
-                VALUES (?, ?, ?)
-            """, (saldo_inicial, operador, observacao))
-            
-            caixa_id = cursor.lastrowid
-            
-            # Registrar movimento de entrada do saldo inicial
-            if saldo_inicial > 0:
+                # Registrar abertura de caixa
                 cursor.execute("""
-                    INSERT INTO movimentos_caixa 
-                    (caixa_id, tipo, descricao, valor, forma_pagamento, operador)
-                    VALUES (?, 'Entrada', 'Saldo Inicial', ?, 'Dinheiro', ?)
-                """, (caixa_id, saldo_inicial, operador))
+                    INSERT INTO caixas (saldo_inicial, operador, observacao)
+                    VALUES (?, ?, ?)
+                """, (saldo_inicial, operador, observacao))
             
-            conn.commit()
-            conn.close()
+                caixa_id = cursor.lastrowid
+            
+                # Registrar movimento de entrada do saldo inicial
+                if saldo_inicial > 0:
+                    cursor.execute("""
+                        INSERT INTO movimentos_caixa 
+                        (caixa_id, tipo, descricao, valor, forma_pagamento, operador)
+                        VALUES (?, 'Entrada', 'Saldo Inicial', ?, 'Dinheiro', ?)
+                    """, (caixa_id, saldo_inicial, operador))
             
             return caixa_id
         except Exception as e:
@@ -678,33 +1370,33 @@ class DatabaseManager:
     
     def fechar_caixa(self, caixa_id, saldo_final_informado, diferenca, operador, observacao=""):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Calcular saldo final do sistema
-            cursor.execute("""
-                SELECT 
-                    SUM(CASE WHEN tipo = 'Entrada' THEN valor ELSE -valor END) 
-                FROM movimentos_caixa 
-                WHERE caixa_id = ?
-            """, (caixa_id,))
-            
-            saldo_final_sistema = cursor.fetchone()[0] or 0
-            
-            # Atualizar registro do caixa
-            cursor.execute("""
-                UPDATE caixas SET 
-                data_fechamento = CURRENT_TIMESTAMP,
-                saldo_final_sistema = ?,
-                saldo_final_informado = ?,
-                diferenca = ?,
-                status = 'Fechado',
-                observacao = ?
-                WHERE id = ?
-            """, (saldo_final_sistema, saldo_final_informado, diferenca, observacao, caixa_id))
-            
-            conn.commit()
-            conn.close()
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
+            
+                # Calcular saldo final do sistema
+                cursor.execute("""
+                    SELECT 
+                        SUM(CASE WHEN tipo = 'Entrada' THEN valor ELSE -valor END) 
+                    FROM movimentos_caixa 
+                    WHERE caixa_id = ?
+                """, (caixa_id,))
+            
+                saldo_final_sistema = cursor.fetchone()[0] or 0
+            
+                # Atualizar registro do caixa
+                cursor.execute("""
+                    UPDATE caixas SET 
+                    data_fechamento = CURRENT_TIMESTAMP,
+                    saldo_final_sistema = ?,
+                    saldo_final_informado = ?,
+                    diferenca = ?,
+                    status = 'Fechado',
+                    observacao = ?
+                    WHERE id = ?
+                """, (saldo_final_sistema, saldo_final_informado, diferenca, observacao, caixa_id))
+            
+            # Fechamento do caixa: transfere o WAL para o arquivo principal e o trunca
+            self.checkpoint('TRUNCATE')
             
             return True
         except Exception as e:
@@ -713,27 +1405,24 @@ class DatabaseManager:
     
     def buscar_produto_por_codigo_barras(self, codigo_barras):
         query = "SELECT * FROM produtos WHERE codigo_barras = ?"
-        self.cursor.execute(query, (codigo_barras,))
-        produto = self.cursor.fetchone()
+        with self.pool.leitura() as conn:
+            produto = conn.execute(query, (codigo_barras,)).fetchone()
         
         if produto:
             # Converter resultado para dicionário
-            colunas = [desc[0] for desc in self.cursor.description]
-            return dict(zip(colunas, produto))
+            return dict(produto)
         return None
     
     def obter_caixa_aberto(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT * FROM caixas WHERE status = 'Aberto'
-            """)
+                cursor.execute("""
+                    SELECT * FROM caixas WHERE status = 'Aberto'
+                """)
             
-            caixa = cursor.fetchone()
-            conn.close()
+                caixa = cursor.fetchone()
             
             if caixa:
                 return dict(caixa)
@@ -745,18 +1434,17 @@ class DatabaseManager:
     
     def obter_saldo_atual(self, caixa_id):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT 
-                    SUM(CASE WHEN tipo = 'Entrada' THEN valor ELSE -valor END) 
-                FROM movimentos_caixa 
-                WHERE caixa_id = ?
-            """, (caixa_id,))
+                cursor.execute("""
+                    SELECT 
+                        SUM(CASE WHEN tipo = 'Entrada' THEN valor ELSE -valor END) 
+                    FROM movimentos_caixa 
+                    WHERE caixa_id = ?
+                """, (caixa_id,))
             
-            saldo = cursor.fetchone()[0] or 0
-            conn.close()
+                saldo = cursor.fetchone()[0] or 0
             
             return float(saldo)
         except Exception as e:
@@ -766,19 +1454,17 @@ class DatabaseManager:
     def registrar_movimento_caixa(self, caixa_id, tipo, descricao, valor, forma_pagamento="Dinheiro", 
                                  referencia_id=None, tipo_referencia=None, operador="Sistema", observacao=""):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                INSERT INTO movimentos_caixa 
-                (caixa_id, tipo, descricao, valor, forma_pagamento, referencia_id, tipo_referencia, operador, observacao)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (caixa_id, tipo, descricao, valor, forma_pagamento, referencia_id, 
-                 tipo_referencia, operador, observacao))
+                cursor.execute("""
+                    INSERT INTO movimentos_caixa 
+                    (caixa_id, tipo, descricao, valor, forma_pagamento, referencia_id, tipo_referencia, operador, observacao)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (caixa_id, tipo, descricao, valor, forma_pagamento, referencia_id, 
+                     tipo_referencia, operador, observacao))
             
-            movimento_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+                movimento_id = cursor.lastrowid
             
             return movimento_id
         except Exception as e:
@@ -787,20 +1473,18 @@ class DatabaseManager:
     
     def listar_movimentos_caixa(self, caixa_id):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
-                       valor, forma_pagamento, referencia_id, tipo_referencia
-                FROM movimentos_caixa 
-                WHERE caixa_id = ?
-                ORDER BY data_hora DESC
-            """, (caixa_id,))
+                cursor.execute("""
+                    SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
+                           valor, forma_pagamento, referencia_id, tipo_referencia
+                    FROM movimentos_caixa 
+                    WHERE caixa_id = ?
+                    ORDER BY data_hora DESC
+                """, (caixa_id,))
             
-            movimentos = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+                movimentos = [dict(row) for row in cursor.fetchall()]
             
             return movimentos
         except Exception as e:
@@ -808,21 +1492,21 @@ class DatabaseManager:
             return []
     
     def listar_movimentos_por_periodo(self, caixa_id, data_inicio, data_fim):
+        inicio_utc, fim_utc = self.intervalo_utc(data_inicio, data_fim)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
-                       valor, forma_pagamento, referencia_id, tipo_referencia
-                FROM movimentos_caixa 
-                WHERE caixa_id = ? AND date(data_hora) BETWEEN ? AND ?
-                ORDER BY data_hora DESC
-            """, (caixa_id, data_inicio, data_fim))
+                cursor.execute("""
+                    SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
+                           valor, forma_pagamento, referencia_id, tipo_referencia
+                    FROM movimentos_caixa 
+                    WHERE caixa_id = ? AND data_hora >= ? AND data_hora < ?
+                    ORDER BY data_hora DESC
+                """, (caixa_id, inicio_utc, fim_utc))
             
-            movimentos = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+                movimentos = [dict(row) for row in cursor.fetchall()]
             
             return movimentos
         except Exception as e:
@@ -831,151 +1515,147 @@ class DatabaseManager:
     
     def obter_detalhes_caixa(self, caixa_id):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Buscar dados do caixa
-            cursor.execute("""
-                SELECT 
-                    id, datetime(data_abertura, 'localtime') as data_abertura,
-                    datetime(data_fechamento, 'localtime') as data_fechamento,
-                    saldo_inicial, saldo_final_sistema, saldo_final_informado,
-                    diferenca, operador, status, observacao
-                FROM caixas 
-                WHERE id = ?
-            """, (caixa_id,))
-            
-            caixa = cursor.fetchone()
-            if not caixa:
-                conn.close()
-                return None
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
             
-            detalhes = dict(caixa)
-            
-            # Buscar entradas e saídas
-            cursor.execute("""
-                SELECT tipo, SUM(valor) as total
-                FROM movimentos_caixa
-                WHERE caixa_id = ?
-                GROUP BY tipo
-            """, (caixa_id,))
-            
-            for row in cursor.fetchall():
-                if row['tipo'] == 'Entrada':
-                    detalhes['total_entradas'] = row['total']
+                # Buscar dados do caixa
+                cursor.execute("""
+                    SELECT 
+                        id, datetime(data_abertura, 'localtime') as data_abertura,
+                        datetime(data_fechamento, 'localtime') as data_fechamento,
+                        saldo_inicial, saldo_final_sistema, saldo_final_informado,
+                        diferenca, operador, status, observacao
+                    FROM caixas 
+                    WHERE id = ?
+                """, (caixa_id,))
+            
+                caixa = cursor.fetchone()
+                if not caixa:
+                    return None
+            
+                detalhes = dict(caixa)
+            
+                # Buscar entradas e saídas
+                cursor.execute("""
+                    SELECT tipo, SUM(valor) as total
+                    FROM movimentos_caixa
+                    WHERE caixa_id = ?
+                    GROUP BY tipo
+                """, (caixa_id,))
+            
+                for row in cursor.fetchall():
+                    if row['tipo'] == 'Entrada':
+                        detalhes['total_entradas'] = row['total']
+                    else:
+                        detalhes['total_saidas'] = row['total']
+            
+                # Garantir valores mesmo que não existam
+                if 'total_entradas' not in detalhes:
+                    detalhes['total_entradas'] = 0
+                if 'total_saidas' not in detalhes:
+                    detalhes['total_saidas'] = 0
+            
+                # Buscar vendas
+                cursor.execute("""
+                    SELECT COUNT(*) as total_vendas, SUM(valor_total) as valor_vendas
+                    FROM vendas v
+                    JOIN movimentos_caixa m ON v.id = m.referencia_id AND m.tipo_referencia = 'Venda'
+                    WHERE m.caixa_id = ?
+                """, (caixa_id,))
+            
+                vendas = cursor.fetchone()
+                if vendas:
+                    detalhes['total_vendas'] = vendas['total_vendas'] or 0
+                    detalhes['valor_vendas'] = vendas['valor_vendas'] or 0
                 else:
-                    detalhes['total_saidas'] = row['total']
-            
-            # Garantir valores mesmo que não existam
-            if 'total_entradas' not in detalhes:
-                detalhes['total_entradas'] = 0
-            if 'total_saidas' not in detalhes:
-                detalhes['total_saidas'] = 0
-            
-            # Buscar vendas
-            cursor.execute("""
-                SELECT COUNT(*) as total_vendas, SUM(valor_total) as valor_vendas
-                FROM vendas v
-                JOIN movimentos_caixa m ON v.id = m.referencia_id AND m.tipo_referencia = 'Venda'
-                WHERE m.caixa_id = ?
-            """, (caixa_id,))
-            
-            vendas = cursor.fetchone()
-            if vendas:
-                detalhes['total_vendas'] = vendas['total_vendas'] or 0
-                detalhes['valor_vendas'] = vendas['valor_vendas'] or 0
-            else:
-                detalhes['total_vendas'] = 0
-                detalhes['valor_vendas'] = 0
+                    detalhes['total_vendas'] = 0
+                    detalhes['valor_vendas'] = 0
             
-            conn.close()
             return detalhes
         except Exception as e:
             print(f"Erro ao obter detalhes do caixa: {e}")
             return None
     
     def gerar_relatorio_periodo(self, data_inicio, data_fim):
+        inicio_utc, fim_utc = self.intervalo_utc(data_inicio, data_fim)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Movimentos de caixa
-            cursor.execute("""
-                SELECT tipo, SUM(valor) as total
-                FROM movimentos_caixa
-                WHERE date(data_hora) BETWEEN ? AND ?
-                GROUP BY tipo
-            """, (data_inicio, data_fim))
-            
-            movimentos_resumo = {'total_entradas': 0, 'total_saidas': 0}
-            
-            for row in cursor.fetchall():
-                if row['tipo'] == 'Entrada':
-                    movimentos_resumo['total_entradas'] = row['total']
-                else:
-                    movimentos_resumo['total_saidas'] = row['total']
-            
-            # Vendas
-            cursor.execute("""
-                SELECT COUNT(*) as qtd, SUM(valor_total) as total, SUM(desconto) as descontos
-                FROM vendas
-                WHERE date(data_hora) BETWEEN ? AND ?
-            """, (data_inicio, data_fim))
-            
-            vendas_resumo = cursor.fetchone()
-            
-            # Formas de pagamento
-            cursor.execute("""
-                SELECT forma_pagamento, SUM(valor_total) as total
-                FROM vendas
-                WHERE date(data_hora) BETWEEN ? AND ?
-                GROUP BY forma_pagamento
-            """, (data_inicio, data_fim))
-            
-            pagamentos = {}
-            for row in cursor.fetchall():
-                pagamentos[row['forma_pagamento']] = row['total']
-            
-            # Produtos mais vendidos
-            cursor.execute("""
-                SELECT p.id, p.nome, SUM(i.quantidade) as quantidade, SUM(i.subtotal) as valor_total
-                FROM itens_venda i
-                JOIN produtos p ON i.produto_id = p.id
-                JOIN vendas v ON i.venda_id = v.id
-                WHERE date(v.data_hora) BETWEEN ? AND ?
-                GROUP BY p.id, p.nome
-                ORDER BY quantidade DESC
-            """, (data_inicio, data_fim))
-            
-            produtos = [dict(row) for row in cursor.fetchall()]
-            
-            # Lista de movimentos
-            cursor.execute("""
-                SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
-                       valor, forma_pagamento, referencia_id, tipo_referencia
-                FROM movimentos_caixa 
-                WHERE date(data_hora) BETWEEN ? AND ?
-                ORDER BY data_hora DESC
-            """, (data_inicio, data_fim))
-            
-            movimentos = [dict(row) for row in cursor.fetchall()]
-            
-            # Lista de vendas
-            cursor.execute("""
-                SELECT v.id, datetime(v.data_hora, 'localtime') as data_hora, 
-                       COALESCE(c.nome, 'Cliente Não Identificado') as cliente,
-                       v.valor_total, v.desconto, v.forma_pagamento
-                FROM vendas v
-                LEFT JOIN clientes c ON v.cliente_id = c.id
-                WHERE date(v.data_hora) BETWEEN ? AND ?
-                ORDER BY v.data_hora DESC
-            """, (data_inicio, data_fim))
-            
-            vendas = [dict(row) for row in cursor.fetchall()]
-            
-            conn.close()
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
+            
+                # Movimentos de caixa
+                cursor.execute("""
+                    SELECT tipo, SUM(valor) as total
+                    FROM movimentos_caixa
+                    WHERE data_hora >= ? AND data_hora < ?
+                    GROUP BY tipo
+                """, (inicio_utc, fim_utc))
+            
+                movimentos_resumo = {'total_entradas': 0, 'total_saidas': 0}
+            
+                for row in cursor.fetchall():
+                    if row['tipo'] == 'Entrada':
+                        movimentos_resumo['total_entradas'] = row['total']
+                    else:
+                        movimentos_resumo['total_saidas'] = row['total']
+            
+                # Vendas
+                cursor.execute("""
+                    SELECT COUNT(*) as qtd, SUM(valor_total) as total, SUM(desconto) as descontos
+                    FROM vendas
+                    WHERE data_hora >= ? AND data_hora < ?
+                """, (inicio_utc, fim_utc))
+            
+                vendas_resumo = cursor.fetchone()
+            
+                # Formas de pagamento
+                cursor.execute("""
+                    SELECT forma_pagamento, SUM(valor_total) as total
+                    FROM vendas
+                    WHERE data_hora >= ? AND data_hora < ?
+                    GROUP BY forma_pagamento
+                """, (inicio_utc, fim_utc))
+            
+                pagamentos = {}
+                for row in cursor.fetchall():
+                    pagamentos[row['forma_pagamento']] = row['total']
+            
+                # Produtos mais vendidos
+                cursor.execute("""
+                    SELECT p.id, p.nome, SUM(i.quantidade) as quantidade, SUM(i.subtotal) as valor_total
+                    FROM itens_venda i
+                    JOIN produtos p ON i.produto_id = p.id
+                    JOIN vendas v ON i.venda_id = v.id
+                    WHERE v.data_hora >= ? AND v.data_hora < ?
+                    GROUP BY p.id, p.nome
+                    ORDER BY quantidade DESC
+                """, (inicio_utc, fim_utc))
+            
+                produtos = [dict(row) for row in cursor.fetchall()]
+            
+                # Lista de movimentos
+                cursor.execute("""
+                    SELECT id, datetime(data_hora, 'localtime') as data_hora, tipo, descricao, 
+                           valor, forma_pagamento, referencia_id, tipo_referencia
+                    FROM movimentos_caixa 
+                    WHERE data_hora >= ? AND data_hora < ?
+                    ORDER BY data_hora DESC
+                """, (inicio_utc, fim_utc))
+            
+                movimentos = [dict(row) for row in cursor.fetchall()]
+            
+                # Lista de vendas
+                cursor.execute("""
+                    SELECT v.id, datetime(v.data_hora, 'localtime') as data_hora, 
+                           COALESCE(c.nome, 'Cliente Não Identificado') as cliente,
+                           v.valor_total, v.desconto, v.forma_pagamento
+                    FROM vendas v
+                    LEFT JOIN clientes c ON v.cliente_id = c.id
+                    WHERE v.data_hora >= ? AND v.data_hora < ?
+                    ORDER BY v.data_hora DESC
+                """, (inicio_utc, fim_utc))
+            
+                vendas = [dict(row) for row in cursor.fetchall()]
             
             # Montar resultado
             resultado = {
@@ -1000,19 +1680,18 @@ class DatabaseManager:
     def registrar_venda(self, cliente_id, valor_total, desconto=0, forma_pagamento="Dinheiro", 
                        parcelas=1, observacao="", status="Concluída", operador="Sistema"):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("""
-                INSERT INTO vendas 
-                (cliente_id, valor_total, desconto, forma_pagamento, parcelas, observacao, status, operador)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (cliente_id, valor_total, desconto, forma_pagamento, parcelas, 
-                 observacao, status, operador))
+                cursor.execute("""
+                    INSERT INTO vendas 
+                    (cliente_id, valor_total, desconto, forma_pagamento, parcelas, observacao, status, operador)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (cliente_id, valor_total, desconto, forma_pagamento, parcelas, 
+                     observacao, status, operador))
             
-            venda_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+                venda_id = cursor.lastrowid
+                self._acumular_resumo_venda(cursor, venda_id)
             
             return venda_id
         except Exception as e:
@@ -1021,101 +1700,275 @@ class DatabaseManager:
     
     def registrar_item_venda(self, venda_id, produto_id, quantidade, preco_unitario, subtotal):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Registrar item
-            cursor.execute("""
-                INSERT INTO itens_venda 
-                (venda_id, produto_id, quantidade, preco_unitario, subtotal)
-                VALUES (?, ?, ?, ?, ?)
-            """, (venda_id, produto_id, quantidade, preco_unitario, subtotal))
-            
-            # Atualizar estoque
-            cursor.execute("""
-                UPDATE produtos 
-                SET quantidade = quantidade - ?
-                WHERE id = ?
-            """, (quantidade, produto_id))
-            
-            conn.commit()
-            conn.close()
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
             
+                # Registrar item
+                cursor.execute("""
+                    INSERT INTO itens_venda 
+                    (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (venda_id, produto_id, quantidade, preco_unitario, subtotal))
+            
+                cursor.execute(ACUMULAR_RESUMO_PRODUTOS.format(filtro="i.id = ?"), (cursor.lastrowid,))
+            
+                # Atualizar estoque
+                cursor.execute("""
+                    UPDATE produtos 
+                    SET quantidade = quantidade - ?
+                    WHERE id = ?
+                """, (quantidade, produto_id))
+            
+            self.versao_estoque += 1
             return True
         except Exception as e:
             print(f"Erro ao registrar item de venda: {e}")
             return False
-    
-    def obter_dados_dashboard(self, data_inicio, data_fim):
+
+    def registrar_venda_completa(self, caixa_id, cliente_id, itens, valor_total, desconto=0,
+                                 forma_pagamento="Dinheiro", parcelas=1, observacao="",
+                                 status="Concluída", operador="Sistema"):
+        """
+        Registra a venda, seus itens, a baixa de estoque e a entrada no caixa
+        em uma única transação (um único commit, independente do tamanho do carrinho)
+
+        Args:
+            caixa_id (int): ID do caixa aberto
+            cliente_id (int): ID do cliente ou None
+            itens (list): Dicionários com produto_id, quantidade, preco_unitario e subtotal
+            valor_total (float): Valor final da venda (já com desconto)
+
+        Returns:
+            tuple: (venda_id, saldo_atual) ou (False, None) em caso de erro
+        """
+        try:
+            with self.pool.escrita() as conn:
+                cursor = conn.cursor()
+
+                # Cabeçalho da venda
+                cursor.execute("""
+                    INSERT INTO vendas
+                    (cliente_id, valor_total, desconto, forma_pagamento, parcelas, observacao, status, operador)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (cliente_id, valor_total, desconto, forma_pagamento, parcelas,
+                     observacao, status, operador))
+
+                venda_id = cursor.lastrowid
+
+                # Itens da venda
+                cursor.executemany("""
+                    INSERT INTO itens_venda
+                    (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(venda_id, item['produto_id'], item['quantidade'],
+                       item['preco_unitario'], item['subtotal']) for item in itens])
+
+                # Resumos diários do dashboard
+                self._acumular_resumo_venda(cursor, venda_id)
+                cursor.execute(ACUMULAR_RESUMO_PRODUTOS.format(filtro="i.venda_id = ?"), (venda_id,))
+
+                # Baixa de estoque
+                cursor.executemany("""
+                    UPDATE produtos
+                    SET quantidade = quantidade - ?
+                    WHERE id = ?
+                """, [(item['quantidade'], item['produto_id']) for item in itens])
+
+                # Entrada no caixa
+                cursor.execute("""
+                    INSERT INTO movimentos_caixa
+                    (caixa_id, tipo, descricao, valor, forma_pagamento, referencia_id, tipo_referencia, operador)
+                    VALUES (?, 'Entrada', ?, ?, ?, ?, 'Venda', ?)
+                """, (caixa_id, f"Venda #{venda_id}", valor_total, forma_pagamento, venda_id, operador))
+
+                # Saldo atualizado, lido dentro da mesma transação
+                cursor.execute("""
+                    SELECT
+                        SUM(CASE WHEN tipo = 'Entrada' THEN valor ELSE -valor END)
+                    FROM movimentos_caixa
+                    WHERE caixa_id = ?
+                """, (caixa_id,))
+
+                saldo = cursor.fetchone()[0] or 0
+
+            self.versao_estoque += 1
+            return venda_id, float(saldo)
+        except Exception as e:
+            print(f"Erro ao registrar venda completa: {e}")
+            return False, None
+
+    def _acumular_resumo_venda(self, cursor, venda_id):
+        """Acumula o cabeçalho da venda nos resumos por forma de pagamento e por cliente"""
+        cursor.execute(ACUMULAR_RESUMO_PAGAMENTOS.format(filtro="v.id = ?"), (venda_id,))
+        cursor.execute(ACUMULAR_RESUMO_CLIENTES.format(filtro="v.id = ?"), (venda_id,))
+
+    def reconstruir_resumo_vendas(self):
+        """
+        Recalcula do zero os resumos diários a partir de vendas e itens_venda
+
+        Returns:
+            bool: True se os resumos foram reconstruídos
+        """
+        try:
+            with self.pool.escrita() as conn:
+                _reconstruir_resumo_vendas(conn)
+            return True
+        except Exception as e:
+            print(f"Erro ao reconstruir resumo de vendas: {e}")
+            return False
+
+    # Expressões que levam o dia (data local) ao início do seu período
+    AGRUPAMENTOS = {
+        'dia': "dia",
+        'semana': "date(dia, 'weekday 0', '-6 days')",  # segunda-feira da semana
+        'mes': "strftime('%Y-%m-01', dia)",
+    }
+
+    @staticmethod
+    def escolher_agrupamento(data_inicio, data_fim):
+        """
+        Escolhe o agrupamento da série de vendas pelo tamanho do período,
+        para que o gráfico tenha no máximo algumas dezenas de pontos
+
+        Returns:
+            str: 'dia', 'semana' ou 'mes'
+        """
+        dias = (datetime.strptime(data_fim, '%Y-%m-%d') - datetime.strptime(data_inicio, '%Y-%m-%d')).days + 1
+        if dias <= 62:
+            return 'dia'
+        if dias <= 366:
+            return 'semana'
+        return 'mes'
+
+    @staticmethod
+    def _inicio_periodo(dia, agrupamento):
+        """Início do período (dia, semana ou mês) que contém a data"""
+        if agrupamento == 'semana':
+            return dia - timedelta(days=dia.weekday())
+        if agrupamento == 'mes':
+            return dia.replace(day=1)
+        return dia
+
+    def _serie_vendas(self, cursor, data_inicio, data_fim, agrupamento):
+        """Série de faturamento por período, com zero nos períodos sem vendas"""
+        cursor.execute(f"""
+            SELECT {self.AGRUPAMENTOS[agrupamento]} as periodo, SUM(valor_total) as valor
+            FROM vendas_resumo_pagamentos
+            WHERE dia BETWEEN ? AND ?
+            GROUP BY periodo
+        """, (data_inicio, data_fim))
+        valores = {row['periodo']: row['valor'] for row in cursor.fetchall()}
+
+        # Preencher os períodos sem vendas
+        serie = []
+        atual = self._inicio_periodo(datetime.strptime(data_inicio, '%Y-%m-%d').date(), agrupamento)
+        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+        while atual <= fim:
+            chave = atual.isoformat()
+            serie.append({'data': chave, 'valor': valores.get(chave, 0) or 0})
+
+            if agrupamento == 'dia':
+                atual += timedelta(days=1)
+            elif agrupamento == 'semana':
+                atual += timedelta(days=7)
+            else:
+                atual = (atual + timedelta(days=32)).replace(day=1)
+        return serie
+
+    def obter_vendas_diarias(self, data_inicio, data_fim, agrupamento='dia'):
+        """
+        Retorna a série de faturamento do período
+
+        Args:
+            data_inicio (str): Data inicial (yyyy-MM-dd)
+            data_fim (str): Data final (yyyy-MM-dd)
+            agrupamento (str): 'dia', 'semana', 'mes' ou 'auto'
+
+        Returns:
+            list: Dicionários com 'data' (início do período) e 'valor'
+        """
+        if agrupamento == 'auto':
+            agrupamento = self.escolher_agrupamento(data_inicio, data_fim)
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Faturamento e número de vendas
-            cursor.execute("""
-                SELECT COUNT(*) as num_vendas, SUM(valor_total) as faturamento
-                FROM vendas
-                WHERE date(data_hora) BETWEEN ? AND ?
-            """, (data_inicio, data_fim))
-            
-            vendas_resumo = cursor.fetchone()
-            
-            # Lucro (com base na diferença entre preço de venda e preço de compra)
-            cursor.execute("""
-                SELECT SUM((i.preco_unitario - p.preco_compra) * i.quantidade) as lucro
-                FROM itens_venda i
-                JOIN produtos p ON i.produto_id = p.id
-                JOIN vendas v ON i.venda_id = v.id
-                WHERE date(v.data_hora) BETWEEN ? AND ?
-            """, (data_inicio, data_fim))
-            
-            # Aqui está o problema: É necessário atribuir o resultado a variável lucro
-            lucro_resultado = cursor.fetchone()
-            lucro = lucro_resultado['lucro'] if lucro_resultado['lucro'] is not None else 0
-            
-            # Produtos mais vendidos
-            cursor.execute("""
-                SELECT p.nome, SUM(i.quantidade) as quantidade, SUM(i.subtotal) as valor_total
-                FROM itens_venda i
-                JOIN produtos p ON i.produto_id = p.id
-                JOIN vendas v ON i.venda_id = v.id
-                WHERE date(v.data_hora) BETWEEN ? AND ?
-                GROUP BY p.id, p.nome
-                ORDER BY quantidade DESC
-                LIMIT 10
-            """, (data_inicio, data_fim))
-            
-            produtos = [dict(row) for row in cursor.fetchall()]
-            
-            # Formas de pagamento
-            cursor.execute("""
-                SELECT forma_pagamento as forma, SUM(valor_total) as valor_total
-                FROM vendas
-                WHERE date(data_hora) BETWEEN ? AND ?
-                GROUP BY forma_pagamento
-                ORDER BY valor_total DESC
-            """, (data_inicio, data_fim))
-            
-            pagamentos = [dict(row) for row in cursor.fetchall()]
-            
-            # Melhores clientes
-            cursor.execute("""
-                SELECT 
-                    COALESCE(c.nome, 'Cliente Não Identificado') as nome,
-                    COUNT(*) as compras,
-                    SUM(v.valor_total) as valor_total
-                FROM vendas v
-                LEFT JOIN clientes c ON v.cliente_id = c.id
-                WHERE date(v.data_hora) BETWEEN ? AND ?
-                GROUP BY v.cliente_id
-                ORDER BY valor_total DESC
-                LIMIT 10
-            """, (data_inicio, data_fim))
-            
-            clientes = [dict(row) for row in cursor.fetchall()]
-            
-            conn.close()
+            with self.pool.leitura() as conn:
+                return self._serie_vendas(conn.cursor(), data_inicio, data_fim, agrupamento)
+        except Exception as e:
+            print(f"Erro ao obter vendas diárias: {e}")
+            return []
+
+    def obter_dados_dashboard(self, data_inicio, data_fim, agrupamento='auto'):
+        # Os resumos são indexados pela data local, então o período é usado direto
+        periodo = (data_inicio, data_fim)
+        if agrupamento == 'auto':
+            agrupamento = self.escolher_agrupamento(data_inicio, data_fim)
+        
+        try:
+            with self.pool.leitura() as conn:
+                cursor = conn.cursor()
+            
+                # Faturamento e número de vendas
+                cursor.execute("""
+                    SELECT SUM(num_vendas) as num_vendas, SUM(valor_total) as faturamento
+                    FROM vendas_resumo_pagamentos
+                    WHERE dia BETWEEN ? AND ?
+                """, periodo)
+            
+                vendas_resumo = cursor.fetchone()
+            
+                # Lucro (com base na diferença entre preço de venda e preço de compra)
+                cursor.execute("""
+                    SELECT SUM(r.valor_total - r.quantidade * p.preco_compra) as lucro
+                    FROM vendas_resumo_diario r
+                    JOIN produtos p ON r.produto_id = p.id
+                    WHERE r.dia BETWEEN ? AND ?
+                """, periodo)
+            
+                lucro_resultado = cursor.fetchone()
+                lucro = lucro_resultado['lucro'] if lucro_resultado['lucro'] is not None else 0
+            
+                # Produtos mais vendidos
+                cursor.execute("""
+                    SELECT p.nome, SUM(r.quantidade) as quantidade, SUM(r.valor_total) as valor_total
+                    FROM vendas_resumo_diario r
+                    JOIN produtos p ON r.produto_id = p.id
+                    WHERE r.dia BETWEEN ? AND ?
+                    GROUP BY r.produto_id
+                    ORDER BY quantidade DESC
+                    LIMIT 10
+                """, periodo)
+            
+                produtos = [dict(row) for row in cursor.fetchall()]
+            
+                # Formas de pagamento
+                cursor.execute("""
+                    SELECT forma_pagamento as forma, SUM(valor_total) as valor_total
+                    FROM vendas_resumo_pagamentos
+                    WHERE dia BETWEEN ? AND ?
+                    GROUP BY forma_pagamento
+                    ORDER BY valor_total DESC
+                """, periodo)
+            
+                pagamentos = [dict(row) for row in cursor.fetchall()]
+            
+                # Melhores clientes
+                cursor.execute("""
+                    SELECT 
+                        COALESCE(c.nome, 'Cliente Não Identificado') as nome,
+                        SUM(r.compras) as compras,
+                        SUM(r.valor_total) as valor_total
+                    FROM vendas_resumo_clientes r
+                    LEFT JOIN clientes c ON r.cliente_id = c.id
+                    WHERE r.dia BETWEEN ? AND ?
+                    GROUP BY r.cliente_id
+                    ORDER BY valor_total DESC
+                    LIMIT 10
+                """, periodo)
+            
+                clientes = [dict(row) for row in cursor.fetchall()]
+            
+                # Série de faturamento por dia/semana/mês
+                vendas_diarias = self._serie_vendas(cursor, data_inicio, data_fim, agrupamento)
             
             # Montar resultado
             resultado = {
@@ -1124,7 +1977,9 @@ class DatabaseManager:
                 'lucro': lucro,  # Agora a variável lucro está definida
                 'produtos': produtos,
                 'pagamentos': pagamentos,
-                'clientes': clientes
+                'clientes': clientes,
+                'vendas_diarias': vendas_diarias,
+                'agrupamento': agrupamento
             }
 
             return resultado
@@ -1133,4 +1988,4 @@ class DatabaseManager:
             return None
     
     def fechar(self):
-        self.conn.close()
\ No newline at end of file
+        self.pool.fechar()
\ No newline at end of file
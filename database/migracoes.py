@@ -0,0 +1,120 @@
+from collections import namedtuple
+
+# Histórico das migrações aplicadas (a versão corrente fica em PRAGMA user_version)
+TABELA_HISTORICO = '''
+    CREATE TABLE IF NOT EXISTS schema_migracoes (
+        versao INTEGER PRIMARY KEY,
+        descricao TEXT NOT NULL,
+        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+class Migracao(namedtuple('Migracao', 'versao descricao aplicar reverter')):
+    """
+    Passo de evolução do schema.
+
+    aplicar(conn) leva o banco da versão anterior para esta; reverter(conn)
+    desfaz o passo ou é None quando a migração não pode ser revertida.
+    """
+
+
+class ErroMigracao(Exception):
+    """Migração inválida ou que não pode ser aplicada/revertida"""
+
+
+def versao_schema(conn):
+    """Retorna a versão do schema gravada em PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _validar(migracoes):
+    """As versões devem ser consecutivas a partir de 1"""
+    for esperada, migracao in enumerate(migracoes, start=1):
+        if migracao.versao != esperada:
+            raise ErroMigracao(f"Migração fora de ordem: esperada versão {esperada}, encontrada {migracao.versao}")
+
+
+def _executar_passo(conn, passo, versao_final, registrar):
+    """Executa um passo em uma transação própria junto com a gravação da nova versão"""
+    if conn.in_transaction:
+        conn.commit()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        passo(conn)
+        conn.execute(TABELA_HISTORICO)
+        registrar(conn)
+        conn.execute(f"PRAGMA user_version = {int(versao_final)}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def aplicar_migracoes(conn, migracoes, destino=None):
+    """
+    Aplica, em ordem, as migrações posteriores à versão atual do banco.
+    Cada migração roda em sua própria transação: se falhar, o banco fica
+    na última versão concluída.
+
+    Args:
+        conn: Conexão de escrita
+        migracoes (list): Migracao em ordem crescente de versão
+        destino (int): Versão final (padrão: a última migração)
+
+    Returns:
+        list: Versões aplicadas
+    """
+    _validar(migracoes)
+    ultima = migracoes[-1].versao if migracoes else 0
+    destino = ultima if destino is None else destino
+    atual = versao_schema(conn)
+
+    if atual > ultima:
+        print(f"Aviso: schema do banco (versão {atual}) é mais novo que o do sistema (versão {ultima})")
+        return []
+
+    aplicadas = []
+    for migracao in migracoes:
+        if atual < migracao.versao <= destino:
+            _executar_passo(
+                conn, migracao.aplicar, migracao.versao,
+                lambda c, m=migracao: c.execute(
+                    "INSERT OR REPLACE INTO schema_migracoes (versao, descricao) VALUES (?, ?)",
+                    (m.versao, m.descricao)
+                )
+            )
+            aplicadas.append(migracao.versao)
+    return aplicadas
+
+
+def reverter_migracoes(conn, migracoes, destino):
+    """
+    Reverte, da mais nova para a mais antiga, as migrações posteriores a destino
+
+    Args:
+        conn: Conexão de escrita
+        migracoes (list): Migracao em ordem crescente de versão
+        destino (int): Versão em que o banco deve ficar
+
+    Returns:
+        list: Versões revertidas
+    """
+    _validar(migracoes)
+    atual = versao_schema(conn)
+    pendentes = [m for m in reversed(migracoes) if destino < m.versao <= atual]
+
+    # Verificar antes de começar para não deixar a reversão pela metade
+    irreversiveis = [m.versao for m in pendentes if m.reverter is None]
+    if irreversiveis:
+        raise ErroMigracao(f"Migrações sem reversão: {irreversiveis}")
+
+    revertidas = []
+    for migracao in pendentes:
+        _executar_passo(
+            conn, migracao.reverter, migracao.versao - 1,
+            lambda c, m=migracao: c.execute("DELETE FROM schema_migracoes WHERE versao = ?", (m.versao,))
+        )
+        revertidas.append(migracao.versao)
+    return revertidas
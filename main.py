@@ -1,5 +1,10 @@
 import sys
 import os
+
+# O perfil de inicialização é importado antes dos demais módulos para medir as importações
+from utils.perfil_inicializacao import perfil
+perfil.configurar(sys.argv)
+
 from PyQt5.QtWidgets import QApplication, QMessageBox, QSplashScreen, QDialog, QLabel
 from PyQt5.QtGui import QIcon, QPixmap, QFont
 from PyQt5.QtCore import Qt, QTimer
@@ -39,40 +44,46 @@ class SessionManager:
         
         return False
 
+# Janela principal aberta após o login
+janela_principal = None
+
 def on_login_success(usuario):
     """Função para lidar com o login bem-sucedido"""
+    perfil.marcar('login.sucesso')
+    
     # Salvar informações do usuário logado
     session.set_usuario(usuario)
     
-    # Criar e mostrar a janela principal
-    window = MainWindow(db, settings)
-    window.session = session  # Passar o gerenciador de sessão
-    window.usuario = usuario  # Passar as informações do usuário
-    window.setup_for_user(usuario)  # Configurar interface para o usuário
-    window.show()
+    # Criar e mostrar a janela principal (a referência global mantém a janela viva
+    # depois que esta função retorna)
+    global janela_principal
+    with perfil.medir('main_window.criar'):
+        window = MainWindow(db, settings)
+        window.session = session  # Passar o gerenciador de sessão
+        window.usuario = usuario  # Passar as informações do usuário
+        window.setup_for_user(usuario)  # Configurar interface para o usuário
+        window.show()
+    janela_principal = window
     
-    # Verificar produtos vencidos ou prestes a vencer ao iniciar
-    produtos_vencidos = db.verificar_produtos_vencidos()
-    produtos_vencendo = db.verificar_produtos_vencendo(dias=15)
+    # Criar as demais páginas aos poucos, enquanto o usuário usa a inicial (importa
+    # os módulos das páginas na thread da interface, nos intervalos ociosos)
+    if settings.get_preload_pages():
+        window.pre_aquecer_paginas()
     
-    if produtos_vencidos:
-        msg = "Os seguintes produtos estão vencidos:\n\n"
-        for produto in produtos_vencidos:
-            msg += f"• {produto['nome']} - Vencimento: {produto['data_validade']}\n"
-        
-        QMessageBox.warning(window, "Produtos Vencidos", msg)
-    
-    if produtos_vencendo:
-        msg = "Os seguintes produtos estão próximos do vencimento:\n\n"
-        for produto in produtos_vencendo:
-            msg += f"• {produto['nome']} - Vencimento: {produto['data_validade']}\n"
-        
-        QMessageBox.information(window, "Produtos Próximos do Vencimento", msg)
+    # Verificar produtos vencidos, prestes a vencer ou com estoque baixo em segundo plano;
+    # o painel de alertas é aberto ao terminar se houver vencidos ou vencendo
+    window.verificar_alertas(exibir_painel=True)
+
+def registrar_login_exibido():
+    """Marca no perfil de inicialização o momento em que o login aparece"""
+    perfil.marcar('login.exibido')
+    perfil.salvar()
 
 if __name__ == "__main__":
     # Iniciar aplicação
     app = QApplication(sys.argv)
     app.setStyle("Fusion")  # Estilo consistente entre plataformas
+    perfil.marcar('app.criada')
     
     # Aplicar configurações
     settings = Settings()
@@ -93,7 +104,8 @@ if __name__ == "__main__":
     
     # Criar conexão com o banco de dados
     try:
-        db = DatabaseManager()
+        with perfil.medir('db.abrir'):
+            db = DatabaseManager()
         session = SessionManager()  # Criar gerenciador de sessão
         
         # Mostrar login após a splash screen
@@ -106,6 +118,9 @@ if __name__ == "__main__":
         # Conectar o sinal de login bem-sucedido
         login_window.login_success_signal.connect(on_login_success)
         
+        # Primeira volta do loop de eventos com o login na tela
+        QTimer.singleShot(0, registrar_login_exibido)
+        
         # Mostrar janela de login
         if login_window.exec_() != QDialog.Accepted:
             # Se o usuário fechou a janela de login sem fazer login
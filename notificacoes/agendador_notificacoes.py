@@ -0,0 +1,143 @@
+import threading
+from datetime import datetime, timedelta
+
+# Tempo máximo, em segundos, entre duas voltas do agendador (limita o
+# atraso quando o intervalo é alterado ou o relógio do sistema muda)
+ESPERA_MAXIMA_SEGUNDOS = 60 * 60
+
+# Espera antes de repetir uma verificação que terminou em erro
+ESPERA_APOS_ERRO_SEGUNDOS = 5 * 60
+
+# Intervalo de leitura dos eventos de estoque baixo gravados pelas vendas
+# (consulta só os eventos pendentes, pelo índice parcial)
+INTERVALO_EVENTOS_SEGUNDOS = 30
+
+
+class AgendadorNotificacoes:
+    """
+    Executa as verificações periódicas do NotificacaoService em um único
+    processo de longa duração (verificar_notificacoes.py --daemon).
+
+    Cada verificação roda quando vence o seu intervalo
+    (verificar_a_cada_horas no config.json); a hora da última execução fica
+    no banco (tabela notificacoes_estado). Entre as verificações a thread
+    principal dorme até a próxima; os emails enfileirados são enviados pela
+    thread do DespachanteNotificacoes. Com a verificação de estoque baixo
+    agendada, os eventos de estoque mínimo gravados pelo gatilho do banco
+    são lidos a cada INTERVALO_EVENTOS_SEGUNDOS, e o alerta sai logo após a
+    venda em vez de esperar a varredura periódica.
+
+    parar() pode ser chamado de um tratador de sinal (SIGTERM) e encerra o
+    laço sem interromper uma verificação ou envio em andamento.
+    """
+
+    def __init__(self, notificacao_service, verificacoes=('estoque_baixo', 'vencimento'),
+                 intervalo_eventos=INTERVALO_EVENTOS_SEGUNDOS):
+        """
+        Args:
+            notificacao_service (NotificacaoService): Serviço com o banco e a fila já abertos
+            verificacoes (tuple): Verificações agendadas ('estoque_baixo', 'vencimento')
+            intervalo_eventos (float): Segundos entre leituras dos eventos de estoque baixo
+        """
+        self.service = notificacao_service
+        funcoes = {
+            'estoque_baixo': notificacao_service.verificar_estoque_baixo,
+            'vencimento': notificacao_service.verificar_produtos_vencendo,
+        }
+        self.verificacoes = {nome: funcoes[nome] for nome in verificacoes}
+        self.intervalo_eventos = intervalo_eventos if 'estoque_baixo' in verificacoes else None
+        self._adiadas = {}
+        self._parar = threading.Event()
+
+    def executar(self):
+        """Executa as verificações no horário até parar() ser chamado"""
+        self._parar.clear()
+        self.service.despachante.iniciar()
+        try:
+            while not self._parar.is_set():
+                self.processar_eventos()
+                self.executar_vencidas()
+                self._parar.wait(self._segundos_ate_proxima())
+        finally:
+            # Termina o envio em andamento antes de sair
+            self.service.despachante.parar(timeout=60)
+
+    def parar(self):
+        """Pede o encerramento do laço (seguro para uso em tratadores de sinal)"""
+        self._parar.set()
+
+    def processar_eventos(self):
+        """
+        Enfileira o alerta dos produtos que cruzaram o estoque mínimo desde a
+        última leitura dos eventos
+
+        Returns:
+            bool: True se algum alerta foi enfileirado
+        """
+        if self.intervalo_eventos is None:
+            return False
+
+        try:
+            self.service.db_manager.ensure_connection()
+            enfileirado = self.service.processar_eventos_estoque_baixo()
+        except Exception as e:
+            print(f"Erro ao processar os eventos de estoque baixo: {e}")
+            return False
+
+        if enfileirado:
+            print(f"{datetime.now().strftime('%d/%m/%Y %H:%M:%S')} Alerta de estoque baixo enfileirado (eventos de venda)")
+        return enfileirado
+
+    def executar_vencidas(self):
+        """
+        Executa as verificações cujo intervalo já passou
+
+        Returns:
+            list: Nomes das verificações executadas
+        """
+        self.service.db_manager.ensure_connection()
+        executadas = []
+
+        for nome, funcao in self.verificacoes.items():
+            if self._parar.is_set():
+                break
+
+            agora = datetime.now()
+            try:
+                proxima = self._proxima(nome)
+                if proxima is None or agora < proxima:
+                    continue
+
+                resultado = funcao()
+                self._adiadas.pop(nome, None)
+                executadas.append(nome)
+                print(f"{agora.strftime('%d/%m/%Y %H:%M:%S')} Verificação '{nome}' executada: {resultado}")
+            except Exception as e:
+                self._adiadas[nome] = agora + timedelta(seconds=ESPERA_APOS_ERRO_SEGUNDOS)
+                print(f"Erro na verificação '{nome}': {e}")
+
+        return executadas
+
+    def _proxima(self, nome):
+        """Próxima execução da verificação, respeitando a espera após um erro"""
+        proxima = self.service.proxima_verificacao(nome)
+        adiada = self._adiadas.get(nome)
+        if proxima is not None and adiada is not None:
+            return max(proxima, adiada)
+        return proxima
+
+    def _segundos_ate_proxima(self):
+        """Tempo de espera até a próxima verificação agendada"""
+        espera = ESPERA_MAXIMA_SEGUNDOS
+        if self.intervalo_eventos is not None:
+            espera = min(espera, self.intervalo_eventos)
+        agora = datetime.now()
+        for nome in self.verificacoes:
+            try:
+                proxima = self._proxima(nome)
+            except Exception as e:
+                print(f"Erro ao consultar a próxima verificação '{nome}': {e}")
+                continue
+            if proxima is not None:
+                espera = min(espera, (proxima - agora).total_seconds())
+        return max(1.0, espera)
@@ -1,28 +1,121 @@
 import smtplib
+import socket
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-import os
+
+import templates_email
+from templates_email import Mensagem
+
+# Falhas de conexão que justificam reconectar e tentar a mensagem de novo
+ERROS_CONEXAO = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.timeout, ConnectionError)
 
 class EmailNotifier:
-    def __init__(self, smtp_server, smtp_port, username, password, sender_email):
+    def __init__(self, smtp_server, smtp_port, username, password, sender_email,
+                 timeout=30, usar_tls=True):
         """
         Inicializa o serviço de notificação por email
         
         Args:
             smtp_server (str): Servidor SMTP (ex: smtp.gmail.com)
             smtp_port (int): Porta do servidor SMTP (ex: 587 para TLS)
-            username (str): Nome de usuário para autenticação SMTP
+            username (str): Nome de usuário para autenticação SMTP (vazio: sem login)
             password (str): Senha para autenticação SMTP
             sender_email (str): Email do remetente
+            timeout (float): Tempo máximo, em segundos, de cada operação com o servidor
+            usar_tls (bool): Usar STARTTLS (desligar só para um servidor de testes local,
+                ex.: python -m aiosmtpd -n -l localhost:8025)
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.username = username
         self.password = password
         self.sender_email = sender_email
+        self.timeout = timeout
+        self.usar_tls = usar_tls
+        
+        # Conexão autenticada reaproveitada enquanto houver uma sessão aberta
+        self._servidor = None
+        self._sessoes = 0
+        
+        # Mensagem do último erro de envio (registrada pela fila de notificações)
+        self.ultimo_erro = None
+    
+    def conectar(self):
+        """
+        Abre a conexão com o servidor SMTP (STARTTLS e login)
+        
+        Returns:
+            smtplib.SMTP: Conexão autenticada
+        """
+        servidor = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.usar_tls:
+                servidor.starttls()  # Segurança TLS
+            if self.username:
+                servidor.login(self.username, self.password)
+        except Exception:
+            servidor.close()
+            raise
+        
+        self._servidor = servidor
+        return servidor
+    
+    def desconectar(self):
+        """Encerra a conexão com o servidor SMTP, se houver"""
+        servidor, self._servidor = self._servidor, None
+        if servidor is None:
+            return
+        try:
+            servidor.quit()
+        except (smtplib.SMTPException, OSError):
+            servidor.close()
+    
+    @contextmanager
+    def sessao(self):
+        """
+        Mantém uma única conexão autenticada para todos os emails enviados
+        dentro do bloco (ex.: os alertas urgente e de vencimento em sequência).
+        A conexão é aberta no primeiro envio e fechada ao sair do bloco mais externo.
+        """
+        self._sessoes += 1
+        try:
+            yield self
+        finally:
+            self._sessoes -= 1
+            if self._sessoes == 0:
+                self.desconectar()
     
-    def enviar_email(self, destinatarios, assunto, conteudo_html):
+    def _montar_mensagem(self, destinatarios, assunto, conteudo_html, conteudo_texto=None):
+        """Monta a mensagem MIME com o conteúdo HTML e, se houver, a alternativa em texto"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = assunto
+        msg['From'] = self.sender_email
+        msg['To'] = ', '.join(destinatarios)
+        
+        # A última parte é a preferida: o texto simples vem antes do HTML
+        if conteudo_texto:
+            msg.attach(MIMEText(conteudo_texto, 'plain', 'utf-8'))
+        msg.attach(MIMEText(conteudo_html, 'html', 'utf-8'))
+        return msg
+    
+    def _transmitir(self, destinatarios, mensagem):
+        """
+        Envia a mensagem pela conexão da sessão, reconectando uma vez se o
+        servidor tiver encerrado a conexão (ex.: por inatividade)
+        """
+        for tentativa in range(2):
+            servidor = self._servidor or self.conectar()
+            try:
+                servidor.sendmail(self.sender_email, destinatarios, mensagem)
+                return
+            except ERROS_CONEXAO:
+                self._servidor = None
+                servidor.close()
+                if tentativa:
+                    raise
+    
+    def enviar_email(self, destinatarios, assunto, conteudo_html, conteudo_texto=None):
         """
         Envia email para os destinatários informados
         
@@ -30,37 +123,57 @@ class EmailNotifier:
             destinatarios (list): Lista de emails dos destinatários
             assunto (str): Assunto do email
             conteudo_html (str): Conteúdo do email em formato HTML
+            conteudo_texto (str): Alternativa em texto simples (opcional)
             
         Returns:
             bool: True se o email foi enviado com sucesso, False caso contrário
         """
         try:
-            # Criar mensagem
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = assunto
-            msg['From'] = self.sender_email
-            msg['To'] = ', '.join(destinatarios)
+            mensagem = self._montar_mensagem(destinatarios, assunto, conteudo_html, conteudo_texto).as_string()
             
-            # Adicionar conteúdo HTML
-            part = MIMEText(conteudo_html, 'html')
-            msg.attach(part)
-            
-            # Conectar ao servidor SMTP
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Segurança TLS
-            server.login(self.username, self.password)
-            
-            # Enviar email
-            server.sendmail(self.sender_email, destinatarios, msg.as_string())
-            server.quit()
+            # Fora de uma sessão, a conexão vale só para este email
+            with self.sessao():
+                self._transmitir(destinatarios, mensagem)
             
             print(f"Email enviado com sucesso para {', '.join(destinatarios)}")
+            self.ultimo_erro = None
             return True
             
         except Exception as e:
             print(f"Erro ao enviar email: {e}")
+            self.ultimo_erro = str(e)
             return False
     
+    def enviar_lote(self, mensagens):
+        """
+        Envia vários emails pela mesma conexão autenticada
+        
+        Args:
+            mensagens (list): Tuplas (destinatarios, assunto, conteudo_html[, conteudo_texto])
+            
+        Returns:
+            list: Resultado (bool) de cada email, na mesma ordem
+        """
+        with self.sessao():
+            return [self.enviar_email(*mensagem) for mensagem in mensagens]
+    
+    def mensagem_estoque_baixo(self, produtos):
+        """
+        Monta o email de produtos com estoque baixo
+        
+        Args:
+            produtos (list): Lista de produtos com estoque baixo
+            
+        Returns:
+            Mensagem: (assunto, html, texto) ou None se não houver produtos
+        """
+        if not produtos:
+            return None
+        
+        html, texto = templates_email.ESTOQUE_BAIXO.renderizar(produtos)
+        assunto = f"⚠️ ALERTA: {len(produtos)} produtos com estoque baixo"
+        return Mensagem(assunto, html, texto)
+    
     def notificar_estoque_baixo(self, destinatarios, produtos):
         """
         Envia notificação de produtos com estoque baixo
@@ -69,80 +182,29 @@ class EmailNotifier:
             destinatarios (list): Lista de emails dos destinatários
             produtos (list): Lista de produtos com estoque baixo
         """
-        if not produtos:
+        mensagem = self.mensagem_estoque_baixo(produtos)
+        if not mensagem:
             return False
         
-        # Preparar tabela HTML com os produtos
-        rows = ""
-        for produto in produtos:
-            rows += f"""
-            <tr>
-                <td>{produto['id']}</td>
-                <td>{produto['nome']}</td>
-                <td>{produto['descricao'] or '-'}</td>
-                <td>{produto['quantidade']}</td>
-                <td>{produto['estoque_minimo']}</td>
-                <td>{produto['fornecedor_nome'] or 'Não informado'}</td>
-            </tr>
-            """
+        return self.enviar_email(destinatarios, *mensagem)
+    
+    def mensagem_produtos_vencendo_alerta(self, produtos, dias_limite):
+        """
+        Monta o email de produtos próximos do vencimento (Alerta: 16-30 dias)
         
-        # Montar conteúdo HTML
-        html = f"""
-        <html>
-        <head>
-            <style>
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                }}
-                th, td {{
-                    border: 1px solid #ddd;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #f2f2f2;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f9f9f9;
-                }}
-                .alerta {{
-                    background-color: #fffacd;
-                    padding: 10px;
-                    border-left: 5px solid #ffd700;
-                    margin-bottom: 15px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h2>⚠️ Alerta de Estoque Baixo</h2>
-            <div class="alerta">
-                <p>Os seguintes produtos estão com estoque abaixo do mínimo definido e precisam de reposição:</p>
-            </div>
-            
-            <table>
-                <tr>
-                    <th>ID</th>
-                    <th>Nome</th>
-                    <th>Descrição</th>
-                    <th>Quantidade</th>
-                    <th>Estoque Mínimo</th>
-                    <th>Fornecedor</th>
-                </tr>
-                {rows}
-            </table>
+        Args:
+            produtos (list): Lista de produtos próximos do vencimento
+            dias_limite (int): Limite de dias para considerar alerta (geralmente 30)
             
-            <p>Este é um email automático. Por favor, não responda.</p>
-            <p>Data e hora: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>
-        </body>
-        </html>
+        Returns:
+            Mensagem: (assunto, html, texto) ou None se não houver produtos
         """
+        if not produtos:
+            return None
         
-        return self.enviar_email(
-            destinatarios=destinatarios,
-            assunto=f"⚠️ ALERTA: {len(produtos)} produtos com estoque baixo",
-            conteudo_html=html
-        )
+        html, texto = templates_email.VENCENDO_ALERTA.renderizar(produtos, dias_limite=dias_limite)
+        assunto = f"⚠️ ALERTA: {len(produtos)} produtos vencendo nos próximos {dias_limite} dias"
+        return Mensagem(assunto, html, texto)
     
     def notificar_produtos_vencendo_alerta(self, destinatarios, produtos, dias_limite):
         """
@@ -153,94 +215,29 @@ class EmailNotifier:
             produtos (list): Lista de produtos próximos do vencimento
             dias_limite (int): Limite de dias para considerar alerta (geralmente 30)
         """
-        if not produtos:
+        mensagem = self.mensagem_produtos_vencendo_alerta(produtos, dias_limite)
+        if not mensagem:
             return False
         
-        # Preparar tabela HTML com os produtos
-        rows = ""
-        data_atual = datetime.now().date()
-        
-        for produto in produtos:
-            data_validade = produto['data_validade']
-            if data_validade:
-                data_obj = datetime.strptime(data_validade, '%Y-%m-%d').date()
-                dias_restantes = (data_obj - data_atual).days
-                data_formatada = data_obj.strftime('%d/%m/%Y')
-            else:
-                dias_restantes = "N/A"
-                data_formatada = "Não informada"
-                
-            rows += f"""
-            <tr>
-                <td>{produto['id']}</td>
-                <td>{produto['nome']}</td>
-                <td>{produto['descricao'] or '-'}</td>
-                <td>{produto['quantidade']}</td>
-                <td>{data_formatada}</td>
-                <td>{dias_restantes}</td>
-                <td>{produto['fornecedor_nome'] or 'Não informado'}</td>
-            </tr>
-            """
+        return self.enviar_email(destinatarios, *mensagem)
+    
+    def mensagem_produtos_vencendo_urgente(self, produtos, dias_limite):
+        """
+        Monta o email de produtos próximos do vencimento (Urgente: 15 dias ou menos)
         
-        # Montar conteúdo HTML
-        html = f"""
-        <html>
-        <head>
-            <style>
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                }}
-                th, td {{
-                    border: 1px solid #ddd;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #f2f2f2;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f9f9f9;
-                }}
-                .alerta {{
-                    background-color: #fffacd;
-                    padding: 10px;
-                    border-left: 5px solid #ffd700;
-                    margin-bottom: 15px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h2>⚠️ Alerta de Produtos Vencendo</h2>
-            <div class="alerta">
-                <p>Os seguintes produtos vencerão nos próximos {dias_limite} dias:</p>
-            </div>
-            
-            <table>
-                <tr>
-                    <th>ID</th>
-                    <th>Nome</th>
-                    <th>Descrição</th>
-                    <th>Quantidade</th>
-                    <th>Data de Validade</th>
-                    <th>Dias Restantes</th>
-                    <th>Fornecedor</th>
-                </tr>
-                {rows}
-            </table>
+        Args:
+            produtos (list): Lista de produtos próximos do vencimento
+            dias_limite (int): Limite de dias para considerar urgente (geralmente 15)
             
-            <p>Recomendamos verificar o estoque e planejar ações adequadas para evitar perdas.</p>
-            <p>Este é um email automático. Por favor, não responda.</p>
-            <p>Data e hora: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>
-        </body>
-        </html>
+        Returns:
+            Mensagem: (assunto, html, texto) ou None se não houver produtos
         """
+        if not produtos:
+            return None
         
-        return self.enviar_email(
-            destinatarios=destinatarios,
-            assunto=f"⚠️ ALERTA: {len(produtos)} produtos vencendo nos próximos {dias_limite} dias",
-            conteudo_html=html
-        )
+        html, texto = templates_email.VENCENDO_URGENTE.renderizar(produtos, dias_limite=dias_limite)
+        assunto = f"🚨 URGENTE: {len(produtos)} produtos vencendo em {dias_limite} dias ou menos"
+        return Mensagem(assunto, html, texto)
     
     def notificar_produtos_vencendo_urgente(self, destinatarios, produtos, dias_limite):
         """
@@ -251,96 +248,12 @@ class EmailNotifier:
             produtos (list): Lista de produtos próximos do vencimento
             dias_limite (int): Limite de dias para considerar urgente (geralmente 15)
         """
-        if not produtos:
+        mensagem = self.mensagem_produtos_vencendo_urgente(produtos, dias_limite)
+        if not mensagem:
             return False
         
-        # Preparar tabela HTML com os produtos
-        rows = ""
-        data_atual = datetime.now().date()
-        
-        for produto in produtos:
-            data_validade = produto['data_validade']
-            if data_validade:
-                data_obj = datetime.strptime(data_validade, '%Y-%m-%d').date()
-                dias_restantes = (data_obj - data_atual).days
-                data_formatada = data_obj.strftime('%d/%m/%Y')
-            else:
-                dias_restantes = "N/A"
-                data_formatada = "Não informada"
-                
-            rows += f"""
-            <tr>
-                <td>{produto['id']}</td>
-                <td>{produto['nome']}</td>
-                <td>{produto['descricao'] or '-'}</td>
-                <td>{produto['quantidade']}</td>
-                <td>{data_formatada}</td>
-                <td>{dias_restantes}</td>
-                <td>{produto['fornecedor_nome'] or 'Não informado'}</td>
-            </tr>
-            """
-        
-        # Montar conteúdo HTML
-        html = f"""
-        <html>
-        <head>
-            <style>
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                }}
-                th, td {{
-                    border: 1px solid #ddd;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #f2f2f2;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f9f9f9;
-                }}
-                .urgente {{
-                    background-color: #ffebee;
-                    padding: 10px;
-                    border-left: 5px solid #d32f2f;
-                    margin-bottom: 15px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h2>🚨 URGENTE: Produtos Próximos ao Vencimento</h2>
-            <div class="urgente">
-                <p>Os seguintes produtos vencerão em {dias_limite} dias ou menos:</p>
-            </div>
-            
-            <table>
-                <tr>
-                    <th>ID</th>
-                    <th>Nome</th>
-                    <th>Descrição</th>
-                    <th>Quantidade</th>
-                    <th>Data de Validade</th>
-                    <th>Dias Restantes</th>
-                    <th>Fornecedor</th>
-                </tr>
-                {rows}
-            </table>
-            
-            <p><strong>AÇÃO IMEDIATA NECESSÁRIA!</strong> Por favor, verifique estes produtos e tome as providências necessárias para evitar perdas.</p>
-            <p>Este é um email automático. Por favor, não responda.</p>
-            <p>Data e hora: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>
-        </body>
-        </html>
-        """
-        
-        return self.enviar_email(
-            destinatarios=destinatarios,
-            assunto=f"🚨 URGENTE: {len(produtos)} produtos vencendo em {dias_limite} dias ou menos",
-            conteudo_html=html
-        )
+        return self.enviar_email(destinatarios, *mensagem)
     
-    # Método legado para compatibilidade
     def notificar_produtos_vencendo(self, destinatarios, produtos, dias_restantes):
         """
         Método legado para manter compatibilidade
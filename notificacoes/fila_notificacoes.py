@@ -0,0 +1,296 @@
+import json
+import hashlib
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+# Espera antes da 1ª nova tentativa; dobra a cada falha até o máximo
+ESPERA_INICIAL_SEGUNDOS = 60
+ESPERA_MAXIMA_SEGUNDOS = 6 * 60 * 60
+
+# Depois desta quantidade de tentativas a mensagem fica com status 'falhou'
+MAX_TENTATIVAS = 8
+
+# Mensagens em 'enviando' há mais tempo que isso foram interrompidas (processo encerrado no envio)
+ENVIO_INTERROMPIDO_SEGUNDOS = 10 * 60
+
+FORMATO_DATA = '%Y-%m-%d %H:%M:%S'
+
+
+def _agora():
+    return datetime.now().strftime(FORMATO_DATA)
+
+
+def calcular_chave(tipo, destinatarios, dados):
+    """
+    Chave de deduplicação de um alerta: o mesmo tipo, para os mesmos
+    destinatários e com os mesmos dados (ex.: ids e quantidades dos produtos)
+
+    Returns:
+        str: Hash SHA-1 em hexadecimal
+    """
+    conteudo = json.dumps([tipo, sorted(destinatarios), dados], sort_keys=True, default=str)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+class FilaNotificacoes:
+    """
+    Fila persistente (tabela notificacoes_fila do estoque.db) dos emails de
+    notificação. As verificações só enfileiram; o DespachanteNotificacoes
+    envia, com novas tentativas em espera exponencial, e registra o status
+    de cada mensagem. Um alerta idêntico a outro ainda na fila é descartado.
+    """
+
+    def __init__(self, db_manager):
+        """
+        Args:
+            db_manager: Instância do DatabaseManager (usa o pool de conexões)
+        """
+        self.db_manager = db_manager
+
+    def enfileirar(self, tipo, destinatarios, assunto, conteudo_html, chave=None, conteudo_texto=None,
+                   conn=None):
+        """
+        Adiciona um email à fila
+
+        Args:
+            tipo (str): Tipo do alerta (ex.: 'estoque_baixo', 'vencimento_urgente')
+            destinatarios (list): Lista de emails dos destinatários
+            assunto (str): Assunto do email
+            conteudo_html (str): Conteúdo do email em formato HTML
+            chave (str): Chave de deduplicação (padrão: calculada do assunto e do conteúdo)
+            conteudo_texto (str): Alternativa em texto simples (opcional)
+            conn: Conexão de uma transação já aberta com pool.escrita(), para
+                  enfileirar junto com outras alterações (opcional)
+
+        Returns:
+            int: Id da mensagem, ou None se um alerta idêntico já estiver na fila
+        """
+        if chave is None:
+            chave = calcular_chave(tipo, destinatarios, [assunto, conteudo_html])
+
+        agora = _agora()
+        with nullcontext(conn) if conn is not None else self.db_manager.pool.escrita() as conn:
+            cursor = conn.execute('''
+            INSERT OR IGNORE INTO notificacoes_fila
+                (tipo, chave, destinatarios, assunto, conteudo_html, conteudo_texto,
+                 proxima_tentativa, criada_em)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (tipo, chave, json.dumps(destinatarios), assunto, conteudo_html, conteudo_texto,
+                  agora, agora))
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def reservar(self, limite=20):
+        """
+        Marca como 'enviando' e retorna as mensagens pendentes cuja hora de
+        tentar chegou (de forma atômica, para que dois processos não enviem
+        a mesma mensagem)
+
+        Returns:
+            list: Mensagens (sqlite3.Row) reservadas
+        """
+        agora = _agora()
+        with self.db_manager.pool.escrita() as conn:
+            return conn.execute('''
+            UPDATE notificacoes_fila SET status = 'enviando', reservada_em = ?
+            WHERE id IN (
+                SELECT id FROM notificacoes_fila
+                WHERE status = 'pendente' AND proxima_tentativa <= ?
+                ORDER BY proxima_tentativa, id
+                LIMIT ?
+            )
+            RETURNING *
+            ''', (agora, agora, limite)).fetchall()
+
+    def marcar_enviada(self, mensagem_id):
+        with self.db_manager.pool.escrita() as conn:
+            conn.execute('''
+            UPDATE notificacoes_fila
+            SET status = 'enviada', tentativas = tentativas + 1, enviada_em = ?, ultimo_erro = NULL
+            WHERE id = ?
+            ''', (_agora(), mensagem_id))
+
+    def marcar_falha(self, mensagem, erro):
+        """
+        Registra uma tentativa sem sucesso e agenda a próxima, com espera
+        exponencial, ou marca a mensagem como 'falhou' após MAX_TENTATIVAS
+
+        Returns:
+            str: Novo status da mensagem
+        """
+        tentativas = mensagem['tentativas'] + 1
+        if tentativas >= MAX_TENTATIVAS:
+            status = 'falhou'
+            proxima = mensagem['proxima_tentativa']
+        else:
+            status = 'pendente'
+            espera = min(ESPERA_INICIAL_SEGUNDOS * 2 ** (tentativas - 1), ESPERA_MAXIMA_SEGUNDOS)
+            proxima = (datetime.now() + timedelta(seconds=espera)).strftime(FORMATO_DATA)
+
+        with self.db_manager.pool.escrita() as conn:
+            conn.execute('''
+            UPDATE notificacoes_fila
+            SET status = ?, tentativas = ?, proxima_tentativa = ?, ultimo_erro = ?
+            WHERE id = ?
+            ''', (status, tentativas, proxima, erro, mensagem['id']))
+        return status
+
+    def recuperar_interrompidas(self):
+        """
+        Devolve à fila as mensagens que ficaram em 'enviando' (o processo foi
+        encerrado durante o envio)
+
+        Returns:
+            int: Quantidade de mensagens recuperadas
+        """
+        limite = (datetime.now() - timedelta(seconds=ENVIO_INTERROMPIDO_SEGUNDOS)).strftime(FORMATO_DATA)
+        with self.db_manager.pool.escrita() as conn:
+            return conn.execute('''
+            UPDATE notificacoes_fila SET status = 'pendente'
+            WHERE status = 'enviando' AND reservada_em <= ?
+            ''', (limite,)).rowcount
+
+    def proxima_tentativa(self):
+        """
+        Returns:
+            datetime: Hora da próxima mensagem pendente, ou None se a fila estiver vazia
+        """
+        with self.db_manager.pool.leitura() as conn:
+            linha = conn.execute(
+                "SELECT MIN(proxima_tentativa) FROM notificacoes_fila WHERE status = 'pendente'"
+            ).fetchone()
+        return datetime.strptime(linha[0], FORMATO_DATA) if linha[0] else None
+
+    def metricas(self, dias=7):
+        """
+        Situação da fila e latência de entrega das mensagens enviadas no período
+
+        Args:
+            dias (int): Período considerado para enviadas, falhas e latência
+
+        Returns:
+            dict: Quantidades por status, latência média e máxima de entrega (segundos),
+                  total de novas tentativas e idade da pendente mais antiga (segundos)
+        """
+        desde = (datetime.now() - timedelta(days=dias)).strftime(FORMATO_DATA)
+        with self.db_manager.pool.leitura() as conn:
+            contagens = dict(conn.execute('''
+            SELECT status, COUNT(*) FROM notificacoes_fila
+            WHERE status IN ('pendente', 'enviando') OR criada_em >= ?
+            GROUP BY status
+            ''', (desde,)).fetchall())
+
+            latencia = conn.execute('''
+            SELECT AVG(segundos), MAX(segundos), SUM(tentativas - 1) FROM (
+                SELECT (julianday(enviada_em) - julianday(criada_em)) * 86400 AS segundos, tentativas
+                FROM notificacoes_fila
+                WHERE status = 'enviada' AND criada_em >= ?
+            )
+            ''', (desde,)).fetchone()
+
+            mais_antiga = conn.execute('''
+            SELECT (julianday(?) - julianday(MIN(criada_em))) * 86400
+            FROM notificacoes_fila WHERE status = 'pendente'
+            ''', (_agora(),)).fetchone()[0]
+
+        return {
+            'pendentes': contagens.get('pendente', 0),
+            'enviando': contagens.get('enviando', 0),
+            'enviadas': contagens.get('enviada', 0),
+            'falhas': contagens.get('falhou', 0),
+            'latencia_media_s': latencia[0],
+            'latencia_max_s': latencia[1],
+            'novas_tentativas': latencia[2] or 0,
+            'pendente_mais_antiga_s': mais_antiga,
+        }
+
+
+class DespachanteNotificacoes:
+    """
+    Envia as mensagens da FilaNotificacoes. Pode ser usado de forma síncrona
+    (despachar_pendentes, ex.: no final da verificação pelo cron) ou como
+    uma thread em segundo plano (iniciar/parar) que acorda quando há
+    mensagem nova (avisar) ou quando chega a hora de uma nova tentativa.
+    """
+
+    def __init__(self, fila, email_notifier, lote=20, intervalo_maximo=300):
+        """
+        Args:
+            fila (FilaNotificacoes): Fila de onde as mensagens são lidas
+            email_notifier (EmailNotifier): Notificador usado para o envio
+            lote (int): Mensagens reservadas e enviadas por sessão SMTP
+            intervalo_maximo (float): Tempo máximo, em segundos, entre verificações da fila
+        """
+        self.fila = fila
+        self.email_notifier = email_notifier
+        self.lote = lote
+        self.intervalo_maximo = intervalo_maximo
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def despachar_pendentes(self):
+        """
+        Envia as mensagens pendentes cuja hora de tentar chegou
+
+        Returns:
+            dict: Quantidade de mensagens 'enviadas', 'adiadas' e que 'falharam' de vez
+        """
+        resultado = {'enviadas': 0, 'adiadas': 0, 'falharam': 0}
+        self.fila.recuperar_interrompidas()
+
+        while not self._parar.is_set():
+            mensagens = self.fila.reservar(self.lote)
+            if not mensagens:
+                break
+
+            # Um lote por sessão SMTP
+            with self.email_notifier.sessao():
+                for mensagem in mensagens:
+                    enviado = self.email_notifier.enviar_email(
+                        json.loads(mensagem['destinatarios']), mensagem['assunto'],
+                        mensagem['conteudo_html'], mensagem['conteudo_texto']
+                    )
+                    if enviado:
+                        self.fila.marcar_enviada(mensagem['id'])
+                        resultado['enviadas'] += 1
+                    elif self.fila.marcar_falha(mensagem, self.email_notifier.ultimo_erro) == 'falhou':
+                        resultado['falharam'] += 1
+                    else:
+                        resultado['adiadas'] += 1
+
+        return resultado
+
+    def avisar(self):
+        """Acorda a thread de envio (ex.: logo depois de enfileirar)"""
+        self._acordar.set()
+
+    def iniciar(self):
+        """Inicia o envio em segundo plano"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="despachante-notificacoes", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=None):
+        """Interrompe a thread de envio depois da mensagem em andamento"""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self._acordar.clear()
+            try:
+                self.despachar_pendentes()
+                proxima = self.fila.proxima_tentativa()
+            except Exception as e:
+                print(f"Erro no envio das notificações: {e}")
+                proxima = None
+
+            espera = self.intervalo_maximo
+            if proxima is not None:
+                espera = min(espera, max(0.0, (proxima - datetime.now()).total_seconds()) + 0.5)
+            self._acordar.wait(espera)
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from email_notifier import EmailNotifier
+from fila_notificacoes import FilaNotificacoes, DespachanteNotificacoes, calcular_chave
 import os
 import json
 
@@ -20,8 +21,17 @@ class NotificacaoService:
             smtp_port=self.config['email']['smtp_port'],
             username=self.config['email']['username'],
             password=self.config['email']['password'],
-            sender_email=self.config['email']['sender_email']
+            sender_email=self.config['email']['sender_email'],
+            timeout=self.config['email'].get('timeout_segundos', 30),
+            usar_tls=self.config['email'].get('usar_tls', True)
         )
+        
+        # As verificações só enfileiram os emails; o despachante faz o envio
+        # (com novas tentativas) a partir da fila persistente no banco
+        self.fila = FilaNotificacoes(db_manager)
+        self.despachante = DespachanteNotificacoes(self.fila, self.email_notifier)
+        
+        self._importar_estado_legado()
     
     def _carregar_config(self):
         """
@@ -45,14 +55,13 @@ class NotificacaoService:
             'notificacoes': {
                 'estoque_baixo': {
                     'ativo': True,
-                    'verificar_a_cada_horas': 24,
-                    'ultima_verificacao': None
+                    'alerta_imediato': True,  # Alerta logo após a venda que cruzar o mínimo
+                    'verificar_a_cada_horas': 24
                 },
                 'vencimento': {
                     'ativo': True,
                     'alertas_dias': [15, 30],
-                    'verificar_a_cada_horas': 24,
-                    'ultima_verificacao': None
+                    'verificar_a_cada_horas': 24
                 }
             }
         }
@@ -85,18 +94,80 @@ class NotificacaoService:
             
             return default_config
     
-    def _salvar_config(self):
+    def _importar_estado_legado(self):
         """
-        Salva as configurações atualizadas no arquivo config.json
+        Importação única do estado das versões anteriores: a hora da última
+        verificação gravada no config.json (ultima_verificacao) é copiada para
+        a tabela notificacoes_estado se a verificação ainda não tiver registro
+        no banco. Depois disso o valor do config.json é ignorado.
         """
-        config_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.json')
-        try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Erro ao salvar configurações: {e}")
-            return False
+        legado = [(nome, config['ultima_verificacao'])
+                  for nome, config in self.config['notificacoes'].items()
+                  if isinstance(config, dict) and config.get('ultima_verificacao')]
+        if not legado:
+            return
+        
+        with self.db_manager.pool.escrita() as conn:
+            conn.executemany('''
+            INSERT INTO notificacoes_estado (verificacao, ultima_verificacao) VALUES (?, ?)
+            ON CONFLICT (verificacao) DO NOTHING
+            ''', legado)
+    
+    def ultima_verificacao(self, verificacao):
+        """
+        Hora da última execução de uma verificação periódica
+        
+        Args:
+            verificacao (str): 'estoque_baixo' ou 'vencimento'
+            
+        Returns:
+            datetime: Hora da última verificação, ou None se nunca foi feita
+        """
+        with self.db_manager.pool.leitura() as conn:
+            linha = conn.execute(
+                "SELECT ultima_verificacao FROM notificacoes_estado WHERE verificacao = ?",
+                (verificacao,)
+            ).fetchone()
+        
+        valor = linha[0] if linha else None
+        return datetime.fromisoformat(valor) if valor else None
+    
+    def registrar_verificacao(self, verificacao, quando):
+        """
+        Grava no banco a hora da última execução de uma verificação
+        
+        Args:
+            verificacao (str): 'estoque_baixo' ou 'vencimento'
+            quando (datetime): Hora da verificação, ou None para liberar a próxima imediatamente
+        """
+        with self.db_manager.pool.escrita() as conn:
+            conn.execute('''
+            INSERT INTO notificacoes_estado (verificacao, ultima_verificacao) VALUES (?, ?)
+            ON CONFLICT (verificacao) DO UPDATE SET ultima_verificacao = excluded.ultima_verificacao
+            ''', (verificacao, quando.isoformat() if quando else None))
+    
+    def redefinir_verificacao(self, verificacao):
+        """Libera a verificação para ser feita já, ignorando o intervalo (--force)"""
+        self.registrar_verificacao(verificacao, None)
+    
+    def proxima_verificacao(self, verificacao):
+        """
+        Hora a partir da qual a verificação pode ser feita de novo
+        
+        Args:
+            verificacao (str): 'estoque_baixo' ou 'vencimento'
+            
+        Returns:
+            datetime: Hora da próxima verificação, ou None se a notificação estiver desativada
+        """
+        config = self.config['notificacoes'][verificacao]
+        if not config['ativo']:
+            return None
+        
+        ultima = self.ultima_verificacao(verificacao)
+        if ultima is None:
+            return datetime.min  # Nunca foi feita: pode ser feita já
+        return ultima + timedelta(hours=config['verificar_a_cada_horas'])
     
     def verificar_estoque_baixo(self):
         """
@@ -109,34 +180,67 @@ class NotificacaoService:
         if not self.config['notificacoes']['estoque_baixo']['ativo']:
             return False
         
-        # Verifica quando foi a última verificação
-        ultima_verificacao = self.config['notificacoes']['estoque_baixo']['ultima_verificacao']
-        horas_intervalo = self.config['notificacoes']['estoque_baixo']['verificar_a_cada_horas']
-        
+        # Checa se já passou o intervalo de tempo desde a última verificação
         agora = datetime.now()
-        
-        # Se já fez verificação antes, checa se já passou o intervalo de tempo
-        if ultima_verificacao:
-            ultima = datetime.fromisoformat(ultima_verificacao)
-            if agora < ultima + timedelta(hours=horas_intervalo):
-                return False  # Ainda não passou tempo suficiente desde a última verificação
+        if agora < self.proxima_verificacao('estoque_baixo'):
+            return False  # Ainda não passou tempo suficiente desde a última verificação
         
         # Busca produtos com estoque baixo
         produtos = self.db_manager.verificar_produtos_estoque_baixo()
         
         # Atualiza última verificação
-        self.config['notificacoes']['estoque_baixo']['ultima_verificacao'] = agora.isoformat()
-        self._salvar_config()
+        self.registrar_verificacao('estoque_baixo', agora)
         
         # Se não tem produtos com estoque baixo, retorna
         if not produtos:
             return True
         
-        # Envia notificação
+        # Enfileira a notificação
         destinatarios = self.config['email']['destinatarios']
-        resultado = self.email_notifier.notificar_estoque_baixo(destinatarios, produtos)
+        mensagem = self.email_notifier.mensagem_estoque_baixo(produtos)
+        chave = calcular_chave('estoque_baixo', destinatarios,
+                               [(produto['id'], produto['quantidade']) for produto in produtos])
+        self.fila.enfileirar('estoque_baixo', destinatarios, mensagem.assunto, mensagem.html,
+                             chave, conteudo_texto=mensagem.texto)
+        self.despachante.avisar()
+        
+        return True
+    
+    def processar_eventos_estoque_baixo(self):
+        """
+        Envia o alerta de estoque baixo dos produtos que cruzaram o estoque
+        mínimo desde a última chamada (eventos gravados pelo gatilho do banco
+        nas vendas e ajustes), sem varrer todo o cadastro e sem esperar o
+        intervalo da verificação periódica
+        
+        Returns:
+            bool: True se algum alerta foi enfileirado, False caso contrário
+        """
+        ultimo_id, produtos = self.db_manager.eventos_estoque_baixo_pendentes()
+        if ultimo_id is None:
+            return False
         
-        return resultado
+        # Com a notificação desativada os eventos são apenas descartados
+        config = self.config['notificacoes']['estoque_baixo']
+        mensagem = None
+        if produtos and config['ativo'] and config.get('alerta_imediato', True):
+            destinatarios = self.config['email']['destinatarios']
+            mensagem = self.email_notifier.mensagem_estoque_baixo(produtos)
+            chave = calcular_chave('estoque_baixo', destinatarios,
+                                   [(produto['id'], produto['quantidade']) for produto in produtos])
+        
+        # O alerta é enfileirado e os eventos consumidos na mesma transação: ou os
+        # dois acontecem, ou os eventos continuam pendentes para a próxima leitura
+        with self.db_manager.pool.escrita() as conn:
+            if mensagem is not None:
+                self.fila.enfileirar('estoque_baixo', destinatarios, mensagem.assunto, mensagem.html,
+                                     chave, conteudo_texto=mensagem.texto, conn=conn)
+            self.db_manager.consumir_eventos_estoque(ultimo_id, conn=conn)
+        
+        enfileirado = mensagem is not None
+        if enfileirado:
+            self.despachante.avisar()
+        return enfileirado
     
     def verificar_produtos_vencendo(self):
         """
@@ -149,21 +253,13 @@ class NotificacaoService:
         if not self.config['notificacoes']['vencimento']['ativo']:
             return False
         
-        # Verifica quando foi a última verificação
-        ultima_verificacao = self.config['notificacoes']['vencimento']['ultima_verificacao']
-        horas_intervalo = self.config['notificacoes']['vencimento']['verificar_a_cada_horas']
-        
+        # Checa se já passou o intervalo de tempo desde a última verificação
         agora = datetime.now()
-        
-        # Se já fez verificação antes, checa se já passou o intervalo de tempo
-        if ultima_verificacao:
-            ultima = datetime.fromisoformat(ultima_verificacao)
-            if agora < ultima + timedelta(hours=horas_intervalo):
-                return False  # Ainda não passou tempo suficiente desde a última verificação
+        if agora < self.proxima_verificacao('vencimento'):
+            return False  # Ainda não passou tempo suficiente desde a última verificação
         
         # Atualiza última verificação
-        self.config['notificacoes']['vencimento']['ultima_verificacao'] = agora.isoformat()
-        self._salvar_config()
+        self.registrar_verificacao('vencimento', agora)
         
         # Pega os limites de dias para alertas (15 e 30 dias por padrão)
         dias_alerta = sorted(self.config['notificacoes']['vencimento']['alertas_dias'], reverse=True)
@@ -191,24 +287,42 @@ class NotificacaoService:
             elif dias_alerta[-1] < dias_restantes <= dias_alerta[0]:  # 16-30 dias por padrão (alerta)
                 produtos_alerta.append(produto)
         
-        # Envia as notificações
+        # Enfileira as notificações
         destinatarios = self.config['email']['destinatarios']
         resultados = {}
         
-        # Envia notificação para produtos urgentes (15 dias ou menos)
+        # Notificação para produtos urgentes (15 dias ou menos)
         if produtos_urgentes:
-            resultados["urgente"] = self.email_notifier.notificar_produtos_vencendo_urgente(
-                destinatarios, produtos_urgentes, dias_alerta[-1]
+            mensagem = self.email_notifier.mensagem_produtos_vencendo_urgente(
+                produtos_urgentes, dias_alerta[-1]
+            )
+            resultados["urgente"] = self._enfileirar_vencimento(
+                'vencimento_urgente', destinatarios, produtos_urgentes, mensagem
             )
         
-        # Envia notificação para produtos em alerta (entre 16 e 30 dias)
+        # Notificação para produtos em alerta (entre 16 e 30 dias)
         if produtos_alerta:
-            resultados["alerta"] = self.email_notifier.notificar_produtos_vencendo_alerta(
-                destinatarios, produtos_alerta, dias_alerta[0]
+            mensagem = self.email_notifier.mensagem_produtos_vencendo_alerta(
+                produtos_alerta, dias_alerta[0]
+            )
+            resultados["alerta"] = self._enfileirar_vencimento(
+                'vencimento_alerta', destinatarios, produtos_alerta, mensagem
             )
         
+        if resultados:
+            self.despachante.avisar()
+        
         return len(resultados) > 0
     
+    def _enfileirar_vencimento(self, tipo, destinatarios, produtos, mensagem):
+        """Enfileira um alerta de vencimento; alertas idênticos ainda na fila são ignorados"""
+        chave = calcular_chave(tipo, destinatarios,
+                               [(produto['id'], produto['quantidade'], produto['data_validade'])
+                                for produto in produtos])
+        self.fila.enfileirar(tipo, destinatarios, mensagem.assunto, mensagem.html,
+                             chave, conteudo_texto=mensagem.texto)
+        return True
+    
     def _buscar_todos_produtos_vencendo(self, dias_max):
         """
         Busca todos os produtos que irão vencer nos próximos X dias
@@ -230,16 +344,16 @@ class NotificacaoService:
         data_atual_str = data_atual.strftime('%Y-%m-%d')
         data_limite_str = data_limite.strftime('%Y-%m-%d')
         
-        # Executar consulta SQL
-        self.db_manager.cursor.execute('''
-        SELECT p.*, f.nome as fornecedor_nome 
-        FROM produtos p 
-        LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-        WHERE p.data_validade BETWEEN ? AND ?
-        ORDER BY p.data_validade
-        ''', (data_atual_str, data_limite_str))
-        
-        return self.db_manager.cursor.fetchall()
+        # Executar consulta SQL em uma conexão de leitura do pool (no modo daemon a
+        # conexão de escrita é usada ao mesmo tempo pela thread de envio)
+        with self.db_manager.pool.leitura() as conn:
+            return conn.execute('''
+            SELECT p.*, f.nome as fornecedor_nome 
+            FROM produtos p 
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.data_validade BETWEEN ? AND ?
+            ORDER BY p.data_validade
+            ''', (data_atual_str, data_limite_str)).fetchall()
     
     def verificar_todas_notificacoes(self):
         """
@@ -249,6 +363,7 @@ class NotificacaoService:
             dict: Resultados de cada verificação
         """
         resultados = {
+            'estoque_baixo_eventos': self.processar_eventos_estoque_baixo(),
             'estoque_baixo': self.verificar_estoque_baixo(),
             'produtos_vencendo': self.verificar_produtos_vencendo()
         }
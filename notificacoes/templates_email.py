@@ -0,0 +1,190 @@
+from collections import namedtuple
+from datetime import date, datetime
+from html import escape
+
+# Email pronto para envio: assunto, conteúdo HTML e alternativa em texto simples
+Mensagem = namedtuple('Mensagem', 'assunto html texto')
+
+ESTILO = """
+        <style>
+            table {
+                border-collapse: collapse;
+                width: 100%;
+            }
+            th, td {
+                border: 1px solid #ddd;
+                padding: 8px;
+                text-align: left;
+            }
+            th {
+                background-color: #f2f2f2;
+            }
+            tr:nth-child(even) {
+                background-color: #f9f9f9;
+            }
+            .alerta {
+                background-color: #fffacd;
+                padding: 10px;
+                border-left: 5px solid #ffd700;
+                margin-bottom: 15px;
+            }
+            .urgente {
+                background-color: #ffebee;
+                padding: 10px;
+                border-left: 5px solid #d32f2f;
+                margin-bottom: 15px;
+            }
+        </style>"""
+
+RODAPE_AUTOMATICO = "Este é um email automático. Por favor, não responda."
+
+
+class TemplateAlerta:
+    """
+    Email de alerta com uma tabela de produtos, compilado uma única vez.
+
+    As partes fixas do HTML (estilo, cabeçalho da tabela) são montadas na
+    criação do template; cada linha é um str.format de uma string pronta e
+    o documento é juntado com ''.join, em tempo linear no número de produtos.
+    Todos os valores são escapados. A mesma tabela gera a parte em texto simples.
+    """
+
+    def __init__(self, titulo, classe, introducao, colunas, valores, rodape=()):
+        """
+        Args:
+            titulo (str): Título do email (HTML confiável)
+            classe (str): Classe CSS do quadro de introdução ('alerta' ou 'urgente')
+            introducao (str): Texto de introdução; aceita campos do contexto (ex.: {dias_limite})
+            colunas (list): Cabeçalhos da tabela
+            valores (callable): Recebe (produto, datas) e retorna a tupla de valores da linha
+            rodape (tuple): Parágrafos (HTML confiável) exibidos antes do aviso de email automático
+        """
+        self.titulo = titulo
+        self.introducao = introducao
+        self.colunas = colunas
+        self.valores = valores
+
+        self._inicio = (
+            f"<html>\n<head>{ESTILO}\n</head>\n<body>\n"
+            f"    <h2>{titulo}</h2>\n"
+            f"    <div class=\"{classe}\">\n        <p>{{introducao}}</p>\n    </div>\n"
+            "    <table>\n        <tr>"
+            + "".join(f"<th>{escape(coluna)}</th>" for coluna in colunas)
+            + "</tr>\n"
+        )
+        self._linha = "        <tr>" + "<td>{}</td>" * len(colunas) + "</tr>\n"
+        self._fim = (
+            "    </table>\n"
+            + "".join(f"    <p>{paragrafo}</p>\n" for paragrafo in rodape)
+            + f"    <p>{RODAPE_AUTOMATICO}</p>\n"
+            "    <p>Data e hora: {data_hora}</p>\n</body>\n</html>\n"
+        )
+        self._rodape_texto = [_texto_simples(paragrafo) for paragrafo in rodape]
+
+    def renderizar(self, produtos, **contexto):
+        """
+        Gera o HTML e o texto simples do alerta
+
+        Args:
+            produtos (list): Produtos da tabela (sqlite3.Row ou dict)
+            **contexto: Campos usados na introdução (ex.: dias_limite)
+
+        Returns:
+            tuple: (html, texto)
+        """
+        datas = DatasValidade()
+        linhas = [tuple(str(valor) for valor in self.valores(produto, datas)) for produto in produtos]
+
+        introducao = self.introducao.format(**contexto)
+        data_hora = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+
+        formato = self._linha.format
+        partes = [self._inicio.replace("{introducao}", escape(introducao))]
+        partes.extend(formato(*map(escape, linha)) for linha in linhas)
+        partes.append(self._fim.replace("{data_hora}", data_hora))
+        html = "".join(partes)
+
+        texto = [_texto_simples(self.titulo), "", introducao, "", " | ".join(self.colunas)]
+        texto.extend(" | ".join(linha) for linha in linhas)
+        texto.append("")
+        texto.extend(self._rodape_texto)
+        texto.append(RODAPE_AUTOMATICO)
+        texto.append(f"Data e hora: {data_hora}")
+        return html, "\n".join(texto)
+
+
+class DatasValidade:
+    """
+    Converte as datas de validade (texto AAAA-MM-DD do banco) para exibição
+    e dias restantes. Cada data distinta é convertida uma única vez.
+    """
+
+    def __init__(self, hoje=None):
+        self.hoje = hoje or date.today()
+        self._cache = {}
+
+    def __call__(self, valor):
+        """
+        Returns:
+            tuple: (data formatada DD/MM/AAAA, dias restantes)
+        """
+        if not valor:
+            return "Não informada", "N/A"
+
+        convertida = self._cache.get(valor)
+        if convertida is None:
+            try:
+                data = valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])
+                convertida = (data.strftime('%d/%m/%Y'), (data - self.hoje).days)
+            except ValueError:
+                convertida = (str(valor), "N/A")
+            self._cache[valor] = convertida
+        return convertida
+
+
+def _texto_simples(html):
+    """Remove as marcações de um trecho HTML confiável (títulos e rodapés fixos)"""
+    for marcacao in ("<strong>", "</strong>"):
+        html = html.replace(marcacao, "")
+    return html
+
+
+def _valores_estoque_baixo(produto, datas):
+    return (produto['id'], produto['nome'], produto['descricao'] or '-', produto['quantidade'],
+            produto['estoque_minimo'], produto['fornecedor_nome'] or 'Não informado')
+
+
+def _valores_vencimento(produto, datas):
+    data_formatada, dias_restantes = datas(produto['data_validade'])
+    return (produto['id'], produto['nome'], produto['descricao'] or '-', produto['quantidade'],
+            data_formatada, dias_restantes, produto['fornecedor_nome'] or 'Não informado')
+
+
+COLUNAS_VENCIMENTO = ["ID", "Nome", "Descrição", "Quantidade", "Data de Validade", "Dias Restantes", "Fornecedor"]
+
+ESTOQUE_BAIXO = TemplateAlerta(
+    titulo="⚠️ Alerta de Estoque Baixo",
+    classe="alerta",
+    introducao="Os seguintes produtos estão com estoque abaixo do mínimo definido e precisam de reposição:",
+    colunas=["ID", "Nome", "Descrição", "Quantidade", "Estoque Mínimo", "Fornecedor"],
+    valores=_valores_estoque_baixo,
+)
+
+VENCENDO_ALERTA = TemplateAlerta(
+    titulo="⚠️ Alerta de Produtos Vencendo",
+    classe="alerta",
+    introducao="Os seguintes produtos vencerão nos próximos {dias_limite} dias:",
+    colunas=COLUNAS_VENCIMENTO,
+    valores=_valores_vencimento,
+    rodape=("Recomendamos verificar o estoque e planejar ações adequadas para evitar perdas.",),
+)
+
+VENCENDO_URGENTE = TemplateAlerta(
+    titulo="🚨 URGENTE: Produtos Próximos ao Vencimento",
+    classe="urgente",
+    introducao="Os seguintes produtos vencerão em {dias_limite} dias ou menos:",
+    colunas=COLUNAS_VENCIMENTO,
+    valores=_valores_vencimento,
+    rodape=("<strong>AÇÃO IMEDIATA NECESSÁRIA!</strong> Por favor, verifique estes produtos e "
+            "tome as providências necessárias para evitar perdas.",),
+)
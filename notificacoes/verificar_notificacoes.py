@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import sys
+import signal
 import argparse
 from datetime import datetime
 
@@ -12,25 +13,74 @@ sys.path.append(parent_dir)
 # Importa os módulos do sistema
 from database.db_manager import DatabaseManager
 from notificacao_service import NotificacaoService
+from agendador_notificacoes import AgendadorNotificacoes
+
+def exibir_fila(fila):
+    """Mostra a situação da fila de emails de notificação dos últimos 7 dias"""
+    metricas = fila.metricas(dias=7)
+    print(f"Pendentes: {metricas['pendentes']} | Enviando: {metricas['enviando']} | "
+          f"Enviadas: {metricas['enviadas']} | Falhas: {metricas['falhas']} | "
+          f"Novas tentativas: {metricas['novas_tentativas']}")
+    if metricas['latencia_media_s'] is not None:
+        print(f"Latência de entrega: média {metricas['latencia_media_s']:.0f} s, "
+              f"máxima {metricas['latencia_max_s']:.0f} s")
+    if metricas['pendente_mais_antiga_s'] is not None:
+        print(f"Pendente mais antiga: {metricas['pendente_mais_antiga_s'] / 60:.0f} min")
+
+def executar_daemon(notificacao_service, verificacoes):
+    """
+    Mantém o processo em execução, fazendo cada verificação no seu intervalo
+    e enviando os emails da fila em segundo plano, até receber SIGTERM ou SIGINT
+    
+    Args:
+        notificacao_service (NotificacaoService): Serviço com o banco já aberto
+        verificacoes (tuple): Verificações agendadas ('estoque_baixo', 'vencimento')
+    """
+    agendador = AgendadorNotificacoes(notificacao_service, verificacoes)
+    
+    def encerrar(signum, frame):
+        print(f"Sinal {signal.Signals(signum).name} recebido, encerrando...")
+        agendador.parar()
+    
+    signal.signal(signal.SIGTERM, encerrar)
+    signal.signal(signal.SIGINT, encerrar)
+    
+    for nome in verificacoes:
+        proxima = notificacao_service.proxima_verificacao(nome)
+        if proxima is None:
+            situacao = 'desativada'
+        elif proxima <= datetime.now():
+            situacao = 'agora'
+        else:
+            situacao = proxima.strftime('%d/%m/%Y %H:%M:%S')
+        print(f"Verificação '{nome}': próxima em {situacao}")
+    
+    agendador.executar()
 
 def main():
     """
     Script principal para verificar condições de estoque e enviar notificações
     
     Uso:
-        python verificar_notificacoes.py [--estoque] [--vencimento] [--all] [--force]
+        python verificar_notificacoes.py [--estoque] [--vencimento] [--all] [--force] [--fila] [--daemon]
         
     Argumentos:
         --estoque: Verifica apenas produtos com estoque baixo
         --vencimento: Verifica apenas produtos próximos do vencimento
         --all: Verifica todas as condições (padrão se nenhum argumento for fornecido)
         --force: Força a verificação mesmo que tenha sido feita recentemente
+        --fila: Mostra a situação da fila de emails (pendentes, falhas, latência) e sai
+        --daemon: Continua em execução e repete cada verificação no seu intervalo
+                  (verificar_a_cada_horas), até receber SIGTERM
     """
     parser = argparse.ArgumentParser(description='Verifica condições de estoque e envia notificações')
     parser.add_argument('--estoque', action='store_true', help='Verifica apenas produtos com estoque baixo')
     parser.add_argument('--vencimento', action='store_true', help='Verifica apenas produtos próximos do vencimento')
     parser.add_argument('--all', action='store_true', help='Verifica todas as condições')
     parser.add_argument('--force', action='store_true', help='Força a verificação mesmo que tenha sido feita recentemente')
+    parser.add_argument('--fila', action='store_true', help='Mostra a situação da fila de emails e sai')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Continua em execução e repete as verificações no intervalo configurado')
     
     args = parser.parse_args()
     
@@ -43,19 +93,33 @@ def main():
     try:
         # Inicializa o gerenciador de banco de dados
         db_path = os.path.join(parent_dir, 'database', 'estoque.db')
-        db_manager = DatabaseManager(db_file=db_path)
+        # No modo daemon o processo usa uma única conexão de leitura, compartilhada
+        # pelas verificações e pela thread de envio
+        db_manager = DatabaseManager(db_file=db_path, leitores=1 if args.daemon else 2)
         
         # Inicializa o serviço de notificações
         notificacao_service = NotificacaoService(db_manager)
         
+        if args.fila:
+            exibir_fila(notificacao_service.fila)
+            sys.exit(0)
+        
         # Se forçar verificação, redefine última verificação
         if args.force:
             print("Forçando verificação (ignorando intervalo de tempo)...")
             if args.estoque or args.all:
-                notificacao_service.config['notificacoes']['estoque_baixo']['ultima_verificacao'] = None
+                notificacao_service.redefinir_verificacao('estoque_baixo')
             if args.vencimento or args.all:
-                notificacao_service.config['notificacoes']['vencimento']['ultima_verificacao'] = None
-            notificacao_service._salvar_config()
+                notificacao_service.redefinir_verificacao('vencimento')
+        
+        if args.daemon:
+            verificacoes = tuple(nome for nome, selecionada in (('estoque_baixo', args.estoque or args.all),
+                                                               ('vencimento', args.vencimento or args.all))
+                                 if selecionada)
+            executar_daemon(notificacao_service, verificacoes)
+            db_manager.fechar()
+            print(f"Serviço de notificações encerrado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+            sys.exit(0)
         
         # Executa as verificações conforme os argumentos
         if args.all:
@@ -65,6 +129,9 @@ def main():
         else:
             if args.estoque:
                 print("Verificando produtos com estoque baixo...")
+                resultado = notificacao_service.processar_eventos_estoque_baixo()
+                print(f"Resultado estoque baixo (vendas desde a última execução): "
+                      f"{'Alerta enfileirado' if resultado else 'Nenhum produto novo abaixo do mínimo'}")
                 resultado = notificacao_service.verificar_estoque_baixo()
                 print(f"Resultado estoque baixo: {'Verificado' if resultado else 'Não verificado/enviado'}")
             
@@ -73,6 +140,11 @@ def main():
                 resultado = notificacao_service.verificar_produtos_vencendo()
                 print(f"Resultado produtos vencendo: {'Verificado' if resultado else 'Não verificado/enviado'}")
         
+        # Envia os emails enfileirados (inclusive novas tentativas de envios anteriores)
+        envio = notificacao_service.despachante.despachar_pendentes()
+        print(f"Envio: {envio['enviadas']} enviado(s), {envio['adiadas']} adiado(s) para nova tentativa, "
+              f"{envio['falharam']} com falha definitiva")
+        
         print("Verificação concluída com sucesso.")
         
     except Exception as e:
@@ -0,0 +1,110 @@
+import os
+import sys
+import random
+import tempfile
+import time
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database.db_manager import DatabaseManager
+
+# Orçamento de latência da busca do caixa (ms, percentil 95)
+ORCAMENTO_MS = 5.0
+
+MARCAS = ["Nestlé", "Garoto", "Lacta", "Arcor", "Fini", "Dori", "Santa Helena",
+          "Coca-Cola", "Ambev", "Elma Chips", "Bauducco", "Trident", "Halls", "Ferrero"]
+TIPOS = ["Chocolate", "Bala", "Pirulito", "Paçoca", "Pé de Moleque", "Chiclete",
+         "Refrigerante", "Suco", "Biscoito", "Wafer", "Amendoim", "Bombom", "Jujuba",
+         "Marshmallow", "Água", "Salgadinho", "Doce de Leite", "Goiabada", "Cocada"]
+SABORES = ["ao Leite", "Meio Amargo", "Morango", "Menta", "Uva", "Limão", "Laranja",
+           "Coco", "Avelã", "Caramelo", "Baunilha", "Zero", "Tradicional", "Diet"]
+EMBALAGENS = ["20g", "40g", "90g", "150g", "200g", "350ml", "600ml", "1L", "2L", "Pacote", "Caixa"]
+
+def gerar_catalogo(db, quantidade):
+    """Insere um catálogo sintético de produtos com nomes e códigos realistas"""
+    random.seed(42)
+    linhas = []
+    for i in range(quantidade):
+        nome = f"{random.choice(TIPOS)} {random.choice(MARCAS)} {random.choice(SABORES)} {random.choice(EMBALAGENS)}"
+        linhas.append((
+            f"789{i:010d}", nome, f"Produto sintético {i}",
+            random.randint(0, 200), random.randint(0, 20),
+            1.0, 30.0, 1.3, "2030-12-31", "Prateleira", None
+        ))
+
+    with db.pool.escrita() as conn:
+        conn.executemany('''
+        INSERT INTO produtos (
+            codigo_barras, nome, descricao, quantidade, estoque_minimo,
+            preco_compra, margem_lucro, preco_venda,
+            data_validade, localizacao, fornecedor_id
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', linhas)
+        conn.execute("ANALYZE")
+
+    return linhas
+
+def gerar_consultas(linhas, quantidade):
+    """Mistura de leituras de código de barras, prefixos de nome e buscas com erro de digitação"""
+    consultas = []
+    for _ in range(quantidade):
+        linha = random.choice(linhas)
+        nome = linha[1]
+        tipo = random.random()
+        if tipo < 0.4:
+            consultas.append(linha[0])                          # código de barras
+        elif tipo < 0.7:
+            consultas.append(nome[:random.randint(3, 8)])       # prefixo do nome
+        elif tipo < 0.9:
+            palavras = nome.split()
+            consultas.append(" ".join(p[:4] for p in palavras[:2]))  # prefixos de duas palavras
+        else:
+            consultas.append(nome.split()[0][:4] + "x")         # erro de digitação
+    return consultas
+
+def medir(db, consultas, limite=10):
+    """Executa as consultas e retorna as latências em milissegundos"""
+    latencias = []
+    for texto in consultas:
+        inicio = time.perf_counter()
+        db.buscar_produtos_por_nome(texto, limite=limite)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    return latencias
+
+def percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+def main():
+    tamanho = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    num_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db = DatabaseManager(db_file=os.path.join(diretorio, "benchmark.db"))
+
+        print(f"Gerando catálogo sintético com {tamanho} produtos...")
+        linhas = gerar_catalogo(db, tamanho)
+        consultas = gerar_consultas(linhas, num_consultas)
+
+        # Aquecimento do cache de páginas e de instruções preparadas
+        medir(db, consultas[:100])
+        latencias = medir(db, consultas)
+        db.fechar()
+
+    p50 = percentil(latencias, 50)
+    p95 = percentil(latencias, 95)
+    p99 = percentil(latencias, 99)
+    print(f"Consultas: {len(latencias)}")
+    print(f"p50: {p50:.3f} ms | p95: {p95:.3f} ms | p99: {p99:.3f} ms | máx: {latencias[-1]:.3f} ms")
+
+    if p95 > ORCAMENTO_MS:
+        print(f"FALHA: p95 acima do orçamento de {ORCAMENTO_MS} ms")
+        sys.exit(1)
+    print(f"OK: p95 dentro do orçamento de {ORCAMENTO_MS} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import random
+from datetime import date, datetime, timedelta
+
+# Adiciona o diretório das notificações ao path (os módulos usam importação direta)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(parent_dir, 'notificacoes'))
+
+import templates_email
+
+# Quantidades de produtos por alerta
+TAMANHOS = [1000, 10000, 50000]
+
+# O tempo por produto no maior alerta pode ser no máximo este múltiplo do tempo no menor
+LIMITE_CRESCIMENTO = 2.0
+
+REPETICOES = 3
+
+def gerar_produtos(quantidade):
+    """Produtos sintéticos no formato das consultas de notificação (inclui caracteres a escapar)"""
+    random.seed(quantidade)
+    hoje = date.today()
+    return [{
+        'id': i,
+        'nome': f"Doce <sortido> & cia {i}",
+        'descricao': random.choice([None, "Caixa com 12 \"unidades\""]),
+        'quantidade': random.randint(0, 50),
+        'estoque_minimo': random.randint(0, 20),
+        'data_validade': (hoje + timedelta(days=random.randint(0, 30))).isoformat(),
+        'fornecedor_nome': random.choice([None, "Fornecedor Ltda"]),
+    } for i in range(quantidade)]
+
+def renderizar_concatenando(produtos, dias_limite):
+    """Montagem anterior da tabela: concatenação com += e strptime por linha (referência)"""
+    rows = ""
+    data_atual = datetime.now().date()
+    for produto in produtos:
+        data_obj = datetime.strptime(produto['data_validade'], '%Y-%m-%d').date()
+        dias_restantes = (data_obj - data_atual).days
+        rows += f"""
+            <tr>
+                <td>{produto['id']}</td>
+                <td>{produto['nome']}</td>
+                <td>{produto['descricao'] or '-'}</td>
+                <td>{produto['quantidade']}</td>
+                <td>{data_obj.strftime('%d/%m/%Y')}</td>
+                <td>{dias_restantes}</td>
+                <td>{produto['fornecedor_nome'] or 'Não informado'}</td>
+            </tr>
+            """
+    return f"<html><body><p>{dias_limite}</p><table>{rows}</table></body></html>"
+
+def medir(funcao, *args, **kwargs):
+    """Menor tempo (ms) entre algumas repetições"""
+    melhor = None
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao(*args, **kwargs)
+        duracao = (time.perf_counter() - inicio) * 1000
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+def main():
+    tamanhos = [int(valor) for valor in sys.argv[1:]] or TAMANHOS
+    por_produto = {}
+
+    for tamanho in tamanhos:
+        produtos = gerar_produtos(tamanho)
+        html, texto = templates_email.VENCENDO_URGENTE.renderizar(produtos, dias_limite=15)
+
+        tempo_template = medir(templates_email.VENCENDO_URGENTE.renderizar, produtos, dias_limite=15)
+        tempo_estoque = medir(templates_email.ESTOQUE_BAIXO.renderizar, produtos)
+        tempo_anterior = medir(renderizar_concatenando, produtos, 15)
+        por_produto[tamanho] = tempo_template / tamanho
+
+        print(f"{tamanho:>6} produtos | vencimento: {tempo_template:8.1f} ms | estoque baixo: {tempo_estoque:8.1f} ms | "
+              f"concatenação anterior: {tempo_anterior:8.1f} ms | HTML {len(html) / 1024:.0f} KB, texto {len(texto) / 1024:.0f} KB")
+
+    menor, maior = min(tamanhos), max(tamanhos)
+    crescimento = por_produto[maior] / por_produto[menor]
+    print(f"Tempo por produto: {por_produto[menor] * 1000:.2f} µs ({menor}) -> {por_produto[maior] * 1000:.2f} µs ({maior})")
+
+    if crescimento > LIMITE_CRESCIMENTO:
+        print(f"FALHA: renderização cresce mais que linearmente ({crescimento:.1f}x por produto)")
+        sys.exit(1)
+    print("OK: renderização em tempo linear")
+
+if __name__ == "__main__":
+    main()
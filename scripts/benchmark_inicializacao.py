@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import random
+import subprocess
+import tempfile
+from datetime import datetime, timedelta
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+# Tamanhos dos bancos sintéticos (produtos); cada banco tem 3 vendas por produto
+TAMANHOS = [1000, 10000, 50000]
+
+# Uma medida só é regressão se passar da referência por esta fração e por esta folga (ms)
+TOLERANCIA = 0.25
+FOLGA_MS = 50.0
+
+# Medidas comparadas com a referência
+MEDIDAS = ['db.abrir', 'main_window.criar', 'pagina_inicial', 'pagina_inicial.adiado', 'paginas', 'consultas_vencimento', 'total']
+
+def gerar_banco(caminho, num_produtos):
+    """
+    Cria um banco sintético com produtos (parte vencendo ou com estoque baixo),
+    clientes e vendas distribuídas no último ano
+    """
+    from database.db_manager import DatabaseManager
+
+    random.seed(num_produtos)
+    hoje = datetime.now()
+    db = DatabaseManager(db_file=caminho)
+
+    produtos = []
+    for i in range(num_produtos):
+        validade = (hoje + timedelta(days=random.randint(-30, 720))).strftime('%Y-%m-%d')
+        produtos.append((
+            f"789{i:010d}", f"Produto sintético {i}", random.randint(0, 200),
+            random.randint(0, 20), 1.0, 30.0, 1.3, validade
+        ))
+
+    clientes = [(f"Cliente {i}", f"{i:011d}") for i in range(max(10, num_produtos // 50))]
+
+    vendas = []
+    itens = []
+    for venda_id in range(1, num_produtos * 3 + 1):
+        data_hora = (hoje - timedelta(minutes=random.randint(0, 365 * 24 * 60))).strftime('%Y-%m-%d %H:%M:%S')
+        quantidade = random.randint(1, 5)
+        vendas.append((venda_id, data_hora, random.choice([None, random.randint(1, len(clientes))]),
+                       quantidade * 1.3, random.choice(["Dinheiro", "Cartão de Crédito", "PIX"])))
+        itens.append((venda_id, random.randint(1, num_produtos), quantidade, 1.3, quantidade * 1.3))
+
+    with db.pool.escrita() as conn:
+        conn.executemany('''
+        INSERT INTO produtos (codigo_barras, nome, quantidade, estoque_minimo,
+                              preco_compra, margem_lucro, preco_venda, data_validade)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', produtos)
+        conn.executemany("INSERT INTO clientes (nome, documento) VALUES (?, ?)", clientes)
+        conn.executemany('''
+        INSERT INTO vendas (id, data_hora, cliente_id, valor_total, forma_pagamento)
+        VALUES (?, ?, ?, ?, ?)
+        ''', vendas)
+        conn.executemany('''
+        INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+        VALUES (?, ?, ?, ?, ?)
+        ''', itens)
+        conn.execute("ANALYZE")
+
+    db.reconstruir_resumo_vendas()
+    db.fechar()
+
+def medir_inicializacao(db_path):
+    """
+    Executa o caminho de inicialização de main.py (sem a tela de login) e
+    retorna as medidas da linha do tempo
+    """
+    from PyQt5.QtCore import QCoreApplication, QEventLoop
+    from utils.perfil_inicializacao import perfil
+    from config.settings import Settings
+    from database.db_manager import DatabaseManager
+    from ui.main_window import MainWindow
+
+    with perfil.medir('db.abrir'):
+        db = DatabaseManager(db_file=db_path)
+
+    with perfil.medir('main_window.criar'):
+        janela = MainWindow(db, Settings())
+        janela.show()
+
+    with perfil.medir('pagina_inicial'):
+        janela.criar_pagina_inicial()
+
+    # Primeira pintura e o trabalho que as páginas adiam para as voltas
+    # seguintes do laço de eventos (gráficos do dashboard)
+    with perfil.medir('pagina_inicial.adiado'):
+        QCoreApplication.processEvents(QEventLoop.AllEvents, 50)
+
+    with perfil.medir('consultas_vencimento'):
+        db.verificar_produtos_vencidos()
+        db.verificar_produtos_vencendo(dias=15)
+
+    with perfil.medir('paginas'):
+        for index in range(len(janela.paginas)):
+            janela.pagina(index)
+
+    # Esperar as consultas em segundo plano disparadas pelas páginas
+    janela.consultas.aguardar()
+    QCoreApplication.processEvents()
+    perfil.marcar('fim')
+
+    resumo = perfil.resumo()
+    janela.close()
+    return resumo
+
+def executar(db_path, saida):
+    """Processo filho: uma inicialização a frio e outra a quente no mesmo processo"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from utils.perfil_inicializacao import perfil
+    perfil.ativar(saida)
+
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    app = QApplication([])
+    # Diálogos modais travariam a medição
+    QMessageBox.critical = QMessageBox.warning = QMessageBox.information = staticmethod(lambda *args: None)
+
+    resultados = {'frio': medir_inicializacao(db_path)}
+
+    # A quente: módulos já importados e banco no cache do sistema
+    perfil.reiniciar()
+    resultados['quente'] = medir_inicializacao(db_path)
+
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+def extrair_medidas(resumo):
+    """Soma as durações das etapas de interesse de uma linha do tempo"""
+    medidas = {'total': resumo['total_ms']}
+    for etapa in resumo['etapas']:
+        if etapa['nome'] in MEDIDAS:
+            medidas[etapa['nome']] = medidas.get(etapa['nome'], 0) + etapa['duracao_ms']
+    return medidas
+
+def comparar(resultados, referencia):
+    """Lista as medidas que pioraram além da tolerância em relação à referência"""
+    regressoes = []
+    for chave, medidas in resultados.items():
+        for medida, valor in medidas.items():
+            anterior = referencia.get(chave, {}).get(medida)
+            if anterior is None:
+                continue
+            if valor > anterior * (1 + TOLERANCIA) and valor - anterior > FOLGA_MS:
+                regressoes.append(f"{chave} {medida}: {anterior:.1f} ms -> {valor:.1f} ms")
+    return regressoes
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--executar':
+        executar(sys.argv[2], sys.argv[3])
+        return
+
+    # Uso: benchmark_inicializacao.py [tamanho ...] [--referencia arq.json] [--salvar arq.json]
+    argumentos = sys.argv[1:]
+    referencia = salvar = None
+    if '--referencia' in argumentos:
+        i = argumentos.index('--referencia')
+        referencia = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    if '--salvar' in argumentos:
+        i = argumentos.index('--salvar')
+        salvar = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    tamanhos = [int(valor) for valor in argumentos] or TAMANHOS
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for tamanho in tamanhos:
+            db_path = os.path.join(diretorio, f"inicializacao_{tamanho}.db")
+            saida = os.path.join(diretorio, f"perfil_{tamanho}.json")
+
+            print(f"Gerando banco sintético com {tamanho} produtos...")
+            gerar_banco(db_path, tamanho)
+
+            # Processo novo para a medição a frio incluir as importações
+            processo = subprocess.run([sys.executable, os.path.abspath(__file__), '--executar', db_path, saida],
+                                      cwd=parent_dir)
+            if processo.returncode != 0:
+                print(f"Falha na medição com {tamanho} produtos")
+                sys.exit(1)
+
+            with open(saida, encoding='utf-8') as f:
+                linhas_tempo = json.load(f)
+
+            for modo in ('frio', 'quente'):
+                medidas = extrair_medidas(linhas_tempo[modo])
+                resultados[f"{tamanho}/{modo}"] = medidas
+                print(f"  {modo:6} " + " | ".join(f"{nome}: {medidas.get(nome, 0):.1f} ms" for nome in MEDIDAS))
+
+            importacoes = linhas_tempo['frio']['importacoes'][:5]
+            print("  importações mais lentas: " + ", ".join(f"{item['modulo']} ({item['ms']:.0f} ms)" for item in importacoes))
+
+    if salvar:
+        with open(salvar, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"Referência salva em {salvar}")
+
+    if referencia:
+        with open(referencia, encoding='utf-8') as f:
+            regressoes = comparar(resultados, json.load(f))
+        if regressoes:
+            print("FALHA: inicialização mais lenta que a referência")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print("OK: inicialização dentro da tolerância da referência")
+
+if __name__ == "__main__":
+    main()
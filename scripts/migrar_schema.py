@@ -0,0 +1,72 @@
+import os
+import sys
+import sqlite3
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database.db_manager import MIGRACOES, VERSAO_SCHEMA
+from database.migracoes import versao_schema, aplicar_migracoes, reverter_migracoes, ErroMigracao
+
+def exibir_status(conn):
+    """Lista as migrações e indica quais já foram aplicadas ao banco"""
+    atual = versao_schema(conn)
+    print(f"Versão do schema: {atual} (mais recente: {VERSAO_SCHEMA})")
+    for migracao in MIGRACOES:
+        marca = "x" if migracao.versao <= atual else " "
+        reversao = "" if migracao.reverter else " (sem reversão)"
+        print(f"  [{marca}] {migracao.versao}: {migracao.descricao}{reversao}")
+
+def migrar_para(conn, destino):
+    """
+    Aplica ou reverte migrações até a versão destino.
+
+    Args:
+        conn: Conexão com o banco de dados
+        destino (int): Versão final do schema
+
+    Returns:
+        bool: True se o banco chegou à versão destino
+    """
+    atual = versao_schema(conn)
+    try:
+        if destino < atual:
+            versoes = reverter_migracoes(conn, MIGRACOES, destino)
+            print(f"Migrações revertidas: {versoes}")
+        else:
+            versoes = aplicar_migracoes(conn, MIGRACOES, destino)
+            print(f"Migrações aplicadas: {versoes or 'nenhuma'}")
+        return versao_schema(conn) == destino
+    except ErroMigracao as e:
+        print(f"Erro: {e}")
+        return False
+    except sqlite3.Error as e:
+        print(f"Erro durante a migração: {e} (o banco permanece na versão {versao_schema(conn)})")
+        return False
+
+if __name__ == "__main__":
+    # Uso: migrar_schema.py [--status] [--para N] [--banco caminho]
+    DB_PATH = "database/estoque.db"
+    if '--banco' in sys.argv:
+        DB_PATH = sys.argv[sys.argv.index('--banco') + 1]
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+
+    if '--status' in sys.argv:
+        exibir_status(conn)
+        conn.close()
+        sys.exit(0)
+
+    destino = VERSAO_SCHEMA
+    if '--para' in sys.argv:
+        destino = int(sys.argv[sys.argv.index('--para') + 1])
+
+    sucesso = migrar_para(conn, destino)
+    exibir_status(conn)
+    conn.close()
+
+    if not sucesso:
+        sys.exit(1)
@@ -0,0 +1,108 @@
+import os
+import sys
+import sqlite3
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database.db_manager import DatabaseManager
+
+# Consultas frequentes e o índice que cada uma deve usar
+CONSULTAS_QUENTES = [
+    ("Leitura de código de barras",
+     "SELECT * FROM produtos WHERE codigo_barras = ?", ('7890000000000',),
+     'idx_produtos_codigo_barras'),
+    ("Caixa aberto",
+     "SELECT * FROM caixas WHERE status = 'Aberto'", (),
+     'idx_caixas_aberto'),
+    ("Movimentos do caixa",
+     "SELECT * FROM movimentos_caixa WHERE caixa_id = ? ORDER BY data_hora DESC", (1,),
+     'idx_movimentos_caixa_data'),
+    ("Itens por venda",
+     "SELECT * FROM itens_venda WHERE venda_id = ?", (1,),
+     'idx_itens_venda_venda'),
+    ("Itens por produto",
+     "SELECT * FROM itens_venda WHERE produto_id = ?", (1,),
+     'idx_itens_venda_produto'),
+    ("Promoções ativas",
+     "SELECT * FROM promocoes WHERE data_inicio <= ? AND data_fim >= ?", ('2025-01-01', '2025-01-01'),
+     'idx_promocoes_periodo'),
+    ("Produtos vencendo",
+     "SELECT * FROM produtos WHERE data_validade <= ? AND data_validade >= ? ORDER BY data_validade",
+     ('2025-01-31', '2025-01-01'),
+     'idx_produtos_data_validade'),
+    ("Vendas por período",
+     "SELECT COUNT(*), SUM(valor_total) FROM vendas WHERE data_hora >= ? AND data_hora < ?",
+     ('2025-01-01 03:00:00', '2025-02-01 03:00:00'),
+     'idx_vendas_data_hora'),
+    ("Movimentos por período",
+     "SELECT tipo, SUM(valor) FROM movimentos_caixa WHERE data_hora >= ? AND data_hora < ? GROUP BY tipo",
+     ('2025-01-01 03:00:00', '2025-02-01 03:00:00'),
+     'idx_movimentos_data_hora'),
+]
+
+def migrar_indices(db_path, forcar=False):
+    """
+    Cria (ou recria) o conjunto de índices do banco de dados.
+
+    Args:
+        db_path: Caminho para o arquivo do banco de dados SQLite
+        forcar: Recria os índices mesmo que a versão já esteja atualizada
+
+    Returns:
+        bool: True se todos os índices foram criados como esperado
+    """
+    try:
+        db = DatabaseManager(db_file=db_path)
+        falhas = db.criar_indices(forcar=forcar)
+        db.fechar()
+
+        for nome in falhas:
+            print(f"Índice {nome} criado sem restrição de unicidade (há valores duplicados).")
+
+        print("Índices criados com sucesso!")
+        return not falhas
+    except Exception as e:
+        print(f"Erro durante a criação dos índices: {str(e)}")
+        return False
+
+def verificar_planos(db_path):
+    """
+    Executa EXPLAIN QUERY PLAN nas consultas frequentes e confirma
+    que cada uma usa o índice esperado em vez de varrer a tabela.
+
+    Returns:
+        bool: True se todas as consultas usam índice
+    """
+    conn = sqlite3.connect(db_path)
+    ok = True
+
+    for descricao, sql, params, indice in CONSULTAS_QUENTES:
+        plano = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        detalhes = " | ".join(linha[3] for linha in plano)
+
+        if indice in detalhes:
+            print(f"[OK]    {descricao}: {detalhes}")
+        else:
+            print(f"[FALHA] {descricao}: {detalhes} (esperado {indice})")
+            ok = False
+
+    conn.close()
+    return ok
+
+if __name__ == "__main__":
+    # Caminho padrão do banco de dados
+    DB_PATH = "database/estoque.db"
+
+    forcar = '--forcar' in sys.argv
+
+    sucesso = migrar_indices(DB_PATH, forcar=forcar)
+    planos_ok = verificar_planos(DB_PATH)
+
+    if sucesso and planos_ok:
+        print("Migração de índices concluída com sucesso!")
+    else:
+        print("Falha na migração de índices. Verifique os erros acima.")
+        sys.exit(1)
@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database.db_manager import DatabaseManager
+
+# Totais que devem coincidir entre os resumos e as tabelas de origem
+CONFERENCIAS = [
+    ("Faturamento",
+     "SELECT ROUND(COALESCE(SUM(valor_total), 0), 2) FROM vendas",
+     "SELECT ROUND(COALESCE(SUM(valor_total), 0), 2) FROM vendas_resumo_pagamentos"),
+    ("Número de vendas",
+     "SELECT COUNT(*) FROM vendas",
+     "SELECT COALESCE(SUM(num_vendas), 0) FROM vendas_resumo_pagamentos"),
+    ("Compras por cliente",
+     "SELECT COUNT(*) FROM vendas",
+     "SELECT COALESCE(SUM(compras), 0) FROM vendas_resumo_clientes"),
+    ("Itens vendidos",
+     "SELECT COALESCE(SUM(quantidade), 0) FROM itens_venda",
+     "SELECT COALESCE(SUM(quantidade), 0) FROM vendas_resumo_diario"),
+    ("Valor dos itens",
+     "SELECT ROUND(COALESCE(SUM(subtotal), 0), 2) FROM itens_venda",
+     "SELECT ROUND(COALESCE(SUM(valor_total), 0), 2) FROM vendas_resumo_diario"),
+]
+
+def reconstruir_resumo(db_path):
+    """
+    Recalcula do zero as tabelas de resumo diário de vendas.
+
+    Args:
+        db_path: Caminho para o arquivo do banco de dados SQLite
+
+    Returns:
+        bool: True se a reconstrução foi concluída
+    """
+    db = DatabaseManager(db_file=db_path)
+    sucesso = db.reconstruir_resumo_vendas()
+    db.fechar()
+    return sucesso
+
+def verificar_resumo(db_path):
+    """
+    Confere os totais dos resumos contra vendas e itens_venda.
+
+    Returns:
+        bool: True se todos os totais coincidem
+    """
+    # Abrir pelo DatabaseManager garante que as tabelas de resumo existam
+    db = DatabaseManager(db_file=db_path)
+    ok = True
+
+    with db.pool.leitura() as conn:
+        for descricao, sql_origem, sql_resumo in CONFERENCIAS:
+            origem = conn.execute(sql_origem).fetchone()[0]
+            resumo = conn.execute(sql_resumo).fetchone()[0]
+
+            if origem == resumo:
+                print(f"[OK]    {descricao}: {resumo}")
+            else:
+                print(f"[FALHA] {descricao}: origem {origem}, resumo {resumo}")
+                ok = False
+
+    db.fechar()
+    return ok
+
+if __name__ == "__main__":
+    # Caminho padrão do banco de dados
+    DB_PATH = "database/estoque.db"
+
+    # --verificar apenas confere os totais, sem reconstruir
+    if '--verificar' not in sys.argv:
+        if not reconstruir_resumo(DB_PATH):
+            print("Falha ao reconstruir o resumo de vendas.")
+            sys.exit(1)
+        print("Resumo de vendas reconstruído com sucesso!")
+
+    if not verificar_resumo(DB_PATH):
+        print("Os resumos não conferem com as vendas. Execute sem --verificar para reconstruir.")
+        sys.exit(1)
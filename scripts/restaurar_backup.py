@@ -0,0 +1,78 @@
+import os
+import sys
+from datetime import datetime
+
+# Adiciona o diretório pai ao path para importar os módulos corretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database.backup import listar_backups, listar_incrementais, restaurar_backup, ErroBackup
+from database.db_manager import DatabaseManager
+from utils.backup_assincrono import DIRETORIO_BACKUPS
+
+def listar(diretorio):
+    """Mostra os backups completos e os incrementais de cada um"""
+    backups = listar_backups(diretorio)
+    if not backups:
+        print(f"Nenhum backup encontrado em {diretorio}")
+        return
+
+    for data_hora, caminho in backups:
+        tamanho = os.path.getsize(caminho) / 1024
+        print(f"{data_hora:%d/%m/%Y %H:%M:%S}  {os.path.basename(caminho)} ({tamanho:.0f} KB)")
+        for _, data_incremental, caminho_incremental in listar_incrementais(diretorio, data_hora):
+            tamanho = os.path.getsize(caminho_incremental) / 1024
+            print(f"    + {data_incremental:%d/%m/%Y %H:%M:%S}  {os.path.basename(caminho_incremental)} ({tamanho:.0f} KB)")
+
+def restaurar(base, destino, ate=None, substituir=False):
+    """
+    Restaura o backup completo e os incrementais e prepara o banco para uso
+
+    Returns:
+        bool: True se a restauração foi concluída
+    """
+    try:
+        aplicados = restaurar_backup(base, destino, ate=ate, substituir=substituir)
+    except ErroBackup as e:
+        print(f"Erro na restauração: {e}")
+        return False
+
+    print(f"Backup completo restaurado: {os.path.basename(base)}")
+    for caminho in aplicados:
+        print(f"  incremental aplicado: {os.path.basename(caminho)}")
+
+    # Atualiza o schema, se necessário, e recalcula os resumos do dashboard
+    db = DatabaseManager(db_file=destino)
+    sucesso = db.reconstruir_resumo_vendas()
+    db.fechar()
+
+    print(f"Banco restaurado em {destino}")
+    return sucesso
+
+if __name__ == "__main__":
+    # Uso:
+    #   restaurar_backup.py --listar [diretório]
+    #   restaurar_backup.py <backup completo> <destino> [--ate AAAAMMDD_HHMMSS] [--substituir]
+    argumentos = sys.argv[1:]
+
+    if not argumentos or argumentos[0] == '--listar':
+        listar(argumentos[1] if len(argumentos) > 1 else DIRETORIO_BACKUPS)
+        sys.exit(0)
+
+    ate = None
+    if '--ate' in argumentos:
+        i = argumentos.index('--ate')
+        ate = datetime.strptime(argumentos[i + 1], "%Y%m%d_%H%M%S")
+        del argumentos[i:i + 2]
+
+    substituir = '--substituir' in argumentos
+    if substituir:
+        argumentos.remove('--substituir')
+
+    if len(argumentos) != 2:
+        print("Uso: restaurar_backup.py <backup completo> <destino> [--ate AAAAMMDD_HHMMSS] [--substituir]")
+        sys.exit(1)
+
+    if not restaurar(argumentos[0], argumentos[1], ate=ate, substituir=substituir):
+        sys.exit(1)
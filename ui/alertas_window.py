@@ -0,0 +1,241 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QComboBox, QTableView, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont, QColor, QBrush
+from datetime import date
+
+from utils.alertas_estoque import AlertasEstoque
+
+COLUNAS = ["Alerta", "Produto", "Quantidade", "Estoque Mín.", "Validade", "Dias"]
+
+# Linhas exibidas por página do painel
+TAMANHO_PAGINA = 50
+
+CORES_TIPO = {
+    "Vencido": QBrush(QColor('darkred')),
+    "Vencendo": QBrush(QColor('darkorange')),
+    "Estoque baixo": QBrush(QColor('red')),
+}
+
+# Filtros do painel: texto exibido -> (incluir vencidos, dias de vencimento ou None, incluir estoque baixo)
+FILTROS = [
+    ("Todos os alertas", (True, 15, True)),
+    ("Vencidos", (True, None, False)),
+    ("Vencendo em 15 dias", (False, 15, False)),
+    ("Vencendo em 30 dias", (False, 30, False)),
+    ("Estoque baixo", (False, None, True)),
+]
+
+
+class AlertasTableModel(QAbstractTableModel):
+    """
+    Modelo paginado do painel de alertas.
+
+    Todas as linhas ficam em uma lista de tuplas ordenada com list.sort;
+    o modelo expõe apenas a fatia da página atual.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._linhas = []
+        self._pagina = 0
+        self._coluna_ordem = 5
+        self._ordem = Qt.AscendingOrder
+
+    def definir_linhas(self, linhas):
+        """Substitui as linhas, mantendo a ordenação e voltando à primeira página"""
+        self.beginResetModel()
+        self._linhas = list(linhas)
+        self._pagina = 0
+        self._ordenar()
+        self.endResetModel()
+
+    def total(self):
+        return len(self._linhas)
+
+    def paginas(self):
+        return max(1, (len(self._linhas) + TAMANHO_PAGINA - 1) // TAMANHO_PAGINA)
+
+    def pagina(self):
+        return self._pagina
+
+    def ir_para_pagina(self, pagina):
+        """Exibe a página informada (limitada ao intervalo válido)"""
+        pagina = max(0, min(pagina, self.paginas() - 1))
+        if pagina != self._pagina:
+            self.beginResetModel()
+            self._pagina = pagina
+            self.endResetModel()
+
+    def _ordenar(self):
+        col = self._coluna_ordem
+        chave = (lambda linha: str(linha[col]).lower()) if col in (0, 1, 4) else (lambda linha: linha[col])
+        
+        # Linhas sem valor (ex.: dias de quem só tem estoque baixo) ficam sempre no fim
+        com_valor = [linha for linha in self._linhas if linha[col] is not None]
+        sem_valor = [linha for linha in self._linhas if linha[col] is None]
+        com_valor.sort(key=chave, reverse=self._ordem == Qt.DescendingOrder)
+        self._linhas = com_valor + sem_valor
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._coluna_ordem = column
+        self._ordem = order
+        self.beginResetModel()
+        self._ordenar()
+        self._pagina = 0
+        self.endResetModel()
+
+    def _linha(self, row):
+        return self._linhas[self._pagina * TAMANHO_PAGINA + row]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return max(0, min(TAMANHO_PAGINA, len(self._linhas) - self._pagina * TAMANHO_PAGINA))
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUNAS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        linha = self._linha(index.row())
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            valor = linha[col]
+            return "" if valor is None else str(valor)
+        if role == Qt.ForegroundRole and col == 0:
+            return CORES_TIPO.get(linha[0])
+        if role == Qt.TextAlignmentRole and col in (2, 3, 5):
+            return Qt.AlignCenter
+        return None
+
+
+class AlertasWindow(QDialog):
+    """Painel não modal com os alertas de vencimento e de estoque baixo"""
+
+    def __init__(self, db, alertas=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.alertas = alertas or AlertasEstoque(db)
+        self.alertas.alterados.connect(self.carregar_dados)
+        self.initUI()
+        self.carregar_dados()
+
+    def initUI(self):
+        self.setWindowTitle("Alertas de Estoque")
+        self.setMinimumSize(750, 500)
+
+        layout = QVBoxLayout(self)
+
+        # Título e resumo
+        titulo = QLabel("Alertas de Estoque")
+        titulo.setFont(QFont("Arial", 14, QFont.Bold))
+        layout.addWidget(titulo)
+
+        self.lbl_resumo = QLabel()
+        layout.addWidget(self.lbl_resumo)
+
+        # Filtro
+        filtro_layout = QHBoxLayout()
+        filtro_layout.addWidget(QLabel("Exibir:"))
+        self.cb_filtro = QComboBox()
+        for texto, _ in FILTROS:
+            self.cb_filtro.addItem(texto)
+        self.cb_filtro.currentIndexChanged.connect(self.carregar_dados)
+        filtro_layout.addWidget(self.cb_filtro)
+        filtro_layout.addStretch()
+
+        self.btn_atualizar = QPushButton("Atualizar")
+        self.btn_atualizar.clicked.connect(self.alertas.atualizar)
+        filtro_layout.addWidget(self.btn_atualizar)
+        layout.addLayout(filtro_layout)
+
+        # Tabela paginada e ordenável
+        self.modelo = AlertasTableModel(self)
+        self.tabela = QTableView()
+        self.tabela.setModel(self.modelo)
+        self.tabela.setSortingEnabled(True)
+        self.tabela.horizontalHeader().setSortIndicator(5, Qt.AscendingOrder)
+        self.tabela.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tabela.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabela.verticalHeader().setVisible(False)
+        layout.addWidget(self.tabela)
+
+        # Paginação
+        paginacao_layout = QHBoxLayout()
+        self.btn_anterior = QPushButton("< Anterior")
+        self.btn_anterior.clicked.connect(lambda: self.mudar_pagina(-1))
+        self.lbl_pagina = QLabel()
+        self.lbl_pagina.setAlignment(Qt.AlignCenter)
+        self.btn_proxima = QPushButton("Próxima >")
+        self.btn_proxima.clicked.connect(lambda: self.mudar_pagina(1))
+
+        paginacao_layout.addWidget(self.btn_anterior)
+        paginacao_layout.addStretch()
+        paginacao_layout.addWidget(self.lbl_pagina)
+        paginacao_layout.addStretch()
+        paginacao_layout.addWidget(self.btn_proxima)
+        layout.addLayout(paginacao_layout)
+        
+        # Ordenar e trocar de página recriam a fatia exibida
+        self.modelo.modelReset.connect(self.atualizar_paginacao)
+
+        btn_fechar = QPushButton("Fechar")
+        btn_fechar.clicked.connect(self.close)
+        layout.addWidget(btn_fechar, alignment=Qt.AlignRight)
+
+    def montar_linhas(self):
+        """Monta as linhas do filtro atual a partir do cache de alertas"""
+        incluir_vencidos, dias_vencimento, incluir_estoque_baixo = FILTROS[self.cb_filtro.currentIndex()][1]
+        hoje = date.today()
+        linhas = []
+
+        def dias_para_vencer(produto):
+            try:
+                return (date.fromisoformat(str(produto['data_validade'])[:10]) - hoje).days
+            except (TypeError, ValueError):
+                return None
+
+        if incluir_vencidos:
+            for produto in self.alertas.vencidos():
+                linhas.append(("Vencido", produto['nome'], produto['quantidade'], produto['estoque_minimo'],
+                               produto['data_validade'], dias_para_vencer(produto)))
+        if dias_vencimento is not None:
+            for produto in self.alertas.vencendo(dias_vencimento):
+                linhas.append(("Vencendo", produto['nome'], produto['quantidade'], produto['estoque_minimo'],
+                               produto['data_validade'], dias_para_vencer(produto)))
+        if incluir_estoque_baixo:
+            for produto in self.alertas.estoque_baixo():
+                linhas.append(("Estoque baixo", produto['nome'], produto['quantidade'],
+                               produto['estoque_minimo'], produto['data_validade'], None))
+        return linhas
+
+    def carregar_dados(self):
+        """Recarrega a tabela e o resumo a partir do cache de alertas"""
+        self.modelo.definir_linhas(self.montar_linhas())
+
+        contagens = self.alertas.contagens(dias=15)
+        self.lbl_resumo.setText(
+            f"Vencidos: {contagens['vencidos']} | Vencendo em 15 dias: {contagens['vencendo']} | "
+            f"Estoque baixo: {contagens['estoque_baixo']}"
+        )
+
+    def mudar_pagina(self, passo):
+        self.modelo.ir_para_pagina(self.modelo.pagina() + passo)
+
+    def atualizar_paginacao(self):
+        pagina = self.modelo.pagina()
+        paginas = self.modelo.paginas()
+        self.lbl_pagina.setText(f"Página {pagina + 1} de {paginas} ({self.modelo.total()} alertas)")
+        self.btn_anterior.setEnabled(pagina > 0)
+        self.btn_proxima.setEnabled(pagina < paginas - 1)
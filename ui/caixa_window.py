@@ -2,18 +2,30 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QLab
                             QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QDateEdit,
                             QMessageBox, QDialog, QFormLayout, QTextEdit, QDoubleSpinBox,
                             QSpinBox, QHeaderView, QCheckBox, QGroupBox, QGridLayout, QFrame,
-                            QSplitter, QApplication,  QFileDialog, QMessageBox, QHBoxLayout, QLayout)
+                            QSplitter, QApplication,  QFileDialog, QMessageBox, QHBoxLayout, QLayout,
+                            QProgressBar)
 from PyQt5.QtCore import Qt, QDate, QDateTime, QMarginsF
 from PyQt5.QtGui import QIcon, QColor, QFont, QTextDocument, QPageSize, QPageLayout, QIcon
 from PyQt5.QtPrintSupport import QPrinter
 import os
 
-import datetime
+from utils.catalogo_produtos import CatalogoProdutos
+from utils.promocoes_ativas import PromocoesAtivas
+from utils.consulta_assincrona import ConsultaAssincrona
+from utils.backup_assincrono import BackupAssincrono
 
 class CaixaWindow(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, promocoes=None, consultas=None, backup=None):
         super().__init__()
         self.db = db
+        self.catalogo = CatalogoProdutos(db)
+        self.promocoes = promocoes or PromocoesAtivas(db)
+        self.consultas = consultas or ConsultaAssincrona(db, self)
+        self.consultas.carregando.connect(self.estado_carregando)
+        self.backup = backup or BackupAssincrono(db, parent=self)
+        self.backup.progresso.connect(self.progresso_backup)
+        self.backup.concluido.connect(self.backup_concluido)
+        self.backup.falhou.connect(self.backup_falhou)
         self.caixa_atual = None
         self.itens_venda = []
         self.total_venda = 0.0
@@ -53,6 +65,13 @@ class CaixaWindow(QWidget):
         self.btn_fechar_caixa.clicked.connect(self.fechar_caixa)
         status_layout.addWidget(self.btn_fechar_caixa)
         
+        # Andamento do backup feito após o fechamento do caixa
+        self.barra_backup = QProgressBar()
+        self.barra_backup.setMaximumWidth(200)
+        self.barra_backup.setFormat("Backup: %p%")
+        self.barra_backup.setVisible(False)
+        status_layout.addWidget(self.barra_backup)
+        
         main_layout.addWidget(self.frame_status)
         
         # Tabs para operações
@@ -187,57 +206,31 @@ class CaixaWindow(QWidget):
         if not texto:
             return
         
-        # Tenta buscar como código de barras primeiro (com tratamento aprimorado)
-        codigo_barras = texto.strip()  # Garante que não haja espaços extras
-        produto = self.db.buscar_produto_por_codigo_barras(codigo_barras)
+        # Recarregar o catálogo se algum produto foi alterado desde a última carga
+        if not self.catalogo.atualizado():
+            self.carregar_produtos()
+        
+        # Tenta buscar como código de barras primeiro (consulta O(1) no catálogo em memória)
+        produto = self.catalogo.por_codigo_barras(texto)
         
         if produto:
-            # Encontrou o produto, atualizar campos
-            # Encontrar o índice do produto no combobox
-            index = -1
-            for i in range(self.cb_produto.count()):
-                item_data = self.cb_produto.itemData(i)
-                if item_data and item_data['id'] == produto['id']:
-                    index = i
-                    break
+            # Encontrou o produto, selecionar no combobox (item 0 é o vazio)
+            self.cb_produto.setCurrentIndex(self.catalogo.posicao(produto['id']) + 1)
+            self.spin_quantidade.setValue(1)  # Definir quantidade para 1
+            # Preço de venda ou promocional do dia (consulta em dicionário)
+            self.spin_preco.setValue(self.promocoes.preco(produto))
             
-            if index >= 0:
-                self.cb_produto.setCurrentIndex(index)
-                self.spin_quantidade.setValue(1)  # Definir quantidade para 1
-                self.spin_preco.setValue(produto['preco_venda'] if produto['preco_venda'] else 0)
-                
-                # Verificar se está em promoção
-                promocoes = self.db.listar_promocoes_ativas()
-                for promocao in promocoes:
-                    if promocao['produto_id'] == produto['id']:
-                        self.spin_preco.setValue(promocao['preco_promocional'])
-                        break
-                
-                # Adicionar o item automaticamente
-                self.adicionar_item()
-            else:
-                # Se o produto existe no banco mas não no combobox, adicione-o
-                self.cb_produto.addItem(produto['nome'], produto)
-                self.cb_produto.setCurrentIndex(self.cb_produto.count() - 1)
-                self.spin_quantidade.setValue(1)
-                self.spin_preco.setValue(produto['preco_venda'] if produto['preco_venda'] else 0)
-                # Adicionar o item automaticamente
-                self.adicionar_item()
+            # Adicionar o item automaticamente
+            self.adicionar_item()
         else:
             # Tenta buscar pelo nome do produto
             produtos = self.db.buscar_produtos_por_nome(texto)
             if produtos and len(produtos) > 0:
                 # Por enquanto, vamos apenas selecionar o primeiro produto encontrado
-                produto = produtos[0]
-                index = -1
-                for i in range(self.cb_produto.count()):
-                    item_data = self.cb_produto.itemData(i)
-                    if item_data and item_data['id'] == produto['id']:
-                        index = i
-                        break
+                index = self.catalogo.posicao(produtos[0]['id'])
                 
                 if index >= 0:
-                    self.cb_produto.setCurrentIndex(index)
+                    self.cb_produto.setCurrentIndex(index + 1)
                 else:
                     QMessageBox.warning(self, "Erro", "Produto encontrado no banco, mas não está no combobox")
             else:
@@ -426,11 +419,12 @@ class CaixaWindow(QWidget):
         # Adicionar um item vazio como primeiro item
         self.cb_produto.addItem("", None)
         
-        # Carregar produtos do banco de dados
-        produtos = self.db.listar_produtos()
+        # Carregar produtos do banco de dados para o catálogo em memória
+        produtos = self.catalogo.carregar()
         for produto in produtos:
-            # Use o nome do produto como exibição, mas armazene todos os dados do produto
-            self.cb_produto.addItem(produto['nome'], produto)
+            # Use o nome do produto como exibição e guarde apenas o ID;
+            # os dados completos ficam no catálogo (posição no combobox = posição + 1)
+            self.cb_produto.addItem(produto['nome'], produto['id'])
         
         # Restaurar o texto que estava sendo digitado
         self.cb_produto.setCurrentText(texto_atual)
@@ -443,16 +437,10 @@ class CaixaWindow(QWidget):
             self.spin_preco.setValue(0)
             return
         
-        produto = self.cb_produto.itemData(index)
+        produto = self.catalogo.por_id(self.cb_produto.itemData(index))
         if produto:
-            self.spin_preco.setValue(produto['preco_venda'] if produto['preco_venda'] else 0)
-            
-            # Verificar se está em promoção
-            promocoes = self.db.listar_promocoes_ativas()
-            for promocao in promocoes:
-                if promocao['produto_id'] == produto['id']:
-                    self.spin_preco.setValue(promocao['preco_promocional'])
-                    break
+            # Preço de venda ou promocional do dia (consulta em dicionário)
+            self.spin_preco.setValue(self.promocoes.preco(produto))
     
     def adicionar_item(self):
         index = self.cb_produto.currentIndex()
@@ -460,7 +448,7 @@ class CaixaWindow(QWidget):
             QMessageBox.warning(self, "Erro", "Selecione um produto")
             return
         
-        produto = self.cb_produto.itemData(index)
+        produto = self.catalogo.por_id(self.cb_produto.itemData(index))
         if not produto:
             QMessageBox.warning(self, "Erro", "Produto inválido")
             return
@@ -693,28 +681,17 @@ class CaixaWindow(QWidget):
                 else:
                     observacao = f"Valor recebido: R$ {valor_recebido:.2f}. Troco: R$ {troco:.2f}"
             
-            # Registrar venda
-            venda_id = self.db.registrar_venda(
-                cliente_id, total_final, desconto, forma_pagamento, 
-                parcelas, observacao, "Concluída", "Sistema"
+            # Registrar venda, itens, baixa de estoque e entrada no caixa em uma única transação
+            venda_id, saldo_atual = self.db.registrar_venda_completa(
+                self.caixa_atual['id'], cliente_id, self.itens_venda, total_final,
+                desconto, forma_pagamento, parcelas, observacao, "Concluída", "Sistema"
             )
-            
+
             if venda_id:
-                # Registrar itens da venda
-                for item in self.itens_venda:
-                    self.db.registrar_item_venda(
-                        venda_id, item['produto_id'], item['quantidade'], 
-                        item['preco_unitario'], item['subtotal']
-                    )
-                
-                # Registrar entrada no caixa
-                self.db.registrar_movimento_caixa(
-                    self.caixa_atual['id'], "Entrada", f"Venda #{venda_id}", 
-                    total_final, forma_pagamento, venda_id, "Venda", "Sistema"
-                )
+                # Refletir a baixa de estoque no catálogo em memória
+                self.catalogo.baixar_estoque(self.itens_venda)
                 
                 # Atualizar saldo
-                saldo_atual = self.db.obter_saldo_atual(self.caixa_atual['id'])
                 self.lbl_saldo.setText(f"Saldo Atual: R$ {saldo_atual:.2f}")
                 
                 # Mensagem de sucesso com informações do troco para pagamento em dinheiro
@@ -859,8 +836,8 @@ class CaixaWindow(QWidget):
                 )
                 
                 if sucesso:
-                    # Realizar backup dos dados após o fechamento do caixa
-                    backup_sucesso = realizar_backup()
+                    # Backup dos dados após o fechamento do caixa (em segundo plano)
+                    backup_iniciado = self.backup.iniciar()
                     
                     dialog.accept()
                     self.verificar_caixa_aberto()
@@ -868,67 +845,32 @@ class CaixaWindow(QWidget):
                         self.gerar_relatorio_fechamento(self.caixa_atual['id'])
                     
                     msg = "Caixa fechado com sucesso!"
-                    if backup_sucesso:
-                        msg += "\nBackup dos dados realizado com sucesso."
+                    if backup_iniciado:
+                        msg += "\nO backup dos dados está sendo realizado em segundo plano."
                     else:
-                        msg += "\nAtenção: Não foi possível realizar o backup dos dados."
+                        msg += "\nJá existe um backup dos dados em andamento."
                     
                     QMessageBox.information(self, "Sucesso", msg)
                 else:
                     QMessageBox.critical(self, "Erro", "Erro ao fechar o caixa")
 
-        def realizar_backup():
-            """
-            Realiza um backup completo do banco de dados do sistema.
-            Retorna True se o backup foi bem-sucedido, False caso contrário.
-            """
-            import os
-            import datetime
-            import shutil
-            import sqlite3
-            
-            try:
-                # Configurações do backup
-                data_hora = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                nome_arquivo = f"backup_sistema_{data_hora}.db"
-                
-                # Diretório para salvar os backups
-                diretorio_backup = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backups")
-                
-                # Criar o diretório de backups se não existir
-                if not os.path.exists(diretorio_backup):
-                    os.makedirs(diretorio_backup)
-                    
-                caminho_backup = os.path.join(diretorio_backup, nome_arquivo)
-                
-                # Caminho do banco de dados atual
-                # Substitua pelo caminho correto do seu banco de dados
-                caminho_db = self.db.db_path  # Ajuste conforme sua implementação
-                
-                # Método 1: Cópia direta do arquivo (se SQLite)
-                if hasattr(self.db, 'db_path'):
-                    shutil.copy2(caminho_db, caminho_backup)
-                    return True
-                
-                # Método 2: Backup via SQL (alternativa para outros SGBDs)
-                else:
-                    # Conectar ao banco de dados
-                    conexao = sqlite3.connect(caminho_backup)
-                    
-                    # Executar o comando de backup
-                    with sqlite3.connect(caminho_db) as con:
-                        con.backup(conexao)
-                        
-                    conexao.close()
-                    return True
-                    
-            except Exception as e:
-                print(f"Erro ao realizar backup: {str(e)}")
-                return False
-
         btn_confirmar.clicked.connect(confirmar_fechamento)
         dialog.exec_()
 
+    def progresso_backup(self, copiadas, total):
+        """Atualiza a barra de andamento do backup"""
+        self.barra_backup.setVisible(True)
+        self.barra_backup.setMaximum(max(total, 1))
+        self.barra_backup.setValue(copiadas)
+
+    def backup_concluido(self, caminho):
+        self.barra_backup.setVisible(False)
+        self.barra_backup.setToolTip(f"Último backup: {os.path.basename(caminho)}")
+
+    def backup_falhou(self, mensagem):
+        self.barra_backup.setVisible(False)
+        QMessageBox.warning(self, "Backup", f"Atenção: Não foi possível realizar o backup dos dados.\n{mensagem}")
+
     def gerar_relatorio_fechamento(self, caixa_id):
         detalhes = self.db.obter_detalhes_caixa(caixa_id)
         if not detalhes:
@@ -1246,9 +1188,19 @@ class CaixaWindow(QWidget):
         data_inicio = self.dt_rel_inicio.date().toString("yyyy-MM-dd")
         data_fim = self.dt_rel_fim.date().toString("yyyy-MM-dd")
         
-        # Buscar dados
-        dados = self.db.gerar_relatorio_periodo(data_inicio, data_fim)
-        
+        # Buscar dados em segundo plano para não travar o caixa
+        self.consultas.executar(
+            'caixa_relatorio', 'gerar_relatorio_periodo', data_inicio, data_fim,
+            sucesso=lambda dados: self.exibir_relatorio(dados, data_inicio, data_fim),
+            erro=lambda mensagem: QMessageBox.warning(self, "Erro", f"Erro ao gerar relatório: {mensagem}")
+        )
+    
+    def estado_carregando(self, canal, ativo):
+        """Indica no botão que o relatório está sendo gerado."""
+        if canal == 'caixa_relatorio':
+            self.btn_gerar_relatorio.setText("Gerando..." if ativo else "Gerar Relatório")
+    
+    def exibir_relatorio(self, dados, data_inicio, data_fim):
         if not dados:
             QMessageBox.information(self, "Sem Dados", "Não foram encontrados dados para o período selecionado")
             return
@@ -238,30 +238,17 @@ class ChangePasswordWindow(QDialog):
             return
         
         # Verificar senha atual
-        import hashlib
-        senha_hash = hashlib.sha256(current.encode()).hexdigest()
-        
-        self.db.cursor.execute('''
-        SELECT id FROM usuarios WHERE id = ? AND senha = ?
-        ''', (self.usuario_id, senha_hash))
-        
-        if not self.db.cursor.fetchone():
+        if not self.db.verificar_senha_usuario(self.usuario_id, current):
             self.show_message("Senha incorreta", "A senha atual está incorreta.", icon=QMessageBox.Critical)
             return
         
         # Atualizar senha
-        nova_senha_hash = hashlib.sha256(new_password.encode()).hexdigest()
-        
-        try:
-            self.db.cursor.execute('''
-            UPDATE usuarios SET senha = ? WHERE id = ?
-            ''', (nova_senha_hash, self.usuario_id))
-            
-            self.db.conn.commit()
+        sucesso, mensagem = self.db.alterar_senha_usuario(self.usuario_id, new_password)
+        if sucesso:
             self.show_message("Senha atualizada", "Sua senha foi alterada com sucesso.", icon=QMessageBox.Information)
             self.accept()
-        except Exception as e:
-            self.show_message("Erro", f"Não foi possível alterar a senha: {str(e)}", icon=QMessageBox.Critical)
+        else:
+            self.show_message("Erro", f"Não foi possível alterar a senha: {mensagem}", icon=QMessageBox.Critical)
     
     def show_message(self, title, message, icon=QMessageBox.Warning):
         """Exibe mensagens estilizadas"""
@@ -3,69 +3,52 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QLab
                             QMessageBox, QDialog, QFormLayout, QTextEdit, QDoubleSpinBox,
                             QSpinBox, QHeaderView, QCheckBox, QGroupBox, QGridLayout, QFrame,
                             QSplitter, QApplication)
-from PyQt5.QtCore import Qt, QDate, QDateTime
+from PyQt5.QtCore import Qt, QDate, QDateTime, QTimer
 from PyQt5.QtGui import QIcon, QColor, QFont
 import datetime
+import math
 import sys
-import random  # Para dados de exemplo
-
-# Importações para os gráficos
-import matplotlib
-matplotlib.use('Qt5Agg')
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-import numpy as np
-
-# Configurações globais para todos os gráficos
-def set_modern_style():
-    plt.style.use('seaborn-v0_8-whitegrid')
-    
-    # Cores modernas
-    colors = {
-        'primary': '#3498db',        # Azul
-        'success': '#2ecc71',        # Verde
-        'warning': '#f39c12',        # Laranja
-        'danger': '#e74c3c',         # Vermelho
-        'info': '#9b59b6',           # Roxo
-        'secondary': '#1abc9c',      # Turquesa
-        'light': '#ecf0f1',          # Cinza claro
-        'dark': '#34495e'            # Cinza escuro
-    }
-    
-    # Definir estilo de texto
-    font = {'family': 'sans-serif', 
-            'weight': 'normal',
-            'size': 10}
-    matplotlib.rc('font', **font)
-    
-    # Estilo de grade mais suave
-    matplotlib.rc('grid', linestyle='--', alpha=0.3)
-    
-    return colors
-
-# Classe MplCanvas modificada para melhor qualidade visual
-class MplCanvas(FigureCanvas):
-    def __init__(self, width=5, height=4, dpi=120):  # Aumentado o DPI para melhor resolução
-        self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='white')
-        self.axes = self.fig.add_subplot(111)
-        
-        # Definir estilo
-        set_modern_style()
-        
-        # Inicializar o canvas
-        super(MplCanvas, self).__init__(self.fig)
-        
-        # Configurações para melhor estética
-        self.fig.tight_layout(pad=2.5)  # Maior padding para evitar cortes
-        self.setStyleSheet("background-color:transparent;")  # Fundo transparente
+from utils.consulta_assincrona import ConsultaAssincrona
 
 
 class DashboardWindow(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, consultas=None):
         super().__init__()
         self.db = db
+        self.consultas = consultas or ConsultaAssincrona(db, self)
+        self.consultas.carregando.connect(self.estado_carregando)
         self.chartCanvases = {}  # Dicionário para guardar referências aos gráficos
+        self.cores = None
+        
+        # Layouts que recebem os gráficos; o matplotlib só é carregado depois
+        # que a página é exibida (criar_graficos)
+        self._layouts_graficos = {}
+        self.timer_graficos = QTimer(self)
+        self.timer_graficos.setSingleShot(True)
+        self.timer_graficos.setInterval(0)
+        self.timer_graficos.timeout.connect(self.criar_graficos)
+        
+        # Artistas mantidos entre atualizações dos gráficos
+        self.linha_vendas = None
+        self.area_vendas = None
+        self._rotulos_vendas = None
+        self._barras = {}
+        self._fatias_pagamentos = None
+        
+        # Dados recebidos por gráficos em abas ocultas, desenhados quando a aba é exibida
+        self._graficos_pendentes = {}
+        self._atualizadores = {
+            'vendas_diarias': self.atualizar_grafico_vendas_diarias,
+            'produtos': self.atualizar_grafico_produtos,
+            'pagamentos': self.atualizar_grafico_pagamentos,
+            'clientes': self.atualizar_grafico_clientes,
+        }
+        
+        # Alterações seguidas de data disparam uma única recarga
+        self.timer_recarga = QTimer(self)
+        self.timer_recarga.setSingleShot(True)
+        self.timer_recarga.setInterval(400)
+        self.timer_recarga.timeout.connect(self.carregar_dados)
         self.initUI()
         self.periodo_alterado(0)  # Inicializa com o período padrão (Hoje)
         self.carregar_dados()
@@ -96,10 +79,24 @@ class DashboardWindow(QWidget):
         self.dt_fim.dateChanged.connect(self.data_alterada)
         frame_filtros_layout.addWidget(self.dt_fim)
         
+        frame_filtros_layout.addWidget(QLabel("Agrupar:"))
+        self.cb_agrupamento = QComboBox()
+        self.cb_agrupamento.addItem("Automático", "auto")
+        self.cb_agrupamento.addItem("Dia", "dia")
+        self.cb_agrupamento.addItem("Semana", "semana")
+        self.cb_agrupamento.addItem("Mês", "mes")
+        self.cb_agrupamento.currentIndexChanged.connect(self.carregar_dados)
+        frame_filtros_layout.addWidget(self.cb_agrupamento)
+        
         self.btn_atualizar = QPushButton("Atualizar")
         self.btn_atualizar.clicked.connect(self.carregar_dados)
         frame_filtros_layout.addWidget(self.btn_atualizar)
         
+        # Indicador de carregamento das consultas em segundo plano
+        self.lbl_carregando = QLabel("Carregando...")
+        self.lbl_carregando.setVisible(False)
+        frame_filtros_layout.addWidget(self.lbl_carregando)
+        
         layout.addWidget(frame_filtros)
         
         # Split principal em duas colunas
@@ -144,14 +141,13 @@ class DashboardWindow(QWidget):
         frame_grafico.setMinimumHeight(250)
         
         grafico_layout = QVBoxLayout(frame_grafico)
-        titulo_grafico = QLabel("Vendas por Dia")
-        titulo_grafico.setStyleSheet("font-weight: bold; font-size: 14px;")
-        grafico_layout.addWidget(titulo_grafico)
+        self.titulo_grafico_vendas = QLabel("Vendas por Dia")
+        self.titulo_grafico_vendas.setStyleSheet("font-weight: bold; font-size: 14px;")
+        grafico_layout.addWidget(self.titulo_grafico_vendas)
         
-        # Adicionar o canvas do matplotlib para o gráfico de vendas
-        self.chart_vendas = MplCanvas(width=5, height=2.5, dpi=100)
-        grafico_layout.addWidget(self.chart_vendas)
-        self.chartCanvases['vendas_diarias'] = self.chart_vendas
+        # Espaço do canvas do matplotlib para o gráfico de vendas
+        self.chart_vendas = None
+        self.adicionar_espaco_grafico('vendas_diarias', grafico_layout)
         
         indicadores_layout.addWidget(frame_grafico)
         
@@ -164,6 +160,8 @@ class DashboardWindow(QWidget):
         
         # Tabs para diferentes visões
         tabs = QTabWidget()
+        # Gráficos de abas ocultas só são desenhados quando a aba é exibida
+        tabs.currentChanged.connect(lambda _: QTimer.singleShot(0, self.desenhar_pendentes))
         
         # Tab de Produtos mais vendidos
         tab_produtos = QWidget()
@@ -195,9 +193,8 @@ class DashboardWindow(QWidget):
         titulo_produtos.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout_grafico_produtos.addWidget(titulo_produtos)
         
-        self.chart_produtos = MplCanvas(width=5, height=2.5, dpi=100)
-        layout_grafico_produtos.addWidget(self.chart_produtos)
-        self.chartCanvases['produtos'] = self.chart_produtos
+        self.chart_produtos = None
+        self.adicionar_espaco_grafico('produtos', layout_grafico_produtos)
         
         produtos_splitter.addWidget(frame_grafico_produtos)
         
@@ -234,9 +231,8 @@ class DashboardWindow(QWidget):
         titulo_pagamentos.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout_grafico_pagamentos.addWidget(titulo_pagamentos)
         
-        self.chart_pagamentos = MplCanvas(width=5, height=2.5, dpi=100)
-        layout_grafico_pagamentos.addWidget(self.chart_pagamentos)
-        self.chartCanvases['pagamentos'] = self.chart_pagamentos
+        self.chart_pagamentos = None
+        self.adicionar_espaco_grafico('pagamentos', layout_grafico_pagamentos)
         
         pagamentos_splitter.addWidget(frame_grafico_pagamentos)
         
@@ -273,9 +269,8 @@ class DashboardWindow(QWidget):
         titulo_clientes.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout_grafico_clientes.addWidget(titulo_clientes)
         
-        self.chart_clientes = MplCanvas(width=5, height=2.5, dpi=100)
-        layout_grafico_clientes.addWidget(self.chart_clientes)
-        self.chartCanvases['clientes'] = self.chart_clientes
+        self.chart_clientes = None
+        self.adicionar_espaco_grafico('clientes', layout_grafico_clientes)
         
         clientes_splitter.addWidget(frame_grafico_clientes)
         
@@ -323,6 +318,9 @@ class DashboardWindow(QWidget):
             self.cb_periodo.blockSignals(True)
             self.cb_periodo.setCurrentText("Personalizado")
             self.cb_periodo.blockSignals(False)
+        
+        # Recarregar quando o usuário parar de alterar as datas
+        self.timer_recarga.start()
     
     def periodo_alterado(self, index):
         periodo = self.cb_periodo.currentText()
@@ -360,13 +358,26 @@ class DashboardWindow(QWidget):
             self.carregar_dados()
     
     def carregar_dados(self):
+        self.timer_recarga.stop()
         data_inicio = self.dt_inicio.date().toString("yyyy-MM-dd")
         data_fim = self.dt_fim.date().toString("yyyy-MM-dd")
         
+        # Buscar dados no banco em segundo plano; trocar o período de novo
+        # antes do término descarta o resultado do pedido anterior
+        agrupamento = self.cb_agrupamento.currentData()
+        self.consultas.executar('dashboard', 'obter_dados_dashboard', data_inicio, data_fim, agrupamento,
+                                sucesso=self.exibir_dados, erro=self.erro_consulta)
+    
+    def estado_carregando(self, canal, ativo):
+        """Mostra o indicador de carregamento enquanto a consulta está pendente."""
+        if canal == 'dashboard':
+            self.lbl_carregando.setVisible(ativo)
+    
+    def erro_consulta(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {mensagem}")
+    
+    def exibir_dados(self, dados):
         try:
-            # Buscar dados no banco
-            dados = self.db.obter_dados_dashboard(data_inicio, data_fim)
-            
             if not dados:
                 self.mostrar_sem_dados()
                 return
@@ -393,7 +404,7 @@ class DashboardWindow(QWidget):
                 self.tabela_produtos.setItem(i, 3, QTableWidgetItem(f"{participacao:.2f}%"))
             
             # Atualizar gráfico de produtos (top 5)
-            self.atualizar_grafico_produtos(dados['produtos'][:5] if len(dados['produtos']) > 5 else dados['produtos'])
+            self.agendar_grafico('produtos', dados['produtos'][:5])
             
             # Atualizar tabela de formas de pagamento
             self.tabela_pagamentos.setRowCount(0)
@@ -408,7 +419,7 @@ class DashboardWindow(QWidget):
                 self.tabela_pagamentos.setItem(i, 2, QTableWidgetItem(f"{participacao:.2f}%"))
             
             # Atualizar gráfico de formas de pagamento
-            self.atualizar_grafico_pagamentos(dados['pagamentos'])
+            self.agendar_grafico('pagamentos', dados['pagamentos'])
             
             # Atualizar tabela de clientes
             self.tabela_clientes.setRowCount(0)
@@ -424,206 +435,302 @@ class DashboardWindow(QWidget):
                 self.tabela_clientes.setItem(i, 3, QTableWidgetItem(f"R$ {ticket:.2f}"))
             
             # Atualizar gráfico de clientes (top 5)
-            self.atualizar_grafico_clientes(dados['clientes'][:5] if len(dados['clientes']) > 5 else dados['clientes'])
+            self.agendar_grafico('clientes', dados['clientes'][:5])
             
-            # Atualizar gráfico de vendas por dia
-            self.atualizar_grafico_vendas_diarias(dados['vendas_diarias'] if 'vendas_diarias' in dados else [])
+            # Atualizar gráfico de vendas por dia/semana/mês
+            self.agendar_grafico('vendas_diarias', dados['vendas_diarias'], dados['agrupamento'])
         
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {str(e)}")
     
-    # Modificações nos métodos de atualização de gráficos
-    def atualizar_grafico_vendas_diarias(self, vendas_diarias):
-        """Atualiza o gráfico de linha de vendas diárias com estilo moderno"""
-        # Configurar estilo
-        colors = set_modern_style()
-        
-        # Se não temos dados de vendas diárias, criar alguns de exemplo
-        if not vendas_diarias:
-            data_inicio = self.dt_inicio.date()
-            data_fim = self.dt_fim.date()
-            
-            # Cria datas entre início e fim
-            datas = []
-            data_atual = data_inicio
-            while data_atual <= data_fim:
-                datas.append(data_atual.toString("dd/MM"))  # Formato mais curto para as datas
-                data_atual = data_atual.addDays(1)
-            
-            # Gera valores aleatórios para exemplo
-            valores = [random.uniform(100, 5000) for _ in range(len(datas))]
-            
-            vendas_diarias = [{'data': data, 'valor': valor} for data, valor in zip(datas, valores)]
-        else:
-            # Formatando datas para exibição mais limpa
-            for item in vendas_diarias:
-                if 'data' in item and len(item['data']) == 10:  # Formato yyyy-MM-dd
-                    try:
-                        year, month, day = item['data'].split('-')
-                        item['data_display'] = f"{day}/{month}"
-                    except:
-                        item['data_display'] = item['data']
-                else:
-                    item['data_display'] = item['data']
-        
-        # Limpa o gráfico
-        self.chart_vendas.axes.clear()
-        
-        # Extrai datas e valores
-        datas = [item.get('data_display', item['data']) for item in vendas_diarias]
-        valores = [item['valor'] for item in vendas_diarias]
-        
-        # Cria o gráfico de linha com estilo mais moderno
-        self.chart_vendas.axes.plot(
-            datas, 
-            valores, 
-            marker='o',
-            markersize=6, 
-            markerfacecolor='white',
-            markeredgecolor=colors['primary'],
-            markeredgewidth=1.5,
-            linestyle='-', 
-            linewidth=2.5,
-            color=colors['primary'],
-            alpha=0.8
-        )
-        
-        # Preencher área sob a linha
-        self.chart_vendas.axes.fill_between(
-            datas, 
-            valores, 
-            color=colors['primary'], 
-            alpha=0.1
-        )
+    def adicionar_espaco_grafico(self, nome, layout):
+        """Reserva no layout o lugar do gráfico até o canvas ser criado"""
+        espaco = QLabel("Carregando gráfico...")
+        espaco.setAlignment(Qt.AlignCenter)
+        espaco.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(espaco, 1)
+        self._layouts_graficos[nome] = (layout, espaco)
+    
+    def criar_graficos(self):
+        """
+        Carrega o matplotlib e troca os espaços reservados pelos canvases.
+        
+        Roda numa volta posterior do laço de eventos, depois que a página já
+        foi pintada, para a importação do matplotlib não atrasar a primeira
+        exibição do dashboard.
+        """
+        if self.chartCanvases:
+            return
         
-        # Configurações visuais
-        self.chart_vendas.axes.set_ylabel('Valor (R$)', fontsize=11, fontweight='bold')
-        self.chart_vendas.axes.spines['top'].set_visible(False)
-        self.chart_vendas.axes.spines['right'].set_visible(False)
-        self.chart_vendas.axes.spines['left'].set_color('#cccccc')
-        self.chart_vendas.axes.spines['bottom'].set_color('#cccccc')
+        from ui.graficos import MplCanvas, set_modern_style
+        self.cores = set_modern_style()
         
-        # Rotaciona as datas para melhor visualização
-        if len(datas) > 3:
-            self.chart_vendas.axes.tick_params(axis='x', rotation=30)
+        for nome, (layout, espaco) in self._layouts_graficos.items():
+            canvas = MplCanvas(width=5, height=2.5, dpi=100)
+            layout.replaceWidget(espaco, canvas)
+            canvas.show()
+            espaco.deleteLater()
+            self.chartCanvases[nome] = canvas
+        self._layouts_graficos.clear()
         
-        # Definir limites do eixo Y começando de zero
-        self.chart_vendas.axes.set_ylim(bottom=0)
+        self.chart_vendas = self.chartCanvases['vendas_diarias']
+        self.chart_produtos = self.chartCanvases['produtos']
+        self.chart_pagamentos = self.chartCanvases['pagamentos']
+        self.chart_clientes = self.chartCanvases['clientes']
         
-        # Formatando valores do eixo Y
-        self.chart_vendas.axes.yaxis.set_major_formatter(
-            matplotlib.ticker.FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
+        self.desenhar_pendentes()
+    
+    # Atualização dos gráficos: os artistas (linha, barras, fatias) são criados
+    # uma vez e depois só recebem novos dados; só são recriados quando a
+    # quantidade de itens muda
+    def agendar_grafico(self, nome, *args):
+        """Atualiza o gráfico agora se estiver visível ou guarda os dados para quando for exibido"""
+        canvas = self.chartCanvases.get(nome)
+        if canvas is not None and canvas.isVisible():
+            self._graficos_pendentes.pop(nome, None)
+            self._atualizadores[nome](*args)
+        else:
+            self._graficos_pendentes[nome] = args
+    
+    def desenhar_pendentes(self):
+        """Desenha os gráficos que receberam dados enquanto estavam ocultos"""
+        for nome in list(self._graficos_pendentes):
+            canvas = self.chartCanvases.get(nome)
+            if canvas is not None and canvas.isVisible():
+                self._atualizadores[nome](*self._graficos_pendentes.pop(nome))
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.desenhar_pendentes)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # Primeira pintura feita: criar os gráficos na próxima volta do laço
+        if not self.chartCanvases and not self.timer_graficos.isActive():
+            self.timer_graficos.start()
+    
+    @staticmethod
+    def _estilizar_eixos(axes, eixo_valores):
+        """Remove bordas desnecessárias e formata os valores em reais"""
+        from matplotlib.ticker import FuncFormatter
+        axes.spines['top'].set_visible(False)
+        axes.spines['right'].set_visible(False)
+        axes.spines['left'].set_color('#cccccc')
+        axes.spines['bottom'].set_color('#cccccc')
+        eixo_valores.set_major_formatter(
+            FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
         )
+    
+    def atualizar_grafico_vendas_diarias(self, vendas_diarias, agrupamento='dia'):
+        """Atualiza o gráfico de linha de vendas por dia, semana ou mês com estilo moderno"""
+        colors = self.cores
+        canvas = self.chart_vendas
+        axes = canvas.axes
+        
+        titulos = {'dia': "Vendas por Dia", 'semana': "Vendas por Semana", 'mes': "Vendas por Mês"}
+        self.titulo_grafico_vendas.setText(titulos.get(agrupamento, "Vendas por Dia"))
+        
+        # Formatando datas (início de cada período, yyyy-MM-dd) para exibição mais limpa
+        datas = []
+        for item in vendas_diarias:
+            year, month, day = item['data'].split('-')
+            datas.append(f"{month}/{year}" if agrupamento == 'mes' else f"{day}/{month}")
+        valores = [item['valor'] for item in vendas_diarias]
+        posicoes = list(range(len(datas)))
+        
+        if self.linha_vendas is None:
+            # Cria a linha uma única vez; ela é desenhada por blitting (animated)
+            self.linha_vendas, = axes.plot(
+                [], [],
+                marker='o',
+                markersize=6, 
+                markerfacecolor='white',
+                markeredgecolor=colors['primary'],
+                markeredgewidth=1.5,
+                linestyle='-', 
+                linewidth=2.5,
+                color=colors['primary'],
+                alpha=0.8,
+                animated=True
+            )
+            axes.set_ylabel('Valor (R$)', fontsize=11, fontweight='bold')
+            self._estilizar_eixos(axes, axes.yaxis)
+        
+        # Atualiza só os dados da linha e da área sob ela
+        self.linha_vendas.set_data(posicoes, valores)
+        if self.area_vendas is not None:
+            self.area_vendas.remove()
+        self.area_vendas = axes.fill_between(posicoes, valores, color=colors['primary'],
+                                             alpha=0.1, animated=True)
+        canvas.artistas_animados = [self.area_vendas, self.linha_vendas]
+        
+        # Mesmos rótulos e escala ainda adequada: basta redesenhar a linha sobre o fundo salvo
+        maximo = max(valores, default=0)
+        _, teto_atual = axes.get_ylim()
+        if datas == self._rotulos_vendas and teto_atual * 0.5 <= maximo * 1.1 <= teto_atual:
+            if canvas.blit_animados():
+                return
         
-        # Ajusta o layout
-        self.chart_vendas.fig.tight_layout()
+        # Eixos mudaram: ajustar limites e rótulos e redesenhar o canvas
+        self._rotulos_vendas = datas
+        axes.set_xlim(-0.5, max(len(posicoes) - 1, 0) + 0.5)
+        axes.set_ylim(0, maximo * 1.1 if maximo > 0 else 1)
         
-        # Redesenha o canvas
-        self.chart_vendas.draw()
-
-
-    def atualizar_grafico_produtos(self, produtos):
-        """Atualiza o gráfico de barras dos produtos mais vendidos com estilo moderno"""
-        # Configurar estilo
-        colors = set_modern_style()
+        # Exibir no máximo ~15 rótulos no eixo X
+        passo = max(1, (len(datas) + 14) // 15)
+        axes.set_xticks(posicoes[::passo])
+        axes.set_xticklabels(datas[::passo], rotation=30 if len(datas) > 3 else 0)
         
-        # Limpa o gráfico
-        self.chart_produtos.axes.clear()
+        canvas.fig.tight_layout()
+        canvas.draw_idle()
+    
+    def _atualizar_barras(self, canvas, chave, nomes, valores, horizontal, mapa_cores,
+                          inicio_gradiente, formato_rotulo):
+        """
+        Atualiza um gráfico de barras reaproveitando as barras e os rótulos
+        existentes quando a quantidade de barras não muda
+        """
+        from matplotlib import cm
+        
+        axes = canvas.axes
+        barras, rotulos = self._barras.get(chave, (None, None))
+        
+        if barras is None or len(barras) != len(valores):
+            # Quantidade mudou: recriar as barras
+            axes.clear()
+            self._barras.pop(chave, None)
+            if not valores:
+                canvas.draw_idle()
+                return
+            
+            cmap = cm.get_cmap(mapa_cores)
+            bar_colors = [cmap(inicio_gradiente + (1 - inicio_gradiente) * i / len(valores))
+                          for i in range(len(valores))]
+            posicoes = list(range(len(valores)))
+            
+            if horizontal:
+                barras = axes.barh(posicoes, valores, color=bar_colors, height=0.65,
+                                   edgecolor='white', linewidth=0.5)
+                axes.set_xlabel('Valor Total (R$)', fontsize=11, fontweight='bold')
+                self._estilizar_eixos(axes, axes.xaxis)
+            else:
+                barras = axes.bar(posicoes, valores, color=bar_colors, width=0.7,
+                                  edgecolor='white', linewidth=1)
+                axes.set_ylabel('Valor Total (R$)', fontsize=11, fontweight='bold')
+                self._estilizar_eixos(axes, axes.yaxis)
+                axes.tick_params(axis='x', rotation=30)
+            
+            rotulos = [
+                axes.text(0, 0, '', ha='left' if horizontal else 'center',
+                          va='center' if horizontal else 'bottom', fontsize=9, alpha=0.8)
+                for _ in barras
+            ]
+            self._barras[chave] = (barras, rotulos)
+            estrutura_nova = True
+        else:
+            estrutura_nova = False
         
-        if not produtos:
-            self.chart_produtos.draw()
-            return
+        # Atualiza tamanhos das barras, rótulos de valor e nomes
+        for barra, rotulo, valor in zip(barras, rotulos, valores):
+            if horizontal:
+                barra.set_width(valor)
+                rotulo.set_position((valor * 1.01, barra.get_y() + barra.get_height() / 2))
+            else:
+                barra.set_height(valor)
+                rotulo.set_position((barra.get_x() + barra.get_width() / 2, valor * 1.01))
+            rotulo.set_text(formato_rotulo(valor))
+        
+        limite = max(valores) * 1.15 if max(valores) > 0 else 1
+        if horizontal:
+            axes.set_yticks(range(len(nomes)))
+            axes.set_yticklabels(nomes)
+            axes.set_xlim(0, limite)
+        else:
+            axes.set_xticks(range(len(nomes)))
+            axes.set_xticklabels(nomes)
+            axes.set_ylim(0, limite)
         
-        # Extrai nomes e valores
-        nomes = [item['nome'] for item in produtos]
+        if estrutura_nova:
+            canvas.fig.tight_layout()
+        canvas.draw_idle()
+    
+    def atualizar_grafico_produtos(self, produtos):
+        """Atualiza o gráfico de barras dos produtos mais vendidos com estilo moderno"""
+        # Encurtar nomes muito longos
+        nomes_display = [item['nome'][:12] + '...' if len(item['nome']) > 15 else item['nome']
+                         for item in produtos]
         valores = [item['valor_total'] for item in produtos]
         
+        self._atualizar_barras(self.chart_produtos, 'produtos', nomes_display, valores,
+                               horizontal=True, mapa_cores='Blues', inicio_gradiente=0.3,
+                               formato_rotulo=lambda valor: f'R$ {valor:,.2f}')
+    
+    def atualizar_grafico_clientes(self, clientes):
+        """Atualiza o gráfico de barras dos melhores clientes com estilo moderno"""
         # Encurtar nomes muito longos
-        nomes_display = []
-        for nome in nomes:
-            if len(nome) > 15:
-                nomes_display.append(nome[:12] + '...')
-            else:
-                nomes_display.append(nome)
-        
-        # Cria o gráfico de barras horizontais com gradiente de cores
-        color_map = matplotlib.cm.get_cmap('Blues')
-        num_bars = len(nomes)
-        bar_colors = [color_map(0.3 + 0.7 * i / num_bars) for i in range(num_bars)]
-        
-        bars = self.chart_produtos.axes.barh(
-            nomes_display, 
-            valores, 
-            color=bar_colors,
-            height=0.65,  # Barras um pouco mais finas
-            edgecolor='white',
-            linewidth=0.5
-        )
-        
-        # Adiciona os valores no final das barras
-        for bar in bars:
-            width = bar.get_width()
-            self.chart_produtos.axes.text(
-                width * 1.01, 
-                bar.get_y() + bar.get_height()/2, 
-                f'R$ {width:,.2f}',
-                ha='left', 
-                va='center',
-                fontsize=9,
-                alpha=0.8
-            )
-        
-        # Formata o gráfico
-        self.chart_produtos.axes.set_xlabel('Valor Total (R$)', fontsize=11, fontweight='bold')
-        
-        # Remover bordas desnecessárias
-        self.chart_produtos.axes.spines['top'].set_visible(False)
-        self.chart_produtos.axes.spines['right'].set_visible(False)
-        self.chart_produtos.axes.spines['left'].set_color('#cccccc')
-        self.chart_produtos.axes.spines['bottom'].set_color('#cccccc')
-        
-        # Definir limites do eixo X começando de zero
-        self.chart_produtos.axes.set_xlim(left=0)
-        
-        # Formatando valores do eixo X
-        self.chart_produtos.axes.xaxis.set_major_formatter(
-            matplotlib.ticker.FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
-        )
-        
-        # Ajusta o layout
-        self.chart_produtos.fig.tight_layout()
+        nomes_display = [item['nome'][:10] + '...' if len(item['nome']) > 12 else item['nome']
+                         for item in clientes]
+        valores = [item['valor_total'] for item in clientes]
         
-        # Redesenha o canvas
-        self.chart_produtos.draw()
-
-
+        self._atualizar_barras(self.chart_clientes, 'clientes', nomes_display, valores,
+                               horizontal=False, mapa_cores='Purples', inicio_gradiente=0.4,
+                               formato_rotulo=lambda valor: f'R$ {valor:,.0f}')
+    
     def atualizar_grafico_pagamentos(self, pagamentos):
         """Atualiza o gráfico de pizza das formas de pagamento com estilo moderno"""
-        # Configurar estilo
-        colors = set_modern_style()
+        from matplotlib.patches import Circle
         
-        # Limpa o gráfico
-        self.chart_pagamentos.axes.clear()
-        
-        if not pagamentos:
-            self.chart_pagamentos.draw()
-            return
+        canvas = self.chart_pagamentos
         
         # Extrai labels e valores
         labels = [item['forma'] for item in pagamentos]
         valores = [item['valor_total'] for item in pagamentos]
         
+        # Total para calcular percentuais
+        total = sum(valores)
+        legend_labels = [
+            f"{label}\nR$ {valor:,.2f} ({valor/total*100:.1f}%)" 
+            for label, valor in zip(labels, valores)
+        ] if total else []
+        
+        fatias = self._fatias_pagamentos
+        if fatias is not None and len(fatias[0]) == len(valores) and total:
+            # Mesma quantidade de fatias: ajustar ângulos, percentuais e legenda
+            wedges, autotexts, legenda = fatias
+            angulo = 90
+            for wedge, autotext, valor in zip(wedges, autotexts, valores):
+                theta1, theta2 = angulo, angulo + 360 * valor / total
+                wedge.set_theta1(theta1)
+                wedge.set_theta2(theta2)
+                
+                meio = math.radians((theta1 + theta2) / 2)
+                autotext.set_position((0.6 * math.cos(meio), 0.6 * math.sin(meio)))
+                pct = valor / total * 100
+                autotext.set_text(f"{pct:.1f}%" if pct > 3 else "")
+                angulo = theta2
+            
+            for texto, label in zip(legenda.get_texts(), legend_labels):
+                texto.set_text(label)
+            
+            canvas.draw_idle()
+            return
+        
+        # Quantidade mudou: recriar o gráfico
+        canvas.axes.clear()
+        self._fatias_pagamentos = None
+        
+        if not pagamentos or not total:
+            canvas.draw_idle()
+            return
+        
         # Cores modernas para o gráfico de pizza
         pie_colors = [
             '#3498db', '#2ecc71', '#f39c12', '#e74c3c', 
             '#9b59b6', '#1abc9c', '#34495e', '#7f8c8d'
         ]
         
-        # Total para calcular percentuais
-        total = sum(valores)
-        
         # Cria o gráfico de pizza
-        wedges, texts, autotexts = self.chart_pagamentos.axes.pie(
+        wedges, texts, autotexts = canvas.axes.pie(
             valores, 
             labels=None,
             autopct=lambda pct: f"{pct:.1f}%" if pct > 3 else "",
@@ -639,16 +746,11 @@ class DashboardWindow(QWidget):
             autotext.set_fontweight('bold')
         
         # Adiciona um círculo branco no meio (estilo donut)
-        centre_circle = plt.Circle((0, 0), 0.5, fc='white', edgecolor='none')
-        self.chart_pagamentos.axes.add_patch(centre_circle)
+        centre_circle = Circle((0, 0), 0.5, fc='white', edgecolor='none')
+        canvas.axes.add_patch(centre_circle)
         
         # Adiciona a legenda com valores e percentuais
-        legend_labels = [
-            f"{label}\nR$ {valor:,.2f} ({valor/total*100:.1f}%)" 
-            for label, valor in zip(labels, valores)
-        ]
-        
-        self.chart_pagamentos.axes.legend(
+        legenda = canvas.axes.legend(
             wedges, 
             legend_labels, 
             loc="center left", 
@@ -658,89 +760,10 @@ class DashboardWindow(QWidget):
         )
         
         # Iguala os aspectos para ter um círculo perfeito
-        self.chart_pagamentos.axes.set_aspect('equal')
-        
-        # Ajusta o layout
-        self.chart_pagamentos.fig.tight_layout()
-        
-        # Redesenha o canvas
-        self.chart_pagamentos.draw()
-
-
-    def atualizar_grafico_clientes(self, clientes):
-        """Atualiza o gráfico de barras dos melhores clientes com estilo moderno"""
-        # Configurar estilo
-        colors = set_modern_style()
-        
-        # Limpa o gráfico
-        self.chart_clientes.axes.clear()
-        
-        if not clientes:
-            self.chart_clientes.draw()
-            return
-        
-        # Extrai nomes e valores
-        nomes = [item['nome'] for item in clientes]
-        valores = [item['valor_total'] for item in clientes]
-        
-        # Encurtar nomes muito longos
-        nomes_display = []
-        for nome in nomes:
-            if len(nome) > 12:
-                nomes_display.append(nome[:10] + '...')
-            else:
-                nomes_display.append(nome)
-        
-        # Gradiente de cores para as barras
-        color_map = matplotlib.cm.get_cmap('Purples')
-        num_bars = len(nomes)
-        bar_colors = [color_map(0.4 + 0.6 * i / num_bars) for i in range(num_bars)]
-        
-        # Cria o gráfico de barras verticais
-        bars = self.chart_clientes.axes.bar(
-            nomes_display, 
-            valores, 
-            color=bar_colors,
-            width=0.7,
-            edgecolor='white',
-            linewidth=1
-        )
+        canvas.axes.set_aspect('equal')
         
-        # Adiciona os valores em cima das barras
-        for bar in bars:
-            height = bar.get_height()
-            self.chart_clientes.axes.text(
-                bar.get_x() + bar.get_width()/2, 
-                height * 1.01,
-                f'R$ {height:,.0f}', 
-                ha='center', 
-                va='bottom', 
-                fontsize=9,
-                alpha=0.8
-            )
-        
-        # Formata o gráfico
-        self.chart_clientes.axes.set_ylabel('Valor Total (R$)', fontsize=11, fontweight='bold')
-        
-        # Remover bordas desnecessárias
-        self.chart_clientes.axes.spines['top'].set_visible(False)
-        self.chart_clientes.axes.spines['right'].set_visible(False)
-        self.chart_clientes.axes.spines['left'].set_color('#cccccc')
-        self.chart_clientes.axes.spines['bottom'].set_color('#cccccc')
-        
-        # Definir limites do eixo Y começando de zero
-        self.chart_clientes.axes.set_ylim(bottom=0)
-        
-        # Formatando valores do eixo Y
-        self.chart_clientes.axes.yaxis.set_major_formatter(
-            matplotlib.ticker.FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
-        )
-        
-        # Rotaciona os nomes para melhor visualização
-        self.chart_clientes.axes.tick_params(axis='x', rotation=30)
+        self._fatias_pagamentos = (wedges, autotexts, legenda)
         
         # Ajusta o layout
-        self.chart_clientes.fig.tight_layout()
-        
-        # Redesenha o canvas
-        self.chart_clientes.draw()
\ No newline at end of file
+        canvas.fig.tight_layout()
+        canvas.draw_idle()
@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-                           QPushButton, QTableWidget, QTableWidgetItem, QFormLayout,
+                           QPushButton, QTableView, QFormLayout,
                            QDateEdit, QComboBox, QMessageBox, QHeaderView, QSpinBox,
                            QDoubleSpinBox, QDialog, QFrame, QToolButton, QGroupBox,
                            QFileDialog)
@@ -7,16 +7,20 @@ from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont, QIcon, QColor, QBrush
 import os
 from datetime import datetime, timedelta
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
+
+from ui.produtos_model import ProdutosTableModel, ProdutosProxyModel, AcoesDelegate, COLUNA_ACOES
+from utils.consulta_assincrona import ConsultaAssincrona
+from utils.alertas_estoque import AlertasEstoque
+from database.db_manager import CodigoBarrasDuplicado
 
 class EstoqueWindow(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, consultas=None, alertas=None):
         super().__init__()
         self.db = db
+        self.consultas = consultas or ConsultaAssincrona(db, self)
+        # Alertas de vencimento/estoque baixo compartilhados com a janela principal
+        self.alertas = alertas or AlertasEstoque(db, self.consultas, self)
+        self.consultas.carregando.connect(self.estado_carregando)
         self.initUI()
         self.carregar_dados()
     
@@ -96,18 +100,35 @@ class EstoqueWindow(QWidget):
         legenda_layout.addWidget(vencimento_15_label)
         
         legenda_layout.addStretch()
+        
+        # Indicador de carregamento das consultas em segundo plano
+        self.lbl_carregando = QLabel("Carregando...")
+        self.lbl_carregando.setVisible(False)
+        legenda_layout.addWidget(self.lbl_carregando)
         layout.addLayout(legenda_layout)
         
         # Tabela de produtos
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(12)
-        self.tabela.setHorizontalHeaderLabels([
-            "ID", "Código de Barras", "Nome", "Quantidade", "Estoque Mín.", 
-            "Preço Compra", "Margem %", "Preço Venda", "Validade", 
-            "Localização", "Fornecedor", "Ações"
-        ])
+        # Modelo/visão: a formatação é feita só para as linhas visíveis
+        self.modelo = ProdutosTableModel(self)
+        self.proxy = ProdutosProxyModel(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        self.tabela = QTableView()
+        self.tabela.setModel(self.proxy)
+        self.tabela.setSortingEnabled(True)
+        self.tabela.sortByColumn(0, Qt.AscendingOrder)
+        self.tabela.setSelectionBehavior(QTableView.SelectRows)
         self.tabela.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.tabela.verticalHeader().setVisible(False)
+        # Altura fixa de linha evita medir o conteúdo de todas as linhas
+        self.tabela.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabela.verticalHeader().setDefaultSectionSize(32)
+        
+        # Botões Editar/Excluir desenhados pelo delegate (sem widgets por linha)
+        self.acoes_delegate = AcoesDelegate(self.tabela)
+        self.acoes_delegate.editar.connect(self.abrir_formulario_produto)
+        self.acoes_delegate.excluir.connect(self.excluir_produto)
+        self.tabela.setItemDelegateForColumn(COLUNA_ACOES, self.acoes_delegate)
         layout.addWidget(self.tabela)
         
         # Botões de ação
@@ -127,27 +148,33 @@ class EstoqueWindow(QWidget):
         layout.addLayout(action_layout)
     
     def carregar_dados(self):
-        """Carrega os produtos do banco de dados para a tabela."""
-        produtos = self.db.listar_produtos()
-        self.atualizar_tabela(produtos)
+        """Carrega os produtos do banco de dados para a tabela (em segundo plano)."""
+        self.consultas.executar('estoque', 'listar_produtos',
+                                sucesso=self.atualizar_tabela, erro=self.erro_consulta)
     
     def pesquisar_produtos(self):
         """Pesquisa produtos pelo termo digitado."""
         termo = self.search_input.text()
-        if termo:
-            produtos = self.db.listar_produtos(filtro=termo)
-        else:
-            produtos = self.db.listar_produtos()
-        
-        self.atualizar_tabela(produtos)
+        # Uma nova pesquisa substitui a anterior que ainda não terminou
+        self.consultas.executar('estoque', 'listar_produtos', filtro=termo or None,
+                                sucesso=self.exibir_resultados_pesquisa if termo else self.atualizar_tabela,
+                                erro=self.erro_consulta)
     
     def aplicar_filtros(self):
         """Aplica os filtros selecionados."""
         filtro_estoque = self.estoque_combo.currentData()
         filtro_vencimento = self.vencimento_combo.currentData()
         
-        produtos = self.db.filtrar_produtos(filtro_estoque, filtro_vencimento)
-        self.atualizar_tabela(produtos)
+        self.consultas.executar('estoque', 'filtrar_produtos', filtro_estoque, filtro_vencimento,
+                                sucesso=self.atualizar_tabela, erro=self.erro_consulta)
+    
+    def estado_carregando(self, canal, ativo):
+        """Mostra o indicador de carregamento enquanto a consulta está pendente."""
+        if canal == 'estoque':
+            self.lbl_carregando.setVisible(ativo)
+    
+    def erro_consulta(self, mensagem):
+        QMessageBox.warning(self, "Erro", f"Erro ao carregar produtos: {mensagem}")
     
     def limpar_filtros(self):
         """Limpa todos os filtros aplicados."""
@@ -158,85 +185,15 @@ class EstoqueWindow(QWidget):
     
     def atualizar_tabela(self, produtos):
         """Atualiza a tabela com os produtos fornecidos."""
-        self.tabela.setRowCount(0)
-        
-        hoje = datetime.now().date()
-        
-        for row, produto in enumerate(produtos):
-            self.tabela.insertRow(row)
-            
-            # Adicionar dados às células
-            self.tabela.setItem(row, 0, QTableWidgetItem(str(produto['id'])))
-            self.tabela.setItem(row, 1, QTableWidgetItem(produto['codigo_barras'] or ""))
-            
-            # Nome do produto
-            nome_item = QTableWidgetItem(produto['nome'])
-            self.tabela.setItem(row, 2, nome_item)
-            
-            # Quantidade
-            quantidade_item = QTableWidgetItem(str(produto['quantidade']))
-            estoque_minimo = produto['estoque_minimo'] or 0
-            
-            # Verificar se está abaixo do estoque mínimo
-            if produto['quantidade'] <= estoque_minimo:
-                quantidade_item.setForeground(QBrush(QColor('red')))
-                quantidade_item.setToolTip("Estoque abaixo do mínimo!")
-            
-            self.tabela.setItem(row, 3, quantidade_item)
-            self.tabela.setItem(row, 4, QTableWidgetItem(str(estoque_minimo)))
-            self.tabela.setItem(row, 5, QTableWidgetItem(f"R$ {produto['preco_compra']:.2f}"))
-            
-            # Margem de lucro
-            margem = produto['margem_lucro'] or 0
-            self.tabela.setItem(row, 6, QTableWidgetItem(f"{margem:.2f}%"))
-            
-            self.tabela.setItem(row, 7, QTableWidgetItem(f"R$ {produto['preco_venda']:.2f}"))
-            
-            # Data de validade
-            validade_item = QTableWidgetItem(str(produto['data_validade'] or ""))
-            
-            # Verificar vencimento
-            if produto['data_validade']:
-                try:
-                    data_validade = datetime.strptime(produto['data_validade'], "%Y-%m-%d").date()
-                    dias_para_vencer = (data_validade - hoje).days
-                    
-                    if dias_para_vencer <= 0:
-                        # Produto vencido
-                        validade_item.setForeground(QBrush(QColor('darkred')))
-                        validade_item.setToolTip("Produto VENCIDO!")
-                    elif dias_para_vencer <= 15:
-                        # Vence em 15 dias ou menos
-                        validade_item.setForeground(QBrush(QColor('red')))
-                        validade_item.setToolTip(f"Vence em {dias_para_vencer} dias!")
-                    elif dias_para_vencer <= 30:
-                        # Vence em 30 dias ou menos
-                        validade_item.setForeground(QBrush(QColor('orange')))
-                        validade_item.setToolTip(f"Vence em {dias_para_vencer} dias!")
-                except:
-                    pass
-            
-            self.tabela.setItem(row, 8, validade_item)
-            self.tabela.setItem(row, 9, QTableWidgetItem(produto['localizacao'] or ""))
-            
-            fornecedor_nome = produto['fornecedor_nome'] if produto['fornecedor_nome'] else "N/A"
-            self.tabela.setItem(row, 10, QTableWidgetItem(fornecedor_nome))
-            
-            # Botões de ação
-            acoes_widget = QWidget()
-            acoes_layout = QHBoxLayout(acoes_widget)
-            acoes_layout.setContentsMargins(0, 0, 0, 0)
-            
-            editar_btn = QPushButton("Editar")
-            editar_btn.clicked.connect(lambda _, p_id=produto['id']: self.abrir_formulario_produto(p_id))
-            
-            excluir_btn = QPushButton("Excluir")
-            excluir_btn.clicked.connect(lambda _, p_id=produto['id']: self.excluir_produto(p_id))
-            
-            acoes_layout.addWidget(editar_btn)
-            acoes_layout.addWidget(excluir_btn)
-            
-            self.tabela.setCellWidget(row, 11, acoes_widget)
+        self.modelo.definir_produtos(produtos)
+        # Depois de uma pesquisa, a lista completa volta a ser ordenada pelo ID
+        if self.tabela.horizontalHeader().sortIndicatorSection() < 0:
+            self.tabela.sortByColumn(0, Qt.AscendingOrder)
+    
+    def exibir_resultados_pesquisa(self, produtos):
+        """Mostra os resultados da pesquisa na ordem de relevância (sem ordenação por coluna)."""
+        self.tabela.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.modelo.definir_produtos(produtos, ordem_original=True)
     
     def abrir_formulario_produto(self, produto_id=None):
         """Abre o formulário para adicionar ou editar um produto."""
@@ -262,7 +219,7 @@ class EstoqueWindow(QWidget):
     
     def relatorio_vencimentos(self):
         """Gera relatório de produtos próximos ao vencimento."""
-        produtos = self.db.verificar_produtos_vencendo(dias=30)
+        produtos = self.alertas.vencendo(dias=30)
         
         if not produtos:
             QMessageBox.information(self, "Relatório", "Não há produtos próximos do vencimento nos próximos 30 dias.")
@@ -312,6 +269,13 @@ class EstoqueWindow(QWidget):
             if not file_path:
                 return  # Cancelado pelo usuário
             
+            # O reportlab só é carregado quando um relatório é gerado
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.units import cm
+            
             # Criar documento PDF
             doc = SimpleDocTemplate(
                 file_path,
@@ -440,7 +404,7 @@ class EstoqueWindow(QWidget):
     
     def relatorio_estoque_baixo(self):
         """Gera relatório de produtos com estoque baixo."""
-        produtos = self.db.verificar_produtos_estoque_baixo()
+        produtos = self.alertas.estoque_baixo()
         
         if not produtos:
             QMessageBox.information(self, "Relatório", "Não há produtos com estoque abaixo do mínimo.")
@@ -490,6 +454,13 @@ class EstoqueWindow(QWidget):
             if not file_path:
                 return  # Cancelado pelo usuário
             
+            # O reportlab só é carregado quando um relatório é gerado
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.units import cm
+            
             # Criar documento PDF
             doc = SimpleDocTemplate(
                 file_path,
@@ -890,5 +861,8 @@ class FormularioProduto(QDialog):
             else:
                 QMessageBox.warning(self, "Erro", "Não foi possível salvar o produto.")
         
+        except CodigoBarrasDuplicado:
+            QMessageBox.warning(self, "Erro", "Código de barras já cadastrado em outro produto.")
+            self.codigo_barras_input.setFocus()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao salvar produto: {str(e)}")
\ No newline at end of file
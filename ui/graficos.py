@@ -0,0 +1,81 @@
+"""
+Gráficos do dashboard (matplotlib)
+
+Importar este módulo carrega o matplotlib e o backend Qt, o que leva algumas
+centenas de milissegundos; o DashboardWindow só o importa depois de exibir a
+página.
+"""
+import matplotlib
+matplotlib.use('Qt5Agg')
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+import matplotlib.pyplot as plt
+
+# Configurações globais para todos os gráficos
+def set_modern_style():
+    plt.style.use('seaborn-v0_8-whitegrid')
+    
+    # Cores modernas
+    colors = {
+        'primary': '#3498db',        # Azul
+        'success': '#2ecc71',        # Verde
+        'warning': '#f39c12',        # Laranja
+        'danger': '#e74c3c',         # Vermelho
+        'info': '#9b59b6',           # Roxo
+        'secondary': '#1abc9c',      # Turquesa
+        'light': '#ecf0f1',          # Cinza claro
+        'dark': '#34495e'            # Cinza escuro
+    }
+    
+    # Definir estilo de texto
+    font = {'family': 'sans-serif', 
+            'weight': 'normal',
+            'size': 10}
+    matplotlib.rc('font', **font)
+    
+    # Estilo de grade mais suave
+    matplotlib.rc('grid', linestyle='--', alpha=0.3)
+    
+    return colors
+
+# Classe MplCanvas modificada para melhor qualidade visual
+class MplCanvas(FigureCanvas):
+    def __init__(self, width=5, height=4, dpi=120):  # Aumentado o DPI para melhor resolução
+        self.fig = Figure(figsize=(width, height), dpi=dpi, facecolor='white')
+        self.axes = self.fig.add_subplot(111)
+        
+        # Definir estilo
+        set_modern_style()
+        
+        # Inicializar o canvas
+        super(MplCanvas, self).__init__(self.fig)
+        
+        # Configurações para melhor estética
+        self.fig.tight_layout(pad=2.5)  # Maior padding para evitar cortes
+        self.setStyleSheet("background-color:transparent;")  # Fundo transparente
+        
+        # Blitting: fundo salvo a cada desenho completo e artistas redesenhados sobre ele
+        self.artistas_animados = []
+        self._fundo = None
+        self.mpl_connect('draw_event', self._ao_desenhar)
+    
+    def _ao_desenhar(self, event):
+        """Salva o fundo (sem os artistas animados) e desenha os artistas por cima"""
+        self._fundo = self.copy_from_bbox(self.fig.bbox)
+        for artista in self.artistas_animados:
+            self.fig.draw_artist(artista)
+    
+    def blit_animados(self):
+        """
+        Redesenha apenas os artistas animados sobre o fundo salvo
+        
+        Returns:
+            bool: False se ainda não há fundo salvo (é preciso um desenho completo)
+        """
+        if self._fundo is None:
+            return False
+        self.restore_region(self._fundo)
+        for artista in self.artistas_animados:
+            self.fig.draw_artist(artista)
+        self.blit(self.fig.bbox)
+        return True
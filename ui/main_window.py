@@ -1,29 +1,55 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QPushButton, 
                             QLabel, QStackedWidget, QHBoxLayout, QFrame,
                             QAction, QMenu, QToolBar, QDialog, QFormLayout,
-                            QComboBox, QSpinBox, QMessageBox, QStatusBar, QSizePolicy)
+                            QComboBox, QSpinBox, QMessageBox, QStatusBar, QSizePolicy,
+                            QCheckBox)
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QCursor, QPainter, QColor, QBrush, QPainterPath
-from PyQt5.QtCore import Qt, QDate, QSize, QByteArray, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import Qt, QDate, QSize, QByteArray, QPropertyAnimation, QEasingCurve, QTimer
 from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtWidgets import QApplication
 
-from ui.estoque_window import EstoqueWindow
-from ui.fornecedor_window import FornecedorWindow
-from ui.promocoes_window import PromocoesWindow
-from ui.clientes_window import ClientesWindow
-from ui.caixa_window import CaixaWindow
-from ui.dashboard_window import DashboardWindow
+import importlib
+
+from utils.promocoes_ativas import PromocoesAtivas
+from utils.consulta_assincrona import ConsultaAssincrona
+from utils.alertas_estoque import AlertasEstoque
+from utils.backup_assincrono import BackupAssincrono
+from utils.perfil_inicializacao import perfil
+
+# Títulos das páginas, na ordem do stack
+TITULOS_PAGINAS = ["Dashboard", "Controle de Estoque", "Fornecedores",
+                   "Promoções", "Clientes", "Controle de Caixa"]
+
+# Módulos das páginas; são importados só quando a página é criada
+# (o dashboard carrega matplotlib/numpy)
+MODULOS_PAGINAS = ["ui.dashboard_window", "ui.estoque_window", "ui.fornecedor_window",
+                   "ui.promocoes_window", "ui.clientes_window", "ui.caixa_window"]
 
 class MainWindow(QMainWindow):
     def __init__(self, db, settings):
         super().__init__()
         self.db = db
         self.settings = settings
+        # Resolvedor de promoções do dia compartilhado pelo caixa, tela de promoções e barra de status
+        self.promocoes_ativas = PromocoesAtivas(db)
+        # Consultas em segundo plano compartilhadas pelas páginas
+        self.consultas = ConsultaAssincrona(db, self)
+        # Alertas de vencimento/estoque baixo calculados em segundo plano e compartilhados pelas páginas
+        self.alertas = AlertasEstoque(db, self.consultas, self)
+        self.alertas.alterados.connect(self.atualizar_contagem_alertas)
+        self.alertas_window = None
+        self.backup = BackupAssincrono(db, parent=self)
+        self._alertas_carregados = False
+        self._exibir_painel_alertas = False
         self.menu_collapsed = False
         self.setWindowFlags(self.windowFlags() | Qt.FramelessWindowHint)  # Janela sem bordas
+        # Páginas criadas sob demanda (None enquanto a página não foi aberta)
+        self.paginas = [None] * len(TITULOS_PAGINAS)
         self.initUI()
         self.check_promocoes_ativas()
         self.aplicar_tema()
+        # A página inicial é criada logo após a janela ser exibida
+        QTimer.singleShot(0, self.criar_pagina_inicial)
     
     def initUI(self):
         # Configurar janela principal
@@ -298,20 +324,9 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
         content_container_layout.addWidget(self.stack)
         
-        # Criar as páginas e adicioná-las ao stack
-        self.estoque_page = EstoqueWindow(self.db)
-        self.fornecedor_page = FornecedorWindow(self.db)
-        self.promocoes_page = PromocoesWindow(self.db)
-        self.clientes_page = ClientesWindow(self.db)
-        self.caixa_page = CaixaWindow(self.db)
-        self.dashboard_page = DashboardWindow(self.db)
-        
-        self.stack.addWidget(self.dashboard_page)
-        self.stack.addWidget(self.estoque_page)
-        self.stack.addWidget(self.fornecedor_page)
-        self.stack.addWidget(self.promocoes_page)
-        self.stack.addWidget(self.clientes_page)
-        self.stack.addWidget(self.caixa_page)
+        # Marcadores no lugar das páginas; cada página é criada ao ser aberta
+        for _ in TITULOS_PAGINAS:
+            self.stack.addWidget(self.criar_marcador_pagina())
         
         # Conectar sinais dos botões
         self.btn_dashboard.clicked.connect(lambda: self.switch_page(0))
@@ -334,6 +349,14 @@ class MainWindow(QMainWindow):
         self.statusBar.setMaximumHeight(25)
         self.statusBar.showMessage("Sistema pronto", 3000)
         
+        # Contagem de alertas; abre o painel de alertas ao clicar
+        self.btn_alertas = QPushButton("Verificando alertas...")
+        self.btn_alertas.setObjectName("statusAlertas")
+        self.btn_alertas.setFlat(True)
+        self.btn_alertas.setCursor(QCursor(Qt.PointingHandCursor))
+        self.btn_alertas.clicked.connect(self.abrir_alertas)
+        self.statusBar.addPermanentWidget(self.btn_alertas)
+        
         # Adicionar informações à direita da barra de status
         user_info_label = QLabel(f"Usuário: Admin | Perfil: Admin")
         user_info_label.setObjectName("statusUserInfo")
@@ -416,18 +439,98 @@ class MainWindow(QMainWindow):
             
             self.menu_collapsed = True
     
+    def criar_marcador_pagina(self):
+        """Widget exibido no stack enquanto a página ainda não foi criada."""
+        marcador = QLabel("Carregando...")
+        marcador.setAlignment(Qt.AlignCenter)
+        marcador.setFont(QFont("Segoe UI", 12))
+        return marcador
+    
+    def _criar_pagina(self, index):
+        """Importa o módulo da página e cria a página."""
+        modulo = importlib.import_module(MODULOS_PAGINAS[index])
+        
+        if index == 0:
+            return modulo.DashboardWindow(self.db, self.consultas)
+        if index == 1:
+            return modulo.EstoqueWindow(self.db, self.consultas, self.alertas)
+        if index == 2:
+            return modulo.FornecedorWindow(self.db)
+        if index == 3:
+            return modulo.PromocoesWindow(self.db, self.promocoes_ativas, self.consultas, self.alertas)
+        if index == 4:
+            return modulo.ClientesWindow(self.db)
+        return modulo.CaixaWindow(self.db, self.promocoes_ativas, self.consultas, self.backup)
+    
+    def pagina(self, index):
+        """
+        Retorna a página do índice, criando-a no lugar do marcador na primeira vez
+        
+        Args:
+            index (int): Posição da página no stack
+            
+        Returns:
+            QWidget: Página criada
+        """
+        if self.paginas[index] is None:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                with perfil.medir(f'pagina.{MODULOS_PAGINAS[index]}'):
+                    pagina = self._criar_pagina(index)
+            finally:
+                QApplication.restoreOverrideCursor()
+            
+            marcador = self.stack.widget(index)
+            atual = self.stack.currentIndex()
+            self.stack.insertWidget(index, pagina)
+            self.stack.removeWidget(marcador)
+            marcador.deleteLater()
+            self.stack.setCurrentIndex(atual)
+            self.paginas[index] = pagina
+        
+        return self.paginas[index]
+    
+    def criar_pagina_inicial(self):
+        """Cria a página atual do stack; a partir daqui a janela está utilizável."""
+        self.pagina(self.stack.currentIndex())
+        perfil.marcar('main_window.utilizavel')
+        perfil.salvar()
+    
+    def pre_aquecer_paginas(self, intervalo=300):
+        """
+        Cria em segundo plano, uma por vez, as páginas ainda não abertas (após o
+        login). Os módulos das páginas (matplotlib, reportlab) são importados aqui,
+        na thread da interface, nas voltas ociosas do loop de eventos
+        
+        Args:
+            intervalo (int): Milissegundos entre a criação de uma página e a próxima
+        """
+        pendentes = [i for i, pagina in enumerate(self.paginas) if pagina is None]
+        if not pendentes:
+            return
+        
+        def criar_proxima():
+            # Cada página é criada em uma volta do loop de eventos para não travar a interface
+            self.pagina(pendentes.pop(0))
+            if pendentes:
+                QTimer.singleShot(intervalo, criar_proxima)
+        
+        QTimer.singleShot(intervalo, criar_proxima)
+    
     def switch_page(self, index):
         """Muda para a página especificada e atualiza a interface."""
+        self.pagina(index)
         self.stack.setCurrentIndex(index)
         
-        # Atualizar título da página
-        titles = ["Dashboard", "Controle de Estoque", "Fornecedores", 
-                 "Promoções", "Clientes", "Controle de Caixa"]
+        # Vendas e cadastros alteram os alertas; recalcular em segundo plano se necessário
+        if self._alertas_carregados and not self.alertas.atualizado():
+            self.alertas.atualizar()
         
-        self.page_title.setText(titles[index])
+        # Atualizar título da página
+        self.page_title.setText(TITULOS_PAGINAS[index])
         
         # Atualizar status bar com a página atual
-        self.statusBar.showMessage(f"Área: {titles[index]}", 3000)
+        self.statusBar.showMessage(f"Área: {TITULOS_PAGINAS[index]}", 3000)
         
         # Destacar botão ativo
         buttons = [self.btn_dashboard, self.btn_estoque, self.btn_fornecedor, 
@@ -705,19 +808,54 @@ class MainWindow(QMainWindow):
         """Atualiza os dados da página atual."""
         current_index = self.stack.currentIndex()
         
-        pages = [self.dashboard_page, self.estoque_page, self.fornecedor_page,
-                self.promocoes_page, self.clientes_page, self.caixa_page]
-        
-        if current_index < len(pages):
-            pages[current_index].carregar_dados()
+        if 0 <= current_index < len(self.paginas) and self.paginas[current_index] is not None:
+            self.paginas[current_index].carregar_dados()
             self.statusBar.showMessage("Dados atualizados com sucesso!", 3000)
     
+    def verificar_alertas(self, exibir_painel=False):
+        """
+        Calcula os alertas de vencimento e estoque baixo em segundo plano
+        
+        Args:
+            exibir_painel (bool): Abrir o painel de alertas ao terminar, se houver vencidos ou vencendo
+        """
+        self._exibir_painel_alertas = exibir_painel
+        self.alertas.atualizar()
+    
+    def atualizar_contagem_alertas(self):
+        """Atualiza a contagem de alertas na barra de status."""
+        if not self._alertas_carregados:
+            perfil.marcar('alertas.prontos')
+            perfil.salvar()
+        self._alertas_carregados = True
+        
+        contagens = self.alertas.contagens(dias=15)
+        self.btn_alertas.setText(
+            f"Vencidos: {contagens['vencidos']} | Vencendo: {contagens['vencendo']} | "
+            f"Estoque baixo: {contagens['estoque_baixo']}"
+        )
+        self.btn_alertas.setToolTip("Vencendo nos próximos 15 dias. Clique para ver os alertas.")
+        
+        if self._exibir_painel_alertas:
+            self._exibir_painel_alertas = False
+            if contagens['vencidos'] or contagens['vencendo']:
+                self.abrir_alertas()
+    
+    def abrir_alertas(self):
+        """Abre o painel de alertas (não modal)."""
+        if self.alertas_window is None:
+            from ui.alertas_window import AlertasWindow
+            self.alertas_window = AlertasWindow(self.db, self.alertas, self)
+        
+        self.alertas_window.show()
+        self.alertas_window.raise_()
+        self.alertas_window.activateWindow()
+    
     def check_promocoes_ativas(self):
         """Verifica e exibe promoções ativas na barra de status."""
-        promocoes_ativas = self.db.listar_promocoes_ativas()
+        num_promocoes = self.promocoes_ativas.quantidade()
         
-        if promocoes_ativas:
-            num_promocoes = len(promocoes_ativas)
+        if num_promocoes:
             self.statusBar.showMessage(f"{num_promocoes} promoções ativas hoje ({QDate.currentDate().toString('dd/MM/yyyy')})")
     
     def relatorio_estoque_baixo(self):
@@ -736,7 +874,7 @@ class MainWindow(QMainWindow):
     
     def relatorio_vencimentos(self):
         """Gera relatório de produtos próximos ao vencimento."""
-        produtos = self.db.verificar_produtos_vencendo(dias=30)
+        produtos = self.alertas.vencendo(dias=30)
         
         if not produtos:
             QMessageBox.information(self, "Relatório", "Não há produtos próximos do vencimento nos próximos 30 dias.")
@@ -750,7 +888,7 @@ class MainWindow(QMainWindow):
     
     def relatorio_promocoes(self):
         """Gera relatório de promoções ativas."""
-        promocoes = self.db.listar_promocoes_ativas()
+        promocoes = self.promocoes_ativas.listar()
         
         if not promocoes:
             QMessageBox.information(self, "Relatório", "Não há promoções ativas no momento.")
@@ -773,6 +911,11 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Evento chamado quando a janela é fechada."""
+        # Esperar as consultas em andamento antes de fechar as conexões
+        self.consultas.aguardar(3000)
+        # Um backup interrompido não deixa arquivo (a cópia é feita em um temporário)
+        self.backup.cancelar()
+        self.backup.aguardar(3000)
         self.db.fechar()
         event.accept()
 
@@ -1297,9 +1440,15 @@ class ConfigDialog(QDialog):
         self.font_size_spin.setValue(self.settings.get_font_size())
         self.font_size_spin.setMinimumHeight(30)
         
+        # Pré-carregamento das páginas após o login
+        self.pre_carregar_check = QCheckBox("Pré-carregar páginas após o login")
+        self.pre_carregar_check.setFont(QFont("Segoe UI", 11))
+        self.pre_carregar_check.setChecked(self.settings.get_preload_pages())
+        
         # Adicionar campos ao formulário
         form_layout.addRow(tema_label, self.tema_combo)
         form_layout.addRow(font_label, self.font_size_spin)
+        form_layout.addRow("", self.pre_carregar_check)
         
         layout.addLayout(form_layout)
         
@@ -1335,6 +1484,7 @@ class ConfigDialog(QDialog):
         
         self.settings.set_theme(tema)
         self.settings.set_font_size(tamanho_fonte)
+        self.settings.set_preload_pages(self.pre_carregar_check.isChecked())
         
         self.accept()
 
@@ -0,0 +1,253 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+from PyQt5.QtCore import (Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel,
+                          QRect, QEvent, pyqtSignal)
+from PyQt5.QtGui import QColor, QBrush
+from datetime import date
+
+# Campos guardados por linha, na ordem das tuplas do modelo
+CAMPOS = ('id', 'codigo_barras', 'nome', 'quantidade', 'estoque_minimo',
+          'preco_compra', 'margem_lucro', 'preco_venda', 'data_validade',
+          'localizacao', 'fornecedor_nome')
+
+COLUNAS = ["ID", "Código de Barras", "Nome", "Quantidade", "Estoque Mín.",
+           "Preço Compra", "Margem %", "Preço Venda", "Validade",
+           "Localização", "Fornecedor", "Ações"]
+
+COLUNA_ACOES = len(COLUNAS) - 1
+
+# Papel que retorna o valor bruto da célula em vez do texto formatado
+PAPEL_VALOR = Qt.UserRole
+
+COR_VENCIDO = QBrush(QColor('darkred'))
+COR_ALERTA = QBrush(QColor('red'))
+COR_AVISO = QBrush(QColor('orange'))
+
+
+class ProdutosTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela da grade de estoque.
+
+    As linhas ficam em uma lista de tuplas (CAMPOS) e a formatação é feita
+    apenas em data(), ou seja, somente para as células visíveis. Os dias
+    até o vencimento são calculados sob demanda e guardados por linha.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._linhas = []
+        self._dias_vencimento = {}
+        self._hoje = date.today()
+        # Coluna -1: sem ordenação por coluna (mantém a ordem recebida, ex.: relevância)
+        self._coluna_ordem = 0
+        self._ordem = Qt.AscendingOrder
+
+    def definir_produtos(self, produtos, ordem_original=False):
+        """
+        Substitui o conteúdo do modelo
+
+        Args:
+            produtos (list): Linhas retornadas por listar_produtos/filtrar_produtos
+            ordem_original (bool): Mantém a ordem recebida (ex.: relevância dos resultados
+                                   da pesquisa) até o usuário clicar em um cabeçalho
+        """
+        if ordem_original:
+            self._coluna_ordem = -1
+
+        self.beginResetModel()
+        self._linhas = [tuple(produto[campo] for campo in CAMPOS) for produto in produtos]
+        self._hoje = date.today()
+        # Mantém a ordenação escolhida pelo usuário entre atualizações
+        if self._coluna_ordem >= 0:
+            self._ordenar()
+        else:
+            self._dias_vencimento = {}
+        self.endResetModel()
+
+    @staticmethod
+    def _chave_ordenacao(col):
+        """Função de chave para ordenar as tuplas pelo valor bruto da coluna"""
+        if col in (1, 2, 8, 9, 10):
+            return lambda linha: (linha[col] or "").lower()
+        return lambda linha: linha[col] or 0
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Ordena as linhas pela coluna informada (a coluna de ações é ignorada)"""
+        if column < 0 or column >= COLUNA_ACOES:
+            return
+
+        self._coluna_ordem = column
+        self._ordem = order
+
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        ids = [self._linhas[indice.row()][0] for indice in persistentes]
+
+        self._ordenar()
+
+        posicoes = {linha[0]: row for row, linha in enumerate(self._linhas)}
+        for indice, produto_id in zip(persistentes, ids):
+            self.changePersistentIndex(indice, self.index(posicoes[produto_id], indice.column()))
+        self.layoutChanged.emit()
+
+    def _ordenar(self):
+        self._linhas.sort(key=self._chave_ordenacao(self._coluna_ordem),
+                          reverse=self._ordem == Qt.DescendingOrder)
+        self._dias_vencimento = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._linhas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUNAS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def _dias_para_vencer(self, row):
+        """Dias até o vencimento da linha (None se não houver data válida)"""
+        if row not in self._dias_vencimento:
+            dias = None
+            data_validade = self._linhas[row][8]
+            if data_validade:
+                try:
+                    dias = (date.fromisoformat(str(data_validade)[:10]) - self._hoje).days
+                except ValueError:
+                    pass
+            self._dias_vencimento[row] = dias
+        return self._dias_vencimento[row]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, col = index.row(), index.column()
+        linha = self._linhas[row]
+
+        if role == Qt.DisplayRole:
+            return self._formatar(linha, col)
+
+        if role == PAPEL_VALOR:
+            if col == COLUNA_ACOES:
+                return None
+            valor = linha[col]
+            if col == 4 or col == 6:
+                return valor or 0
+            if col == 10 and not valor:
+                return "N/A"
+            return valor if valor is not None else ""
+
+        if role == Qt.ForegroundRole:
+            if col == 3 and linha[3] <= (linha[4] or 0):
+                return COR_ALERTA
+            if col == 8:
+                dias = self._dias_para_vencer(row)
+                if dias is not None:
+                    if dias <= 0:
+                        return COR_VENCIDO
+                    if dias <= 15:
+                        return COR_ALERTA
+                    if dias <= 30:
+                        return COR_AVISO
+            return None
+
+        if role == Qt.ToolTipRole:
+            if col == 3 and linha[3] <= (linha[4] or 0):
+                return "Estoque abaixo do mínimo!"
+            if col == 8:
+                dias = self._dias_para_vencer(row)
+                if dias is not None:
+                    if dias <= 0:
+                        return "Produto VENCIDO!"
+                    if dias <= 30:
+                        return f"Vence em {dias} dias!"
+            return None
+
+        return None
+
+    @staticmethod
+    def _formatar(linha, col):
+        """Texto exibido em cada coluna"""
+        if col == 0:
+            return str(linha[0])
+        if col == 1:
+            return linha[1] or ""
+        if col == 2:
+            return linha[2]
+        if col == 3:
+            return str(linha[3])
+        if col == 4:
+            return str(linha[4] or 0)
+        if col == 5:
+            return f"R$ {linha[5]:.2f}"
+        if col == 6:
+            return f"{(linha[6] or 0):.2f}%"
+        if col == 7:
+            return f"R$ {linha[7]:.2f}"
+        if col == 8:
+            return str(linha[8] or "")
+        if col == 9:
+            return linha[9] or ""
+        if col == 10:
+            return linha[10] if linha[10] else "N/A"
+        return None
+
+
+class ProdutosProxyModel(QSortFilterProxyModel):
+    """
+    Proxy da grade de estoque. A ordenação é repassada ao modelo de origem,
+    que ordena a lista de tuplas com list.sort, em vez de o proxy comparar
+    linha a linha chamando data() em Python.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setDynamicSortFilter(False)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class AcoesDelegate(QStyledItemDelegate):
+    """
+    Desenha os botões Editar/Excluir na coluna de ações sem criar widgets
+    por linha e emite o ID do produto quando um deles é clicado.
+    """
+
+    editar = pyqtSignal(int)
+    excluir = pyqtSignal(int)
+
+    TEXTOS = ("Editar", "Excluir")
+
+    def _retangulos(self, rect):
+        """Divide a célula em dois retângulos, um para cada botão"""
+        largura = rect.width() // 2
+        return (QRect(rect.left(), rect.top(), largura, rect.height()),
+                QRect(rect.left() + largura, rect.top(), rect.width() - largura, rect.height()))
+
+    def paint(self, painter, option, index):
+        estilo = option.widget.style() if option.widget else QApplication.style()
+        for rect, texto in zip(self._retangulos(option.rect), self.TEXTOS):
+            botao = QStyleOptionButton()
+            botao.rect = rect.adjusted(2, 2, -2, -2)
+            botao.text = texto
+            botao.state = QStyle.State_Enabled
+            estilo.drawControl(QStyle.CE_PushButton, botao, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            editar_rect, excluir_rect = self._retangulos(option.rect)
+            produto_id = model.index(index.row(), 0).data(PAPEL_VALOR)
+            if editar_rect.contains(event.pos()):
+                self.editar.emit(produto_id)
+                return True
+            if excluir_rect.contains(event.pos()):
+                self.excluir.emit(produto_id)
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -359,11 +359,7 @@ class ProfileWindow(QDialog):
         
         try:
             # Atualizar no banco de dados
-            self.db.cursor.execute('''
-            UPDATE usuarios SET nome = ?, email = ? WHERE id = ?
-            ''', (nome, email, self.usuario['id']))
-            
-            self.db.conn.commit()
+            self.db.atualizar_perfil_usuario(self.usuario['id'], nome, email)
             
             # Atualizar dados do usuário na memória
             self.usuario['nome'] = nome
@@ -6,10 +6,19 @@ from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from datetime import datetime, timedelta
 
+from utils.promocoes_ativas import PromocoesAtivas
+from utils.consulta_assincrona import ConsultaAssincrona
+from utils.alertas_estoque import AlertasEstoque
+
 class PromocoesWindow(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, promocoes_ativas=None, consultas=None, alertas=None):
         super().__init__()
         self.db = db
+        self.promocoes_ativas = promocoes_ativas or PromocoesAtivas(db)
+        self.consultas = consultas or ConsultaAssincrona(db, self)
+        # Alertas de vencimento/estoque baixo compartilhados com a janela principal
+        self.alertas = alertas or AlertasEstoque(db, self.consultas, self)
+        self.consultas.carregando.connect(self.estado_carregando)
         self.initUI()
         self.carregar_dados()
     
@@ -20,7 +29,16 @@ class PromocoesWindow(QWidget):
         # Título da página
         titulo = QLabel("Cadastro de Promoções")
         titulo.setFont(QFont("Arial", 14, QFont.Bold))
-        layout.addWidget(titulo)
+        
+        # Indicador de carregamento das consultas em segundo plano
+        self.lbl_carregando = QLabel("Carregando...")
+        self.lbl_carregando.setVisible(False)
+        
+        titulo_layout = QHBoxLayout()
+        titulo_layout.addWidget(titulo)
+        titulo_layout.addStretch()
+        titulo_layout.addWidget(self.lbl_carregando)
+        layout.addLayout(titulo_layout)
         
         # Área de pesquisa
         search_layout = QHBoxLayout()
@@ -54,19 +72,23 @@ class PromocoesWindow(QWidget):
         layout.addLayout(action_layout)
     
     def carregar_dados(self):
-        """Carrega as promoções do banco de dados para a tabela."""
-        promocoes = self.db.listar_promocoes()
-        self.atualizar_tabela(promocoes)
+        """Carrega as promoções do banco de dados para a tabela (em segundo plano)."""
+        self.consultas.executar('promocoes', 'listar_promocoes',
+                                sucesso=self.atualizar_tabela, erro=self.erro_consulta)
     
     def pesquisar_promocoes(self):
         """Pesquisa promoções pelo termo digitado."""
         termo = self.search_input.text()
-        if termo:
-            promocoes = self.db.listar_promocoes(filtro=termo)
-        else:
-            promocoes = self.db.listar_promocoes()
-        
-        self.atualizar_tabela(promocoes)
+        self.consultas.executar('promocoes', 'listar_promocoes', filtro=termo or None,
+                                sucesso=self.atualizar_tabela, erro=self.erro_consulta)
+    
+    def estado_carregando(self, canal, ativo):
+        """Mostra o indicador de carregamento enquanto a consulta está pendente."""
+        if canal == 'promocoes':
+            self.lbl_carregando.setVisible(ativo)
+    
+    def erro_consulta(self, mensagem):
+        QMessageBox.warning(self, "Erro", f"Erro ao carregar promoções: {mensagem}")
     
     def atualizar_tabela(self, promocoes):
         """Atualiza a tabela com as promoções fornecidas."""
@@ -91,6 +113,15 @@ class PromocoesWindow(QWidget):
             self.tabela.setItem(row, 5, QTableWidgetItem(str(promocao['data_inicio'])))
             self.tabela.setItem(row, 6, QTableWidgetItem(str(promocao['data_fim'])))
             
+            # Destacar as promoções vigentes hoje
+            if self.promocoes_ativas.promocao_ativa(promocao['id']):
+                for coluna in range(7):
+                    item = self.tabela.item(row, coluna)
+                    fonte = item.font()
+                    fonte.setBold(True)
+                    item.setFont(fonte)
+                    item.setToolTip("Promoção ativa hoje")
+            
             # Botões de ação
             acoes_widget = QWidget()
             acoes_layout = QHBoxLayout(acoes_widget)
@@ -109,13 +140,13 @@ class PromocoesWindow(QWidget):
     
     def abrir_formulario_promocao(self, promocao_id=None):
         """Abre o formulário para adicionar ou editar uma promoção."""
-        dialog = FormularioPromocao(self.db, promocao_id)
+        dialog = FormularioPromocao(self.db, promocao_id, self.alertas)
         if dialog.exec_() == QDialog.Accepted:
             self.carregar_dados()
     
     def abrir_promocoes_especiais(self):
         """Abre a janela de promoções especiais para produtos com estoque baixo ou próximos ao vencimento."""
-        dialog = PromocoesEspeciaisDialog(self.db)
+        dialog = PromocoesEspeciaisDialog(self.db, self.alertas)
         if dialog.exec_() == QDialog.Accepted:
             self.carregar_dados()
     
@@ -137,9 +168,10 @@ class PromocoesWindow(QWidget):
 
 
 class PromocoesEspeciaisDialog(QDialog):
-    def __init__(self, db):
+    def __init__(self, db, alertas=None):
         super().__init__()
         self.db = db
+        self.alertas = alertas or AlertasEstoque(db)
         self.initUI()
         self.carregar_produtos_especiais()
     
@@ -245,7 +277,7 @@ class PromocoesEspeciaisDialog(QDialog):
     
     def carregar_produtos_estoque_baixo(self):
         """Carrega os produtos com estoque abaixo do mínimo."""
-        produtos = self.db.verificar_produtos_estoque_baixo()
+        produtos = self.alertas.estoque_baixo()
         
         self.tabela_estoque_baixo.setRowCount(0)
         for row, produto in enumerate(produtos):
@@ -293,7 +325,7 @@ class PromocoesEspeciaisDialog(QDialog):
     def carregar_produtos_vencimento(self):
         """Carrega os produtos próximos ao vencimento."""
         dias = self.periodo_combo.currentData()
-        produtos = self.db.verificar_produtos_vencendo(dias)
+        produtos = self.alertas.vencendo(dias)
         
         self.tabela_vencimento.setRowCount(0)
         hoje = datetime.now().date()
@@ -467,9 +499,10 @@ class PromocoesEspeciaisDialog(QDialog):
 
 
 class FormularioPromocao(QDialog):
-    def __init__(self, db, promocao_id=None):
+    def __init__(self, db, promocao_id=None, alertas=None):
         super().__init__()
         self.db = db
+        self.alertas = alertas or AlertasEstoque(db)
         self.promocao_id = promocao_id
         self.promocao = None
         
@@ -707,7 +740,7 @@ class FormularioPromocao(QDialog):
         self.produto_combo.addItem("Selecione um produto", None)
         
         # Primeiro adicionar produtos com estoque baixo
-        produtos_estoque_baixo = self.db.verificar_produtos_estoque_baixo()
+        produtos_estoque_baixo = self.alertas.estoque_baixo()
         if produtos_estoque_baixo:
             self.produto_combo.insertSeparator(1)
             self.produto_combo.addItem("--- PRODUTOS COM ESTOQUE BAIXO ---", None)
@@ -715,7 +748,7 @@ class FormularioPromocao(QDialog):
                 self.produto_combo.addItem(f"{produto['nome']} (Estoque: {produto['quantidade']})", produto['id'])
         
         # Depois adicionar produtos próximos ao vencimento (30 dias)
-        produtos_vencendo = self.db.verificar_produtos_vencendo(30)
+        produtos_vencendo = self.alertas.vencendo(30)
         if produtos_vencendo:
             self.produto_combo.insertSeparator(self.produto_combo.count())
             self.produto_combo.addItem("--- PRODUTOS PRÓXIMOS AO VENCIMENTO ---", None)
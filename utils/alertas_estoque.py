@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class AlertasEstoque(QObject):
+    """
+    Alertas de produtos vencidos, próximos do vencimento e com estoque baixo,
+    compartilhados pela barra de status da janela principal, pelo painel de
+    alertas e pelas telas de estoque e promoções.
+
+    As consultas rodam em segundo plano (ConsultaAssincrona, canal 'alertas')
+    e o resultado fica em cache até DatabaseManager.versao_estoque mudar
+    (cadastro de produtos ou vendas) ou a data virar. Os produtos próximos do
+    vencimento são guardados para JANELA_VENCIMENTO dias; janelas menores são
+    filtradas em memória.
+    """
+
+    # Emitido quando um novo resultado fica disponível
+    alterados = pyqtSignal()
+
+    JANELA_VENCIMENTO = 30
+
+    def __init__(self, db, consultas=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.consultas = consultas
+        self._vencidos = []
+        self._vencendo = []
+        self._estoque_baixo = []
+        self._versao = None
+        self._data = None
+
+    def atualizado(self):
+        """Verifica se o cache corresponde ao estoque e à data atuais"""
+        return self._versao == self.db.versao_estoque and self._data == date.today()
+
+    def _consultar(self):
+        """Executa as consultas (na thread de trabalho quando em segundo plano)"""
+        versao = self.db.versao_estoque
+        return {
+            'versao': versao,
+            'data': date.today(),
+            'vencidos': self.db.verificar_produtos_vencidos(),
+            'vencendo': self.db.verificar_produtos_vencendo(dias=self.JANELA_VENCIMENTO),
+            'estoque_baixo': self.db.verificar_produtos_estoque_baixo(),
+        }
+
+    def atualizar(self):
+        """
+        Recalcula os alertas em segundo plano; alterados é emitido ao terminar.
+        Sem ConsultaAssincrona, o cálculo é feito na hora.
+        """
+        if self.consultas is None:
+            self._definir(self._consultar())
+            return
+        self.consultas.executar('alertas', self._consultar, sucesso=self._definir)
+
+    def _definir(self, resultado):
+        self._vencidos = resultado['vencidos']
+        self._vencendo = resultado['vencendo']
+        self._estoque_baixo = resultado['estoque_baixo']
+        self._versao = resultado['versao']
+        self._data = resultado['data']
+        self.alterados.emit()
+
+    def carregar(self):
+        """(Re)calcula os alertas de forma síncrona"""
+        self._definir(self._consultar())
+
+    def _garantir_atualizado(self):
+        if not self.atualizado():
+            self.carregar()
+
+    def vencidos(self):
+        """Retorna os produtos com validade anterior a hoje"""
+        self._garantir_atualizado()
+        return self._vencidos
+
+    def vencendo(self, dias=JANELA_VENCIMENTO):
+        """
+        Retorna os produtos que vencem de hoje até a quantidade de dias informada
+
+        Args:
+            dias (int): Janela em dias; acima de JANELA_VENCIMENTO consulta o banco
+        """
+        if dias > self.JANELA_VENCIMENTO:
+            return self.db.verificar_produtos_vencendo(dias=dias)
+
+        self._garantir_atualizado()
+        limite = (date.today() + timedelta(days=dias)).isoformat()
+        return [produto for produto in self._vencendo if produto['data_validade'] <= limite]
+
+    def estoque_baixo(self):
+        """Retorna os produtos com quantidade igual ou abaixo do estoque mínimo"""
+        self._garantir_atualizado()
+        return self._estoque_baixo
+
+    def contagens(self, dias=JANELA_VENCIMENTO):
+        """
+        Retorna as quantidades de alertas por tipo, sem disparar consultas
+
+        Returns:
+            dict: vencidos, vencendo e estoque_baixo (zerados se ainda não calculados)
+        """
+        limite = (date.today() + timedelta(days=dias)).isoformat()
+        return {
+            'vencidos': len(self._vencidos),
+            'vencendo': sum(1 for produto in self._vencendo if produto['data_validade'] <= limite),
+            'estoque_baixo': len(self._estoque_baixo),
+        }
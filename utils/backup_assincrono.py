@@ -0,0 +1,118 @@
+import os
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from database.backup import (realizar_backup, realizar_backup_incremental, BackupCancelado,
+                             RETENCAO_DIARIOS, RETENCAO_SEMANAIS)
+
+# Diretório padrão dos backups (o mesmo usado desde as primeiras versões)
+DIRETORIO_BACKUPS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui", "backups")
+
+
+class _SinaisBackup(QObject):
+    """Sinais emitidos pela tarefa de backup a partir da thread de trabalho"""
+    progresso = pyqtSignal(int, int)
+    concluido = pyqtSignal(str)
+    falhou = pyqtSignal(str)
+
+
+class _TarefaBackup(QRunnable):
+    """Executa o backup (completo ou incremental) em uma thread do pool"""
+
+    def __init__(self, funcao, db_path, diretorio, opcoes, sinais):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.funcao = funcao
+        self.db_path = db_path
+        self.diretorio = diretorio
+        self.opcoes = opcoes
+        self.sinais = sinais
+        self.cancelada = False
+
+    def _progresso(self, copiadas, total):
+        if self.cancelada:
+            raise BackupCancelado("Backup cancelado")
+        self.sinais.progresso.emit(copiadas, total)
+
+    def run(self):
+        try:
+            caminho = self.funcao(self.db_path, self.diretorio, progresso=self._progresso, **self.opcoes)
+        except Exception as e:
+            self.sinais.falhou.emit(str(e))
+            return
+        self.sinais.concluido.emit(caminho)
+
+
+class BackupAssincrono(QObject):
+    """
+    Backup do banco em segundo plano com a API de backup online do SQLite.
+
+    A cópia é feita por uma conexão própria, em passos de poucas páginas, e
+    não bloqueia a interface nem as escritas do sistema. O andamento chega
+    pelo sinal progresso; ao final, concluido recebe o caminho do arquivo
+    ou falhou recebe a mensagem de erro. Só um backup roda por vez.
+
+    No modo incremental (padrão), só as linhas alteradas desde o backup
+    anterior são copiadas; um backup completo é feito periodicamente como
+    base (ver database.backup.realizar_backup_incremental).
+    """
+
+    # passos concluídos, total (páginas no backup completo, tabelas no incremental)
+    progresso = pyqtSignal(int, int)
+    # caminho do backup gerado
+    concluido = pyqtSignal(str)
+    # mensagem de erro
+    falhou = pyqtSignal(str)
+
+    def __init__(self, db, diretorio=DIRETORIO_BACKUPS, compactar=True, incremental=True,
+                 diarios=RETENCAO_DIARIOS, semanais=RETENCAO_SEMANAIS, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.diretorio = diretorio
+        self.funcao = realizar_backup_incremental if incremental else realizar_backup
+        self.opcoes = {'compactar': compactar, 'diarios': diarios, 'semanais': semanais}
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._tarefa = None
+
+        self._sinais = _SinaisBackup()
+        self._sinais.progresso.connect(self.progresso)
+        self._sinais.concluido.connect(self._concluir)
+        self._sinais.falhou.connect(self._falhar)
+
+    def iniciar(self):
+        """
+        Inicia um backup em segundo plano
+
+        Returns:
+            bool: False se já houver um backup em andamento
+        """
+        if self.ocupado():
+            return False
+
+        self._tarefa = _TarefaBackup(self.funcao, self.db.db_path, self.diretorio, self.opcoes, self._sinais)
+        self.pool.start(self._tarefa)
+        return True
+
+    def ocupado(self):
+        """Verifica se há um backup em andamento"""
+        return self._tarefa is not None
+
+    def cancelar(self):
+        """Interrompe o backup em andamento no próximo passo da cópia"""
+        if self._tarefa is not None:
+            self._tarefa.cancelada = True
+
+    def _concluir(self, caminho):
+        self._tarefa = None
+        self.concluido.emit(caminho)
+
+    def _falhar(self, mensagem):
+        self._tarefa = None
+        print(f"Erro ao realizar backup: {mensagem}")
+        self.falhou.emit(mensagem)
+
+    def aguardar(self, timeout=-1):
+        """Aguarda o término do backup em andamento (ex.: ao fechar a janela)"""
+        return self.pool.waitForDone(timeout)
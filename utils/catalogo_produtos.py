@@ -0,0 +1,68 @@
+class CatalogoProdutos:
+    """
+    Cache em memória do catálogo de produtos usado pelo caixa.
+
+    Mantém dicionários por código de barras e por ID, além da posição de
+    cada produto na lista carregada (que é a mesma ordem do combobox),
+    para que a leitura do scanner seja resolvida em O(1).
+    O cache é reconstruído quando DatabaseManager.versao_produtos muda,
+    ou seja, após adicionar_produto/atualizar_produto/excluir_produto.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.produtos = []
+        self._por_id = {}
+        self._por_codigo = {}
+        self._posicao = {}
+        self._versao = None
+
+    def atualizado(self):
+        """Verifica se o cache corresponde à versão atual dos produtos no banco"""
+        return self._versao == self.db.versao_produtos
+
+    def carregar(self):
+        """
+        (Re)constrói o cache a partir de listar_produtos
+
+        Returns:
+            list: Produtos (dicionários) na ordem em que devem ser exibidos
+        """
+        self._versao = self.db.versao_produtos
+        self.produtos = [dict(produto) for produto in self.db.listar_produtos()]
+
+        self._por_id = {}
+        self._por_codigo = {}
+        self._posicao = {}
+        for posicao, produto in enumerate(self.produtos):
+            self._por_id[produto['id']] = produto
+            self._posicao[produto['id']] = posicao
+            if produto['codigo_barras']:
+                self._por_codigo[produto['codigo_barras']] = produto
+
+        return self.produtos
+
+    def por_codigo_barras(self, codigo_barras):
+        """Retorna o produto com o código de barras informado ou None"""
+        return self._por_codigo.get(codigo_barras)
+
+    def por_id(self, produto_id):
+        """Retorna o produto com o ID informado ou None"""
+        return self._por_id.get(produto_id)
+
+    def posicao(self, produto_id):
+        """Retorna a posição do produto na lista carregada ou -1"""
+        return self._posicao.get(produto_id, -1)
+
+    def baixar_estoque(self, itens):
+        """
+        Aplica no cache a baixa de estoque de uma venda já gravada, sem
+        precisar recarregar o catálogo
+
+        Args:
+            itens (list): Dicionários com produto_id e quantidade
+        """
+        for item in itens:
+            produto = self._por_id.get(item['produto_id'])
+            if produto:
+                produto['quantidade'] -= item['quantidade']
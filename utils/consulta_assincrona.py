@@ -0,0 +1,137 @@
+from itertools import count
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class _SinaisTarefa(QObject):
+    """Sinais emitidos pelas tarefas a partir da thread de trabalho"""
+    concluida = pyqtSignal(int, object)
+    falhou = pyqtSignal(int, str)
+
+
+class _TarefaConsulta(QRunnable):
+    """Executa uma chamada ao DatabaseManager em uma thread do pool"""
+
+    def __init__(self, ticket, funcao, args, kwargs, sinais):
+        super().__init__()
+        # O objeto Python é mantido pela fachada até a entrega do resultado
+        self.setAutoDelete(False)
+        self.ticket = ticket
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.sinais = sinais
+        self.cancelada = False
+
+    def run(self):
+        # Pedidos substituídos antes de começar nem chegam ao banco
+        if self.cancelada:
+            self.sinais.concluida.emit(self.ticket, None)
+            return
+
+        try:
+            resultado = self.funcao(*self.args, **self.kwargs)
+        except Exception as e:
+            self.sinais.falhou.emit(self.ticket, str(e))
+            return
+        self.sinais.concluida.emit(self.ticket, resultado)
+
+
+class ConsultaAssincrona(QObject):
+    """
+    Fachada assíncrona sobre o DatabaseManager.
+
+    Cada pedido é feito em um "canal" (ex.: 'dashboard', 'estoque'). Um novo
+    pedido no mesmo canal cancela o anterior: se ainda não começou, não é
+    executado; se já está em andamento, o resultado é descartado. Os
+    resultados voltam para a thread da interface pelos callbacks informados.
+    As consultas usam as conexões de leitura do pool do DatabaseManager.
+    """
+
+    # canal, True ao iniciar / False ao terminar (para estados de carregamento)
+    carregando = pyqtSignal(str, bool)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+
+        # Uma conexão de leitura fica livre para as chamadas síncronas da interface
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, db.num_leitores - 1))
+
+        self._tickets = count(1)
+        self._atual = {}    # canal -> ticket do pedido mais recente
+        self._tarefas = {}  # ticket -> (canal, tarefa, sucesso, erro)
+
+        self._sinais = _SinaisTarefa()
+        self._sinais.concluida.connect(self._entregar)
+        self._sinais.falhou.connect(self._falhar)
+
+    def executar(self, canal, metodo, *args, sucesso=None, erro=None, **kwargs):
+        """
+        Agenda uma consulta em segundo plano
+
+        Args:
+            canal (str): Identificador do pedido; substitui o pedido anterior do canal
+            metodo (str|callable): Nome de um método do DatabaseManager ou uma função
+            sucesso (callable): Recebe o resultado na thread da interface
+            erro (callable): Recebe a mensagem de erro na thread da interface
+
+        Returns:
+            int: Ticket do pedido
+        """
+        funcao = getattr(self.db, metodo) if isinstance(metodo, str) else metodo
+
+        self.cancelar(canal)
+
+        ticket = next(self._tickets)
+        tarefa = _TarefaConsulta(ticket, funcao, args, kwargs, self._sinais)
+        self._atual[canal] = ticket
+        self._tarefas[ticket] = (canal, tarefa, sucesso, erro)
+
+        self.carregando.emit(canal, True)
+        self.pool.start(tarefa)
+        return ticket
+
+    def cancelar(self, canal):
+        """Cancela o pedido pendente do canal (o resultado será descartado)"""
+        ticket = self._atual.pop(canal, None)
+        if ticket is None:
+            return
+
+        self._tarefas[ticket][1].cancelada = True
+        self.carregando.emit(canal, False)
+
+    def ocupado(self, canal):
+        """Verifica se há um pedido pendente no canal"""
+        return canal in self._atual
+
+    def _finalizar(self, ticket):
+        """Remove o pedido e retorna (canal, sucesso, erro) se ele ainda for o atual"""
+        canal, _, sucesso, erro = self._tarefas.pop(ticket)
+        if self._atual.get(canal) != ticket:
+            return None
+
+        del self._atual[canal]
+        self.carregando.emit(canal, False)
+        return canal, sucesso, erro
+
+    @pyqtSlot(int, object)
+    def _entregar(self, ticket, resultado):
+        pendente = self._finalizar(ticket)
+        if pendente and pendente[1]:
+            pendente[1](resultado)
+
+    @pyqtSlot(int, str)
+    def _falhar(self, ticket, mensagem):
+        pendente = self._finalizar(ticket)
+        if not pendente:
+            return
+
+        print(f"Erro na consulta '{pendente[0]}': {mensagem}")
+        if pendente[2]:
+            pendente[2](mensagem)
+
+    def aguardar(self, timeout=-1):
+        """Aguarda o término das tarefas em andamento (ex.: ao fechar a janela)"""
+        return self.pool.waitForDone(timeout)
@@ -0,0 +1,181 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Variável de ambiente / opção de linha de comando que ativam o perfil
+VARIAVEL_AMBIENTE = "ESTACAO_PERFIL_INICIO"
+OPCAO_LINHA_COMANDO = "--perfil-inicio"
+ARQUIVO_PADRAO = "perfil_inicializacao.json"
+
+
+class PerfilInicializacao:
+    """
+    Linha do tempo da inicialização do sistema.
+
+    Registra marcos (ex.: tela de login exibida), etapas com duração (abertura
+    do banco, criar_tabelas, criação de cada página, consultas de vencimento)
+    e o tempo de importação de cada módulo carregado pela primeira vez. Os
+    tempos são em milissegundos desde a criação do perfil, que deve ser
+    importado antes dos demais módulos em main.py.
+
+    Desativado (padrão), marcar() e medir() não registram nada.
+    """
+
+    def __init__(self):
+        self.ativo = False
+        self.arquivo = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._import_original = None
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Zera a linha do tempo, usando o momento atual como início"""
+        self._inicio = time.perf_counter()
+        self._inicio_data = time.time()
+        self.marcos = []
+        self.etapas = []
+        self.importacoes = []
+
+    def configurar(self, argv=None):
+        """
+        Ativa o perfil se a variável de ambiente ou a opção de linha de comando
+        estiverem presentes. Aceita "--perfil-inicio" ou "--perfil-inicio=arquivo.json"
+
+        Args:
+            argv (list): Argumentos da linha de comando (padrão: sys.argv)
+
+        Returns:
+            bool: True se o perfil foi ativado
+        """
+        argv = sys.argv if argv is None else argv
+
+        arquivo = os.environ.get(VARIAVEL_AMBIENTE)
+        for argumento in argv[1:]:
+            if argumento == OPCAO_LINHA_COMANDO:
+                arquivo = arquivo or ARQUIVO_PADRAO
+            elif argumento.startswith(OPCAO_LINHA_COMANDO + "="):
+                arquivo = argumento.split("=", 1)[1]
+
+        if not arquivo:
+            return False
+
+        # A variável pode ser só "1" para usar o arquivo padrão
+        self.ativar(ARQUIVO_PADRAO if arquivo == "1" else arquivo)
+        return True
+
+    def ativar(self, arquivo=ARQUIVO_PADRAO, importacoes=True):
+        """
+        Ativa o registro da linha do tempo
+
+        Args:
+            arquivo (str): Caminho do JSON gerado por salvar()
+            importacoes (bool): Medir o tempo de importação de cada módulo
+        """
+        self.ativo = True
+        self.arquivo = arquivo
+        if importacoes and self._import_original is None:
+            self._import_original = builtins.__import__
+            builtins.__import__ = self._importar
+
+    def desativar(self):
+        """Interrompe o registro e restaura a importação padrão"""
+        self.ativo = False
+        if self._import_original is not None:
+            builtins.__import__ = self._import_original
+            self._import_original = None
+
+    def _agora_ms(self):
+        return round((time.perf_counter() - self._inicio) * 1000, 3)
+
+    def marcar(self, nome):
+        """Registra um marco da inicialização no momento atual"""
+        if not self.ativo:
+            return
+        with self._lock:
+            self.marcos.append({'nome': nome, 'ms': self._agora_ms()})
+
+    @contextmanager
+    def medir(self, nome):
+        """Registra a duração do bloco como uma etapa da inicialização"""
+        if not self.ativo:
+            yield
+            return
+
+        inicio = self._agora_ms()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.etapas.append({
+                    'nome': nome,
+                    'inicio_ms': inicio,
+                    'duracao_ms': round(self._agora_ms() - inicio, 3),
+                    'thread': threading.current_thread().name,
+                })
+
+    def _importar(self, nome, globals=None, locals=None, fromlist=(), level=0):
+        """Substituto de __import__ que mede módulos ainda não carregados"""
+        if level or nome in sys.modules:
+            return self._import_original(nome, globals, locals, fromlist, level)
+
+        # Profundidade da importação aninhada, por thread
+        profundidade = getattr(self._local, 'profundidade', 0)
+        self._local.profundidade = profundidade + 1
+        inicio = time.perf_counter()
+        try:
+            return self._import_original(nome, globals, locals, fromlist, level)
+        finally:
+            self._local.profundidade = profundidade
+            with self._lock:
+                self.importacoes.append({
+                    'modulo': nome,
+                    'ms': round((time.perf_counter() - inicio) * 1000, 3),
+                    'profundidade': profundidade,
+                    'thread': threading.current_thread().name,
+                })
+
+    def resumo(self):
+        """
+        Monta a linha do tempo registrada
+
+        Returns:
+            dict: Marcos, etapas e importações (as de primeiro nível, mais lentas primeiro)
+        """
+        with self._lock:
+            importacoes = sorted(self.importacoes, key=lambda item: item['ms'], reverse=True)
+            return {
+                'inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._inicio_data)),
+                'total_ms': self._agora_ms(),
+                'marcos': list(self.marcos),
+                'etapas': list(self.etapas),
+                'importacoes': [item for item in importacoes if item['profundidade'] == 0],
+                'importacoes_total': len(importacoes),
+            }
+
+    def salvar(self, arquivo=None):
+        """
+        Grava a linha do tempo em JSON
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.ativo:
+            return False
+
+        arquivo = arquivo or self.arquivo or ARQUIVO_PADRAO
+        try:
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(self.resumo(), f, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            print(f"Erro ao salvar perfil de inicialização: {e}")
+            return False
+
+
+# Instância usada por main.py, DatabaseManager e MainWindow
+perfil = PerfilInicializacao()
@@ -0,0 +1,88 @@
+from datetime import date
+
+
+class PromocoesAtivas:
+    """
+    Resolvedor de preços promocionais do dia, compartilhado entre o caixa,
+    a barra de status da janela principal e a tela de promoções.
+
+    Mantém um mapa produto_id -> preco_promocional das promoções vigentes
+    hoje. O mapa é reconstruído sob demanda quando
+    DatabaseManager.versao_promocoes muda (adicionar/atualizar/excluir_promocao)
+    ou quando a data vira à meia-noite.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._promocoes = []
+        self._precos = {}
+        self._ids = set()
+        self._versao = None
+        self._data = None
+
+    def atualizado(self):
+        """Verifica se o mapa corresponde às promoções e à data atuais"""
+        return self._versao == self.db.versao_promocoes and self._data == date.today()
+
+    def carregar(self):
+        """
+        (Re)constrói o mapa a partir de listar_promocoes_ativas
+
+        Returns:
+            list: Promoções ativas hoje
+        """
+        self._versao = self.db.versao_promocoes
+        self._data = date.today()
+        self._promocoes = self.db.listar_promocoes_ativas()
+
+        self._precos = {}
+        self._ids = {promocao['id'] for promocao in self._promocoes}
+        for promocao in self._promocoes:
+            # Se houver mais de uma promoção para o produto, vale a primeira
+            self._precos.setdefault(promocao['produto_id'], promocao['preco_promocional'])
+
+        return self._promocoes
+
+    def _garantir_atualizado(self):
+        if not self.atualizado():
+            self.carregar()
+
+    def listar(self):
+        """Retorna as promoções ativas hoje"""
+        self._garantir_atualizado()
+        return self._promocoes
+
+    def quantidade(self):
+        """Retorna o número de promoções ativas hoje"""
+        self._garantir_atualizado()
+        return len(self._promocoes)
+
+    def preco_promocional(self, produto_id):
+        """Retorna o preço promocional do produto hoje ou None"""
+        self._garantir_atualizado()
+        return self._precos.get(produto_id)
+
+    def em_promocao(self, produto_id):
+        """Verifica se o produto tem promoção ativa hoje"""
+        self._garantir_atualizado()
+        return produto_id in self._precos
+
+    def promocao_ativa(self, promocao_id):
+        """Verifica se a promoção informada está vigente hoje"""
+        self._garantir_atualizado()
+        return promocao_id in self._ids
+
+    def preco(self, produto):
+        """
+        Resolve o preço de venda de um produto, aplicando a promoção do dia
+
+        Args:
+            produto (dict): Produto com id e preco_venda
+
+        Returns:
+            float: Preço promocional, se houver, ou o preço de venda
+        """
+        preco_promocional = self.preco_promocional(produto['id'])
+        if preco_promocional is not None:
+            return preco_promocional
+        return produto['preco_venda'] if produto['preco_venda'] else 0